@@ -0,0 +1,25 @@
+from mississauga_eab import load_profile
+from mississauga_eab.optimization.schedule_optimizer import optimize_schedule
+
+## ------------------------------------------------ SIMULATION SETTINGS ------------------------------------------------
+set_removal_rate = [0, 100, 250, 500, 1000] # Ash trees that may be removed in any year; 0 injects the ash instead
+set_planting_rate = [0, 10, 100, 333, 400, 1000] # Non-ash trees that may be planted in any year
+tree_resolution = 10 # Trees per step when grouping similar non-ash cohorts; smaller is slower but more exact
+diameter_resolution = 0.5 # Mean DBH (cm) per step when grouping similar non-ash cohorts
+profile_file = 'consistent' # Bundled profile of the optimization parameters, or a TOML/JSON profile file
+
+## ----------------------------------------------- OPTIMIZE THE SCHEDULE -----------------------------------------------
+if __name__ == '__main__':
+    consistent_parameters = load_profile(profile_file).parameters()
+
+    # Choose removal and planting separately for every year to maximize Net Value of All Trees
+    schedule = optimize_schedule(consistent_parameters, set_removal_rate, set_planting_rate,
+                                 tree_resolution=tree_resolution, diameter_resolution=diameter_resolution)
+
+    # Print the schedule and the resulting year-by-year values
+    print("Yearly Schedule Maximizing Net Value of All Trees:")
+    for year, (removal_rate, planting_rate) in enumerate(zip(schedule.removal_rates, schedule.planting_rates), start=1):
+        action = f"Remove {removal_rate} ash trees" if removal_rate else "Inject ash trees"
+        net_value = schedule.results.value('Net Value of All Trees', year)
+        print(f"Year {year}: {action}, Plant {planting_rate} trees, Net Value = {net_value:.2f}")
+    print(f"Net Value of All Trees at Year {consistent_parameters['years']}: {schedule.value:.2f}")
@@ -0,0 +1,29 @@
+## ------------------------------------------------ SIMULATION SETTINGS ------------------------------------------------
+set_removal_rate = 400 # Sets a number of ash trees to remove each year
+set_planting_rate = 400 # Sets a number of new trees to plant each year
+set_removal_year = 5 # Select year in which ash trees begin to be removed
+set_injection_years = 5 # Number of years to inject ash
+set_planting_year = 1 # Year where tree planting starts
+
+## ------------------------------------------------- PROFILE SETTINGS --------------------------------------------------
+profiles = { # Profile name and the bundled profile, profile file or parameter module it is read from
+    'Overall': 'overall',
+    'Street': 'street',
+    'Park': 'park',
+}
+comparison_file = None # Also save the comparison table to this CSV file, if set
+
+from mississauga_eab.profile_comparison import load_profiles, run_profiles, comparison_table
+
+if __name__ == '__main__':
+    settings = {'set_removal_rate': set_removal_rate, 'set_removal_year': set_removal_year,
+                'set_injection_years': set_injection_years, 'set_planting_rate': set_planting_rate,
+                'set_planting_year': set_planting_year}
+    profile_results = run_profiles(load_profiles(profiles), settings)
+
+    # One table comparing the year-20 values of every profile and scenario
+    table = comparison_table(profile_results)
+    print("Year 20 Values by Profile and Scenario:")
+    print(table.round(2).to_string())
+    if comparison_file is not None:
+        table.to_csv(comparison_file)
@@ -0,0 +1,27 @@
+## ------------------------------------------------ SIMULATION SETTINGS ------------------------------------------------
+set_removal_rate = 400 # Sets a number of ash trees to remove each year
+set_planting_rate = 400 # Sets a number of new trees to plant each year
+set_removal_year = 5 # Select year in which ash trees begin to be removed
+set_injection_years = 5 # Number of years to inject ash
+set_planting_year = 1 # Year where tree planting starts
+
+## ----------------------------------------------- SENSITIVITY SETTINGS ------------------------------------------------
+base_samples = 1024 # Saltelli base samples; the simulations are run base_samples * (parameters + 2) times
+spread = 0.2 # Each parameter varies by +/- this fraction of its point estimate
+design = 'halton' # Sampling design: 'halton', 'lhs' or 'sobol' (requires scipy)
+seed = 0 # Seed of the sampling design, so results are reproducible
+workers = None # Worker processes evaluating the samples (None uses every CPU)
+profile = 'overall' # Bundled profile ('overall', 'street', 'park' or 'consistent') or a TOML/JSON profile file
+
+from mississauga_eab import load_profile
+from mississauga_eab.sensitivity_analysis import default_bounds, sobol_analysis, report_sobol_indices
+
+if __name__ == '__main__':
+    settings = {'set_removal_rate': set_removal_rate, 'set_removal_year': set_removal_year,
+                'set_injection_years': set_injection_years, 'set_planting_rate': set_planting_rate,
+                'set_planting_year': set_planting_year}
+    parameters = load_profile(profile).parameters()
+    indices = sobol_analysis(parameters, settings, default_bounds(parameters, spread=spread), base_samples,
+                             design=design, seed=seed, workers=workers)
+    print(f"Sobol Indices of Year 20 Values ({indices.evaluations} simulations):")
+    report_sobol_indices(indices)
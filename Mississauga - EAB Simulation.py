@@ -4,19 +4,28 @@ set_planting_rate = 400 # Sets a number of new trees to plant each year
 set_removal_year = 5 # Select year in which ash trees begin to be removed
 set_injection_years = 5 # Number of years to inject ash
 set_planting_year = 1 # Year where tree planting starts
+report_horizons = [20] # Simulated years reported for every scenario
+summary_file = None # Writes the reported years of every scenario to a .csv or .parquet file
+profile_file = 'overall' # Bundled profile ('overall', 'street', 'park' or 'consistent') or a TOML/JSON profile file
 
-from Simulation_Parameters import *
-from Simulation_Module import run_simulations, report_year_20_values, report_year_20_counts
-from Simulation_Plotter import plot_simulations
+from mississauga_eab import load_profile, run_simulations, report_values, report_counts, summary_table, export_summary
+from mississauga_eab.simulation_plotter import plot_simulations
 
-simulation_results = run_simulations(starting_ash_trees, starting_diameter, starting_diameter_new, growth_rate,
-                                    growth_rate_new, ash_mortality_rate, injected_ash_mortality_rate,
-                                    tree_planting_and_establishment_expense, ash_tree_injections_expense,
-                                    set_removal_rate, set_removal_year, set_injection_years, set_planting_rate, set_planting_year,
-                                    depreciation_ash, depreciation_non_ash, mortality_rates_by_age,
-                                    background_mortality_rate, annual_inflation_rate, years,
-                                    get_pruning_cost_by_dbh, get_removal_cost_by_dbh)
+# Guarded so the simulation only runs when this script is executed, not when it is imported
+if __name__ == '__main__':
+    profile = load_profile(profile_file)
+    simulation_results = run_simulations(profile.starting_ash_trees, profile.starting_diameter, profile.starting_diameter_new,
+                                        profile.growth_rate, profile.growth_rate_new, profile.ash_mortality_rate,
+                                        profile.injected_ash_mortality_rate, profile.tree_planting_and_establishment_expense,
+                                        profile.ash_tree_injections_expense,
+                                        set_removal_rate, set_removal_year, set_injection_years, set_planting_rate, set_planting_year,
+                                        profile.depreciation_ash, profile.depreciation_non_ash, profile.mortality_rates_by_age,
+                                        profile.background_mortality_rate, profile.annual_inflation_rate, profile.years,
+                                        profile.get_pruning_cost_by_dbh, profile.get_removal_cost_by_dbh)
 
-report_year_20_values(simulation_results)
-report_year_20_counts(simulation_results)
-plot_simulations(simulation_results)
+    report_values(simulation_results, report_horizons)
+    report_counts(simulation_results, report_horizons)
+    if summary_file:
+        export_summary(summary_table(simulation_results, report_horizons), summary_file)
+    # The plotter reads the result buffers directly, so no DataFrames are built
+    plot_simulations(simulation_results)
@@ -0,0 +1,33 @@
+## ------------------------------------------------ SIMULATION SETTINGS ------------------------------------------------
+inventory_file = 'Mississauga - Tree Inventory.csv' # CSV with Tree ID, Species, DBH (cm) and Land Use columns
+scenario = 'Inject, Remove, and Replant' # 'Control and Remove', 'Control, Remove, then Replant', 'Remove then Replant' or 'Inject, Remove, and Replant'
+removal_rate = 400 # Sets a number of ash trees to remove each year
+injection_years = 5 # Number of years to inject ash
+seed = 0 # Seed of the per-tree mortality draws, so results are reproducible
+profile = 'overall' # Bundled profile ('overall', 'street', 'park' or 'consistent') or a TOML/JSON profile file
+land_use_profiles = {} # Profiles with each land use's post-planting mortality, e.g. {'Street': 'street', 'Park': 'park'}
+
+from mississauga_eab import load_profile
+from mississauga_eab.tree_inventory import INVENTORY_SCENARIOS, load_inventory, simulate_inventory
+
+if __name__ == '__main__':
+    inventory = load_inventory(inventory_file)
+    print(f"Loaded {len(inventory)} trees:")
+    for land_use, (ash_trees, non_ash_trees) in inventory.counts_by_land_use().items():
+        print(f"  {land_use}: {ash_trees} ash, {non_ash_trees} non-ash")
+
+    # Land uses listed in land_use_profiles use their own post-planting mortality
+    land_use_parameters = {land_use: load_profile(source).parameters() for land_use, source in land_use_profiles.items()}
+    settings = {'removal_rate': removal_rate, 'injection_years': injection_years}
+    results = simulate_inventory(inventory, scenario, load_profile(profile).parameters(), seed, land_use_parameters,
+                                 **{name: settings[name] for name in INVENTORY_SCENARIOS[scenario]})
+
+    # Print year-20 values for the whole inventory and for each land use
+    print(f"\nScenario: {scenario}")
+    for name, result in [('All Land Uses', results.total)] + [(land_use, results.by_land_use(land_use))
+                                                              for land_use in results.land_use_names]:
+        print(f"{name}: Ash Trees = {result.value('Ash Tree Count', 20):.0f}, "
+              f"Non-Ash Trees = {result.value('Non-Ash Tree Count', 20):.0f}, "
+              f"Cumulative Costs = {result.value('Cumulative Costs', 20):.2f}, "
+              f"CTLA Value of All Trees = {result.value('CTLA Value of All Trees', 20):.2f}, "
+              f"Net Value of All Trees = {result.value('Net Value of All Trees', 20):.2f}")
@@ -0,0 +1,35 @@
+## ------------------------------------------------ SIMULATION SETTINGS ------------------------------------------------
+scenario = 'Control, Remove, then Replant' # 'Control and Remove' or 'Control, Remove, then Replant'
+ash_map_file = None # .npy map of ash trees per cell; None spreads starting_ash_trees evenly over grid_shape
+infestation_map_file = None # .npy map of starting infestation (0 to 1); None infests the centre cell only
+grid_shape = (20, 20) # Rows and columns of the city grid when no ash map is given
+dispersal_distance = 2.0 # Mean EAB dispersal distance, in cells
+transmission_rate = 2.0 # Infestation pressure per infested ash tree reaching a cell
+profile = 'overall' # Bundled profile ('overall', 'street', 'park' or 'consistent') or a TOML/JSON profile file
+
+import numpy as np
+from mississauga_eab import load_profile
+from mississauga_eab.spatial_spread import simulate_spread
+
+if __name__ == '__main__':
+    parameters = load_profile(profile).parameters()
+    if ash_map_file is None:
+        ash_trees = np.full(grid_shape, parameters['starting_ash_trees'] / np.prod(grid_shape))
+    else:
+        ash_trees = np.load(ash_map_file)
+    if infestation_map_file is None:
+        infestation = np.zeros(ash_trees.shape)
+        infestation[ash_trees.shape[0] // 2, ash_trees.shape[1] // 2] = 1
+    else:
+        infestation = np.load(infestation_map_file)
+
+    results = simulate_spread(scenario, parameters, ash_trees, infestation, dispersal_distance,
+                              transmission_rate)
+
+    # Print how far the infestation reached each year, then the year-20 values
+    print(f"Scenario: {scenario} on a {ash_trees.shape[0]} x {ash_trees.shape[1]} grid")
+    for year, share in enumerate(results.infested_share(), start=1):
+        print(f"Year {year}: {share:.1%} of ash infested, {results.total.value('Ash Tree Count', year):.0f} ash trees left")
+    print(f"Cumulative Costs at Year 20: {results.total.value('Cumulative Costs', 20):.2f}")
+    print(f"CTLA Value of All Trees at Year 20: {results.total.value('CTLA Value of All Trees', 20):.2f}")
+    print(f"Net Value of All Trees at Year 20: {results.total.value('Net Value of All Trees', 20):.2f}")
@@ -0,0 +1,14 @@
+"""Emerald ash borer management simulations for the City of Mississauga's ash inventory.
+
+The simulation engine imports only NumPy. pandas and matplotlib are imported on first
+use by the functions that need them (DataFrames, inventory CSVs and plots), so worker
+processes and headless batch runs start without them.
+
+Batch jobs drive the engine from the command line: python -m mississauga_eab --help.
+"""
+from .cost_brackets import CostBrackets, compile_cost_brackets
+from .result_buffers import COLUMNS, SimulationResult, BatchResult
+from .simulation_module import run_simulations, report_year_20_values, report_year_20_counts
+from .summary_reports import summary_table, export_summary, report_values, report_counts
+from .batch_kernel import BATCH_SCENARIOS, simulate_batch
+from .parameter_profiles import ParameterProfile, load_profile
@@ -0,0 +1,553 @@
+import numpy as np
+from math import pi
+from .cohort_engine import mortality_rates_array, vectorize_cost_lookup
+from .cost_brackets import CostBrackets
+from .result_buffers import COLUMNS, COLUMN_INDEX, BatchResult
+
+# Parameters read from the parameter module by the batched kernel
+MODEL_PARAMETERS = (
+    'starting_ash_trees', 'starting_diameter', 'starting_diameter_new', 'growth_rate', 'growth_rate_new',
+    'injected_ash_mortality_rate', 'ash_mortality_rate', 'tree_planting_and_establishment_expense',
+    'ash_tree_injections_expense', 'depreciation_ash', 'depreciation_non_ash', 'mortality_rates_by_age',
+    'background_mortality_rate', 'annual_inflation_rate', 'years', 'get_pruning_cost_by_dbh',
+    'get_removal_cost_by_dbh',
+)
+
+# Management options the batched kernel can sweep, and the grid parameters each one uses
+BATCH_SCENARIOS = {
+    'Remove then Replant': ('removal_rate',),
+    'Inject, Remove, and Replant': ('injection_years', 'removal_rate'),
+    'Replant, Inject, then Remove': ('removal_year', 'removal_rate', 'planting_rate', 'planting_year'),
+    # Removal and planting chosen year by year: the grid holds each combination's decisions for the current year
+    'Yearly Schedule': ('removal_rate', 'planting_rate'),
+}
+
+# Scenarios of run_simulations, in its order, and the run_simulations setting behind each grid parameter
+SIMULATION_SCENARIOS = {
+    'Control and Remove': {},
+    'Control, Remove, then Replant': {},
+    'Remove then Replant': {'removal_rate': 'set_removal_rate'},
+    'Replant, Inject, then Remove': {'removal_year': 'set_removal_year', 'removal_rate': 'set_removal_rate',
+                                     'planting_rate': 'set_planting_rate', 'planting_year': 'set_planting_year'},
+    'Inject, Remove, and Replant': {'injection_years': 'set_injection_years', 'removal_rate': 'set_removal_rate'},
+    'Inject in Perpetuity': {},
+    'Inject in Perpetuity with Replanting': {},
+}
+
+# Options that replant without injecting: they prune non-ash trees only and add the reported non-ash
+# removal cost to the running total a second time
+REPLANT_ONLY_SCENARIOS = ('Remove then Replant', 'Control, Remove, then Replant')
+
+# Planting rate of a combination that has not started planting or paying for planting yet
+UNSET_PLANTING_RATE = -1
+
+# KernelModel attributes a stacked model holds one value of per batch row
+ROW_ATTRIBUTES = (
+    'starting_ash_trees', 'starting_diameter', 'starting_diameter_new', 'growth_rate', 'growth_rate_new',
+    'injected_ash_mortality_rate', 'ash_mortality_rate', 'planting_expense', 'injections_expense',
+    'depreciation_ash', 'depreciation_non_ash', 'annual_inflation_rate',
+)
+
+
+class RowCostLookup:
+    """DBH cost lookup of a stacked model: each batch row is priced by its own parameter set's brackets.
+
+    Diameters carry the batch rows on their leading axis. When every lookup is compiled
+    CostBrackets, the brackets are padded into one (rows, brackets) table, so all rows
+    are priced by a single comparison; other lookups price their own rows in turn.
+    """
+
+    def __init__(self, lookups, row_lookups):
+        self.lookups = lookups
+        self.row_lookups = row_lookups
+        self.upper_bounds = None
+        if all(isinstance(lookup, CostBrackets) for lookup in lookups):
+            # One padding bracket past the widest table catches diameters above every bracket
+            width = max(len(lookup.costs) for lookup in lookups) + 1
+
+            def table(name, fill):
+                return np.array([np.pad(getattr(lookup, name), (0, width - len(lookup.costs)), constant_values=fill)
+                                 for lookup in lookups])[row_lookups]
+            self.upper_bounds = table('upper_bounds', np.inf)
+            self.lower_bounds = table('lower_bounds', np.inf)
+            self.costs = table('costs', np.nan)
+
+    def __call__(self, diameters):
+        diameters = np.asarray(diameters, dtype=float)
+        if self.upper_bounds is None:
+            costs = np.empty(diameters.shape)
+            for lookup_index, lookup in enumerate(self.lookups):
+                rows = self.row_lookups == lookup_index
+                costs[rows] = lookup(diameters[rows])
+            return costs
+
+        # Brackets along a new last axis; the first bracket whose upper bound is at or above each diameter
+        shape = (len(self.costs),) + (1,) * (diameters.ndim - 1) + (-1,)
+        index = (diameters[..., None] > self.upper_bounds.reshape(shape)).sum(axis=-1)[..., None]
+        in_range = diameters > np.take_along_axis(self.lower_bounds.reshape(shape), index, axis=-1)[..., 0]
+        if not np.all(in_range):
+            raise ValueError(f"DBH value {diameters[~in_range][0]} falls outside defined cost ranges.")
+        return np.take_along_axis(self.costs.reshape(shape), index, axis=-1)[..., 0]
+
+
+def _stacked_lookup(models, name):
+    # One array-aware lookup for the rows of a stacked model; parameter sets with the same compiled brackets
+    # (or the same scalar lookup) share one
+    lookups, row_lookups, seen = [], [], {}
+    for model in models:
+        function = getattr(model, f'get_{name}_cost_by_dbh')
+        key = function.cost_ranges if isinstance(function, CostBrackets) else id(function)
+        if key not in seen:
+            seen[key] = len(lookups)
+            lookups.append(getattr(model, f'{name}_cost_lookup'))
+        row_lookups.append(seen[key])
+    return lookups[0] if len(lookups) == 1 else RowCostLookup(lookups, np.array(row_lookups))
+
+
+class KernelModel:
+    """Model parameters for the batched kernel, with the lookups compiled once.
+
+    A model built from one parameter mapping holds scalars shared by the whole batch;
+    KernelModel.stack builds one holding a value per batch row instead.
+    """
+
+    # Number of batch rows of a stacked model; None when the parameters are shared by every row
+    rows = None
+
+    def __init__(self, parameters):
+        self.years = parameters['years']
+        self.starting_ash_trees = parameters['starting_ash_trees']
+        self.starting_diameter = parameters['starting_diameter']
+        self.starting_diameter_new = parameters['starting_diameter_new']
+        self.growth_rate = parameters['growth_rate']
+        self.growth_rate_new = parameters['growth_rate_new']
+        self.injected_ash_mortality_rate = parameters['injected_ash_mortality_rate']
+        self.ash_mortality_rate = parameters['ash_mortality_rate']
+        self.planting_expense = parameters['tree_planting_and_establishment_expense']
+        self.injections_expense = parameters['ash_tree_injections_expense']
+        self.depreciation_ash = parameters['depreciation_ash']
+        self.depreciation_non_ash = parameters['depreciation_non_ash']
+        self.annual_inflation_rate = parameters['annual_inflation_rate']
+        self.get_pruning_cost_by_dbh = parameters['get_pruning_cost_by_dbh']
+        self.get_removal_cost_by_dbh = parameters['get_removal_cost_by_dbh']
+        self.pruning_cost_lookup = vectorize_cost_lookup(self.get_pruning_cost_by_dbh)
+        self.removal_cost_lookup = vectorize_cost_lookup(self.get_removal_cost_by_dbh)
+        self.mortality_table = mortality_rates_array(parameters['mortality_rates_by_age'],
+                                                     parameters['background_mortality_rate'], self.years)
+
+    @classmethod
+    def stack(cls, parameter_sets):
+        """Build one model whose parameters hold a value per batch row, from one parameter mapping per row.
+
+        Every row must simulate the same number of years. The lookups and mortality table
+        of each parameter set are compiled once; rows sharing cost lookups are priced
+        together, and mortality tables are padded to one length with their background rate.
+        """
+        models = [cls(parameters) for parameters in parameter_sets]
+        if len({model.years for model in models}) > 1:
+            raise ValueError("Stacked parameter sets must all simulate the same number of years.")
+        model = cls.__new__(cls)
+        model.rows = len(models)
+        model.years = models[0].years
+        for name in ROW_ATTRIBUTES:
+            setattr(model, name, np.array([getattr(row_model, name) for row_model in models]))
+        model.starting_ash_trees = model.starting_ash_trees.astype(np.int64)
+        model.pruning_cost_lookup = model.get_pruning_cost_by_dbh = _stacked_lookup(models, 'pruning')
+        model.removal_cost_lookup = model.get_removal_cost_by_dbh = _stacked_lookup(models, 'removal')
+        tables = [row_model.mortality_table for row_model in models]
+        width = max(len(table) for table in tables)
+        model.mortality_table = np.stack([table if len(table) == width else np.pad(table, (0, width - len(table)),
+                                                                                   mode='edge') for table in tables])
+        return model
+
+
+class BatchState:
+    """Snapshot of the simulation state of a batch of combinations at the end of a year.
+
+    Ash count, cohort counts, the planting rate and the cumulative costs are held per
+    combination. The year, average ash diameter, cohort diameters and inflation factor do
+    not depend on the management grid and are shared by the whole batch, unless the model
+    is stacked, in which case they are held per row as well.
+    """
+
+    PER_ROW_MODEL = ('average_diameter_ash', 'cohort_diameters', 'inflation_factor')
+
+    PER_COMBINATION = (
+        'ash_tree_count', 'cohort_counts', 'previous_non_ash_tree_count', 'planting_rate',
+        'cumulative_planting_cost', 'cumulative_pruning_cost', 'cumulative_injection_cost',
+        'cumulative_removal_cost',
+    )
+
+    def __init__(self, year, average_diameter_ash, cohort_diameters, inflation_factor, **per_combination):
+        self.year = year
+        self.average_diameter_ash = average_diameter_ash
+        self.cohort_diameters = cohort_diameters
+        self.inflation_factor = inflation_factor
+        for name in self.PER_COMBINATION:
+            setattr(self, name, per_combination[name])
+
+    def __len__(self):
+        return len(self.ash_tree_count)
+
+    def take(self, index):
+        """Branch the state: return a new state holding the given combinations, in order."""
+        if np.ndim(self.average_diameter_ash):
+            # Stacked models hold the grid-independent values per row too
+            shared = [getattr(self, name)[index] for name in self.PER_ROW_MODEL]
+        else:
+            shared = [self.average_diameter_ash, self.cohort_diameters.copy(), self.inflation_factor]
+        return BatchState(self.year, *shared, **{name: getattr(self, name)[index] for name in self.PER_COMBINATION})
+
+    def snapshot(self):
+        """Return an independent copy of the state."""
+        return self.take(np.arange(len(self)))
+
+
+def initial_state(model, n_combinations):
+    """State of n_combinations untouched inventories before the first simulated year.
+
+    A stacked model simulates one combination per row, so n_combinations must match its rows.
+    """
+    if model.rows is not None and model.rows != n_combinations:
+        raise ValueError(f"A model stacked from {model.rows} parameter sets simulates {model.rows} combinations, "
+                         f"not {n_combinations}.")
+    # Column p of the cohort matrix holds the cohort planted in year p + 1; the extra column takes trees
+    # planted after the final year's mortality
+    shape = (model.years + 1,) if model.rows is None else (model.rows, model.years + 1)
+    return BatchState(
+        year=0,
+        average_diameter_ash=model.starting_diameter if model.rows is None else np.copy(model.starting_diameter),
+        cohort_diameters=np.zeros(shape, dtype=float),
+        inflation_factor=1 if model.rows is None else np.ones(model.rows),
+        ash_tree_count=np.full(n_combinations, model.starting_ash_trees, dtype=np.int64),
+        cohort_counts=np.zeros((n_combinations, model.years + 1), dtype=np.int64),
+        previous_non_ash_tree_count=np.zeros(n_combinations, dtype=np.int64),
+        planting_rate=np.full(n_combinations, UNSET_PLANTING_RATE, dtype=np.int64),
+        cumulative_planting_cost=np.zeros(n_combinations),
+        cumulative_pruning_cost=np.zeros(n_combinations),
+        cumulative_injection_cost=np.zeros(n_combinations),
+        cumulative_removal_cost=np.zeros(n_combinations),
+    )
+
+
+def _per_row(value):
+    # Values held per row by a stacked model scale the cohort axis as a column
+    return value[:, None] if np.ndim(value) else value
+
+
+def _deaths(counts, mortality_rates, rng):
+    # Deterministic runs truncate like int(count * rate); stochastic runs draw binomial deaths
+    if rng is None:
+        return (counts * mortality_rates).astype(np.int64)
+    return rng.binomial(counts, mortality_rates)
+
+
+def advance_year(scenario, model, state, grid, rng=None, carry_planting_cap=True):
+    """Advance every combination in the state by one year, in place.
+
+    `grid` holds the scenario's grid parameters as arrays aligned with the state; the
+    scenarios of SIMULATION_SCENARIOS without grid parameters take an empty grid. With a
+    NumPy Generator as rng, ash and cohort deaths are drawn from binomial distributions
+    instead of being truncated from the expected count.
+
+    In 'Replant, Inject, then Remove', a planting rate cut to the trees still needed stays
+    cut in later years, as in the optimization scripts; run_simulations instead caps its
+    set planting rate afresh every year, which carry_planting_cap=False follows.
+    Returns the year's results as an array of shape (combinations, len(COLUMNS)).
+    """
+    n_combinations = len(state)
+    state.year += 1
+    year = state.year
+    inflation_factor = state.inflation_factor
+
+    state.average_diameter_ash += model.growth_rate
+    average_diameter_ash = state.average_diameter_ash
+    ash_tree_count = state.ash_tree_count
+    ash_removal_price = model.get_removal_cost_by_dbh(average_diameter_ash)
+    ash_removal_cost = ash_removal_price * inflation_factor
+    injection_cost = np.zeros(n_combinations)
+    planted_after_mortality = False
+
+    # Ash phase for each management option
+    if scenario in ('Control and Remove', 'Control, Remove, then Replant'):
+        # Untreated ash die at the ash mortality rate and are removed; the replant option replaces them
+        # with a cohort planted after this year's cohort mortality
+        removed = _deaths(ash_tree_count, model.ash_mortality_rate, rng)
+        ash_tree_count = ash_tree_count - removed
+        removal_cost = removed * ash_removal_price * inflation_factor
+        replanting = scenario == 'Control, Remove, then Replant'
+        planted = removed if replanting else np.zeros(n_combinations, dtype=np.int64)
+        planted_after_mortality = replanting
+        replanting_cost = planted * model.planting_expense * inflation_factor
+
+    elif scenario in ('Inject in Perpetuity', 'Inject in Perpetuity with Replanting'):
+        # Every living ash is injected each year; dead ash are removed and, with replanting, replaced
+        injection_cost = (ash_tree_count / 2) * average_diameter_ash * model.injections_expense * inflation_factor
+        trees_died = _deaths(ash_tree_count, model.injected_ash_mortality_rate, rng)
+        ash_tree_count = ash_tree_count - trees_died
+        removal_cost = trees_died * ash_removal_price * inflation_factor
+        replanting = scenario == 'Inject in Perpetuity with Replanting'
+        planted = trees_died if replanting else np.zeros(n_combinations, dtype=np.int64)
+        replanting_cost = planted * model.planting_expense * inflation_factor
+
+    elif scenario == 'Remove then Replant':
+        trees_to_remove = np.minimum(grid['removal_rate'], ash_tree_count)
+        ash_tree_count = ash_tree_count - trees_to_remove
+        planted = trees_to_remove
+        removal_cost = trees_to_remove * ash_removal_cost
+        replanting_cost = trees_to_remove * model.planting_expense * inflation_factor
+
+    elif scenario == 'Inject, Remove, and Replant':
+        injecting = year <= grid['injection_years']
+        injection_cost = np.where(injecting, (ash_tree_count / 2) * average_diameter_ash * model.injections_expense
+                                  * inflation_factor, 0.0)
+        trees_died = _deaths(ash_tree_count, model.injected_ash_mortality_rate, rng)
+        trees_to_remove = np.minimum(grid['removal_rate'], ash_tree_count)
+        planted = np.where(injecting, trees_died, trees_to_remove)
+        ash_tree_count = ash_tree_count - planted
+        removal_cost = planted * ash_removal_cost
+        replanting_cost = planted * model.planting_expense * inflation_factor
+
+    elif scenario == 'Replant, Inject, then Remove':
+        injecting = year <= grid['removal_year']
+        trees_died = _deaths(ash_tree_count, model.injected_ash_mortality_rate, rng)
+        trees_to_remove = np.minimum(grid['removal_rate'], ash_tree_count)
+        removed = np.where(injecting, trees_died, trees_to_remove)
+        ash_tree_count = ash_tree_count - removed
+        injection_cost = np.where(injecting, (ash_tree_count / 2) * average_diameter_ash * model.injections_expense
+                                  * inflation_factor, 0.0)
+        removal_cost = removed * ash_removal_cost
+
+        # The planting rate is first read in the year planting or paying for planting begins
+        planting = year >= grid['planting_year']
+        charging = year >= grid['removal_year']
+        planting_rate = np.where((state.planting_rate == UNSET_PLANTING_RATE) & (planting | charging),
+                                 grid['planting_rate'], state.planting_rate)
+
+        # Planting never exceeds the trees still needed to replace the starting ash inventory
+        remaining_trees_to_replace = np.maximum(0, model.starting_ash_trees - state.previous_non_ash_tree_count)
+        capped_rate = planting_rate if carry_planting_cap else grid['planting_rate']
+        planting_rate = np.where(planting, np.minimum(capped_rate, remaining_trees_to_replace), planting_rate)
+        planted = np.where(planting, planting_rate, 0)
+        replanting_cost = np.where(charging, planting_rate * (model.planting_expense * inflation_factor), 0.0)
+        state.planting_rate = planting_rate
+
+    else:  # 'Yearly Schedule'
+        # A year without removals injects the remaining ash; otherwise ash are removed without injection
+        injecting = grid['removal_rate'] == 0
+        trees_died = _deaths(ash_tree_count, model.injected_ash_mortality_rate, rng)
+        trees_to_remove = np.minimum(grid['removal_rate'], ash_tree_count)
+        removed = np.where(injecting, trees_died, trees_to_remove)
+        ash_tree_count = ash_tree_count - removed
+        injection_cost = np.where(injecting, (ash_tree_count / 2) * average_diameter_ash * model.injections_expense
+                                  * inflation_factor, 0.0)
+        removal_cost = removed * ash_removal_cost
+
+        # Planting never exceeds the trees still needed to replace the starting ash inventory
+        remaining_trees_to_replace = np.maximum(0, model.starting_ash_trees - state.previous_non_ash_tree_count)
+        planted = np.minimum(grid['planting_rate'], remaining_trees_to_replace)
+        replanting_cost = planted * (model.planting_expense * inflation_factor)
+
+    state.ash_tree_count = ash_tree_count
+    state.cumulative_injection_cost += injection_cost
+    if not planted_after_mortality:
+        state.cohort_counts[:, year - 1] = planted
+    state.cohort_diameters[..., year - 1] = model.starting_diameter_new
+
+    # Age, grow and thin the cohorts planted so far
+    counts = state.cohort_counts[:, :year]
+    state.cohort_diameters[..., :year] += _per_row(model.growth_rate_new)
+    diameters = state.cohort_diameters[..., :year]
+    ages = year - np.arange(year)
+    mortality_rates = model.mortality_table[..., np.minimum(ages, model.mortality_table.shape[-1] - 1)]
+    present = counts > 0
+    dead_trees = _deaths(counts, mortality_rates, rng)
+    counts -= dead_trees
+
+    # Trees planted after mortality join as next year's cohort: they first age and grow in the coming year
+    if planted_after_mortality:
+        state.cohort_counts[:, year] = planted
+
+    charged = ages >= 3
+    cohort_removal_costs = dead_trees * (np.where(charged, model.removal_cost_lookup(diameters), 0.0)
+                                         * _per_row(inflation_factor))
+    replanted = dead_trees if scenario == 'Replant, Inject, then Remove' else dead_trees * charged
+    cohort_replanting_cost = replanted.sum(axis=1) * model.planting_expense * inflation_factor
+
+    # The reported non-ash removal cost is that of the youngest surviving cohort aged 3 or more
+    last_charged = np.where(present & charged, np.arange(year), -1).max(axis=1)
+    removal_cost_non_ash = np.where(
+        last_charged >= 0, cohort_removal_costs[np.arange(n_combinations), np.maximum(last_charged, 0)], 0.0)
+
+    state.cumulative_removal_cost += cohort_removal_costs.sum(axis=1) + removal_cost
+    state.cumulative_planting_cost += cohort_replanting_cost + replanting_cost
+    if scenario in REPLANT_ONLY_SCENARIOS:
+        # The reported non-ash removal cost goes into the running total a second time
+        state.cumulative_removal_cost += removal_cost_non_ash
+
+    non_ash_tree_count = counts.sum(axis=1)
+    total_diameter_non_ash = (counts * diameters).sum(axis=1)  # Row-wise, so results do not depend on batch size
+    state.previous_non_ash_tree_count = non_ash_tree_count
+    average_diameter_non_ash = np.where(non_ash_tree_count > 0,
+                                        total_diameter_non_ash / np.maximum(non_ash_tree_count, 1),
+                                        model.starting_diameter_new)
+    total_tree_count = ash_tree_count + non_ash_tree_count
+
+    # Pruning costs; the replant-only options prune non-ash trees only
+    pruning_cost = (non_ash_tree_count / 7) * model.pruning_cost_lookup(average_diameter_non_ash) * inflation_factor
+    if scenario not in REPLANT_ONLY_SCENARIOS:
+        pruning_cost += (ash_tree_count / 7) * model.get_pruning_cost_by_dbh(average_diameter_ash) * inflation_factor
+    state.cumulative_pruning_cost += pruning_cost
+
+    # Basal areas
+    ash_tree_basal_area = ((average_diameter_ash / 2) ** 2) * pi * ash_tree_count
+    non_ash_tree_basal_area = ((average_diameter_non_ash / 2) ** 2) * pi * non_ash_tree_count
+    total_tree_basal_area = ash_tree_basal_area + non_ash_tree_basal_area
+
+    # CTLA values
+    ctla_rate = (model.planting_expense * inflation_factor) / ((model.starting_diameter_new / 2) ** 2)
+    ctla_value_ash = ctla_rate * model.depreciation_ash * ash_tree_basal_area
+    ctla_value_non_ash = ctla_rate * model.depreciation_non_ash * non_ash_tree_basal_area
+    ctla_value_all_trees = ctla_value_ash + ctla_value_non_ash
+
+    # Injecting in perpetuity reports the removal of dead ash only
+    if scenario == 'Inject in Perpetuity with Replanting':
+        total_removal_cost = removal_cost
+    else:
+        total_removal_cost = removal_cost + removal_cost_non_ash
+    cumulative_costs = (state.cumulative_planting_cost + state.cumulative_pruning_cost
+                        + state.cumulative_injection_cost + state.cumulative_removal_cost)
+
+    # Store results
+    row = np.empty((n_combinations, len(COLUMNS)))
+    row[:, COLUMN_INDEX['Year']] = year
+    row[:, COLUMN_INDEX['Ash Tree Count']] = ash_tree_count
+    row[:, COLUMN_INDEX['Non-Ash Tree Count']] = non_ash_tree_count
+    row[:, COLUMN_INDEX['Total Tree Count']] = total_tree_count
+    row[:, COLUMN_INDEX['Ash Tree Basal Area']] = ash_tree_basal_area
+    row[:, COLUMN_INDEX['Non-Ash Tree Basal Area']] = non_ash_tree_basal_area
+    row[:, COLUMN_INDEX['Total Tree Basal Area']] = total_tree_basal_area
+    row[:, COLUMN_INDEX['Cost of Tree Planting and Establishment']] = replanting_cost
+    row[:, COLUMN_INDEX['Cost of Pruning']] = pruning_cost
+    row[:, COLUMN_INDEX['Cost of Injection']] = injection_cost
+    row[:, COLUMN_INDEX['Cost of Removal']] = total_removal_cost
+    row[:, COLUMN_INDEX['Total Costs']] = replanting_cost + pruning_cost + injection_cost + total_removal_cost
+    row[:, COLUMN_INDEX['Cumulative Cost of Tree Planting and Establishment']] = state.cumulative_planting_cost
+    row[:, COLUMN_INDEX['Cumulative Cost of Pruning']] = state.cumulative_pruning_cost
+    row[:, COLUMN_INDEX['Cumulative Cost of Injection']] = state.cumulative_injection_cost
+    row[:, COLUMN_INDEX['Cumulative Cost of Removal']] = state.cumulative_removal_cost
+    row[:, COLUMN_INDEX['Cumulative Costs']] = cumulative_costs
+    row[:, COLUMN_INDEX['CTLA Value of Ash']] = ctla_value_ash
+    row[:, COLUMN_INDEX['CTLA Value of Non-Ash']] = ctla_value_non_ash
+    row[:, COLUMN_INDEX['CTLA Value of All Trees']] = ctla_value_all_trees
+    row[:, COLUMN_INDEX['Net Value of All Trees']] = ctla_value_all_trees - cumulative_costs
+
+    # Update the inflation factor for the next year
+    state.inflation_factor *= 1 + model.annual_inflation_rate
+    return row
+
+
+def _relevant_grid(scenario, grid, year):
+    """Flag, per grid parameter, the combinations whose value has affected years 1 to `year`."""
+    if scenario == 'Remove then Replant':
+        return {'removal_rate': np.ones(len(grid['removal_rate']), dtype=bool)}
+    if scenario == 'Inject, Remove, and Replant':
+        removing = grid['injection_years'] < year
+        return {'injection_years': removing, 'removal_rate': removing}
+    if scenario == 'Yearly Schedule':
+        return {name: np.ones(len(grid[name]), dtype=bool) for name in BATCH_SCENARIOS[scenario]}
+    removing = grid['removal_year'] < year
+    charging = grid['removal_year'] <= year
+    planting = grid['planting_year'] <= year
+    return {'removal_year': charging, 'removal_rate': removing,
+            'planting_rate': planting | charging, 'planting_year': planting}
+
+
+def prefix_groups(scenario, grid, year):
+    """Group combinations that have followed identical trajectories through `year`.
+
+    Returns (group, representatives): the group index of every combination and, for
+    each group, the index of one combination in it. Groups only ever split as the
+    years advance, so the groups of successive years form a prefix tree.
+    """
+    relevant = _relevant_grid(scenario, grid, year)
+    codes = np.zeros(len(next(iter(grid.values()))), dtype=np.int64)
+    for name in BATCH_SCENARIOS[scenario]:
+        # Rank each value (0 marks "not yet relevant") and fold the ranks into one mixed-radix code
+        values, ranks = np.unique(grid[name], return_inverse=True)
+        codes = codes * (len(values) + 1) + np.where(relevant[name], ranks + 1, 0)
+    _, representatives, group = np.unique(codes, return_index=True, return_inverse=True)
+    return group, representatives
+
+
+def simulate_batch(scenario, parameters, share_prefixes=True, **grid):
+    """Advance a whole grid of management parameter sets through the simulation at once.
+
+    `parameters` is a mapping holding every name in MODEL_PARAMETERS, e.g. vars() of a
+    parameter module. The grid parameters of the scenario (see BATCH_SCENARIOS) are given
+    as scalars or 1-D arrays that broadcast along the batch axis. Each batch member follows
+    the per-combination simulate_* function of the matching Management Option Optimization
+    script, including its int() truncation of deaths and planting limits.
+
+    With share_prefixes, combinations are only simulated separately from the year their
+    grid parameters first make a difference: each year the state of every group is
+    branched from its parent group's snapshot, so shared leading years are simulated once.
+
+    Returns a BatchResult over a (combinations, years, len(COLUMNS)) buffer.
+    """
+    if scenario not in BATCH_SCENARIOS:
+        raise ValueError(f"Scenario '{scenario}' is not supported by the batched kernel.")
+    missing = [name for name in BATCH_SCENARIOS[scenario] if name not in grid]
+    if missing:
+        raise ValueError(f"Scenario '{scenario}' requires grid parameters: {', '.join(missing)}")
+
+    names = BATCH_SCENARIOS[scenario]
+    grid_arrays = np.broadcast_arrays(*[np.atleast_1d(np.asarray(grid[name], dtype=np.int64)) for name in names])
+    grid = dict(zip(names, grid_arrays))
+    n_combinations = len(grid_arrays[0])
+
+    model = KernelModel(parameters)
+    results = np.zeros((n_combinations, model.years, len(COLUMNS)))
+
+    if not share_prefixes:
+        state = initial_state(model, n_combinations)
+        for year in range(1, model.years + 1):
+            results[:, year - 1] = advance_year(scenario, model, state, grid)
+        return BatchResult(results)
+
+    # Walk the prefix tree: every combination starts in the single root group
+    state = initial_state(model, 1)
+    group = np.zeros(n_combinations, dtype=np.int64)
+    for year in range(1, model.years + 1):
+        next_group, representatives = prefix_groups(scenario, grid, year)
+        state = state.take(group[representatives])
+        group_grid = {name: values[representatives] for name, values in grid.items()}
+        rows = advance_year(scenario, model, state, group_grid)
+        results[:, year - 1] = rows[next_group]
+        group = next_group
+    return BatchResult(results)
+
+
+def simulate_samples(parameter_sets, settings, scenarios=tuple(SIMULATION_SCENARIOS)):
+    """Run the run_simulations scenarios for a batch of parameter sets in one vectorized pass.
+
+    `parameter_sets` holds one parameter mapping per batch row, e.g. sampled variations of
+    a profile or several profiles, all simulating the same number of years; `settings`
+    holds the set_* management settings of run_simulations, shared by every row. The
+    rows are stacked into one KernelModel (see KernelModel.stack), which every scenario
+    reuses. Each row follows its run_simulations scenario, including the int()
+    truncation of deaths.
+
+    Returns {scenario: BatchResult}, each over a (rows, years, len(COLUMNS)) buffer.
+    """
+    model = KernelModel.stack(parameter_sets)
+    results = {}
+    for scenario in scenarios:
+        grid = {name: np.full(model.rows, settings[setting], dtype=np.int64)
+                for name, setting in SIMULATION_SCENARIOS[scenario].items()}
+        state = initial_state(model, model.rows)
+        values = np.empty((model.rows, model.years, len(COLUMNS)))
+        for year in range(1, model.years + 1):
+            values[:, year - 1] = advance_year(scenario, model, state, grid, carry_planting_cap=False)
+        results[scenario] = BatchResult(values)
+    return results
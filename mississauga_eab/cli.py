@@ -0,0 +1,500 @@
+"""Command-line entry point: python -m mississauga_eab {run,sweep,report,plot} ...
+
+Every workflow of the top-level scripts takes its settings as arguments here, so batch
+jobs can launch runs and sweeps without editing source files. Nothing is ever shown on
+screen: plots are written to files with a non-interactive backend.
+"""
+import os
+import re
+import sys
+import csv
+import json
+import argparse
+from contextlib import contextmanager
+import numpy as np
+from .batch_kernel import BATCH_SCENARIOS
+from .result_buffers import COLUMNS, COLUMN_INDEX, INTEGER_COLUMNS, BatchResult
+from .simulation_module import run_simulations
+from .summary_reports import report_values, report_counts
+from .sweep_plotter import SWEEP_DPI
+from .profile_comparison import COMPARISON_COLUMNS, load_profiles, _simulation_inputs
+
+# Output formats of each subcommand; npz results files are what report and plot read back
+RUN_FORMATS = ('text', 'csv', 'json', 'npz')
+SWEEP_FORMATS = ('text', 'csv', 'json', 'npz')
+REPORT_FORMATS = ('text', 'csv', 'json')
+
+# Metrics optimized by sweeps and reports, as in the Management Option Optimization scripts
+SWEEP_METRICS = (
+    'Total Tree Count',
+    'Total Tree Basal Area',
+    'Cumulative Costs',
+    'CTLA Value of All Trees',
+    'Net Value of All Trees',
+)
+
+# Metrics whose best combination is the lowest one; the others are maximized
+MINIMIZED_METRICS = ('Cumulative Costs',)
+
+# Views of a sweep drawn by plot: best combinations, every line, group envelopes or heatmaps
+PLOT_KINDS = ('best', 'lines', 'envelope', 'heatmap')
+
+# Grid constraint such as removal_year>planting_year or removal_rate<=500
+CONSTRAINT_PATTERN = re.compile(r'^\s*(\w+)\s*(>=|<=|==|!=|>|<)\s*(\w+)\s*$')
+CONSTRAINT_OPERATORS = {
+    '>': np.greater, '>=': np.greater_equal, '<': np.less,
+    '<=': np.less_equal, '==': np.equal, '!=': np.not_equal,
+}
+
+
+def parse_grid_values(spec):
+    """Parse a list of whole numbers ('100,250,500') or an inclusive range ('1:20', '1:20:2')."""
+    values = []
+    for item in spec.split(','):
+        bounds = item.split(':')
+        try:
+            numbers = [int(bound) for bound in bounds]
+        except ValueError:
+            raise ValueError(f"Grid values must be whole numbers or start:stop[:step] ranges, not '{item}'.") from None
+        if len(numbers) == 1:
+            values.extend(numbers)
+        elif len(numbers) in (2, 3) and (len(numbers) == 2 or numbers[2] > 0):
+            values.extend(range(numbers[0], numbers[1] + 1, numbers[2] if len(numbers) == 3 else 1))
+        else:
+            raise ValueError(f"Grid range '{item}' must be start:stop or start:stop:step with a positive step.")
+    return values
+
+
+def build_grid(scenario, grid_values, constraints=()):
+    """Expand the values of each grid parameter into every combination, in nested-loop order.
+
+    `grid_values` maps each grid parameter of the scenario to its values; the first
+    parameter of BATCH_SCENARIOS[scenario] varies slowest, as in the scripts' loops.
+    Combinations failing any constraint (e.g. 'removal_year>planting_year') are dropped.
+    Returns {grid parameter: 1-D array with one entry per combination}.
+    """
+    names = BATCH_SCENARIOS[scenario]
+    unknown = sorted(set(grid_values) - set(names))
+    if unknown:
+        raise ValueError(f"Scenario '{scenario}' has no grid parameters {', '.join(unknown)}; "
+                         f"its grid parameters are {', '.join(names)}.")
+    missing = [name for name in names if name not in grid_values]
+    if missing:
+        raise ValueError(f"Scenario '{scenario}' requires grid values for {', '.join(missing)}.")
+
+    axes = np.meshgrid(*[np.asarray(grid_values[name], dtype=np.int64) for name in names], indexing='ij')
+    grid = {name: axis.ravel() for name, axis in zip(names, axes)}
+    keep = np.ones(len(grid[names[0]]), dtype=bool)
+    for constraint in constraints:
+        match = CONSTRAINT_PATTERN.match(constraint)
+        if match is None:
+            raise ValueError(f"Constraint '{constraint}' must look like removal_year>planting_year.")
+        left, operator, right = match.groups()
+        for operand in (left, right):
+            if operand not in grid and not operand.lstrip('-').isdigit():
+                raise ValueError(f"Constraint '{constraint}' refers to '{operand}', which is not a grid parameter.")
+        keep &= CONSTRAINT_OPERATORS[operator](grid[left] if left in grid else int(left),
+                                               grid[right] if right in grid else int(right))
+    return {name: values[keep] for name, values in grid.items()}
+
+
+def combination_label(grid, index):
+    """Describe one grid combination, e.g. 'removal_year=3, removal_rate=250'."""
+    return ', '.join(f'{name}={int(values[index])}' for name, values in grid.items())
+
+
+def save_results(path, values, labels=None, scenario=None, grid=None):
+    """Write a results file: simulation values with their scenario labels or sweep grid.
+
+    Results of `run` carry one label per scenario; results of `sweep` carry the scenario
+    and the grid arrays. The file is an uncompressed .npz, so values load back as stored.
+    """
+    arrays = {'values': values, 'columns': np.array(COLUMNS)}
+    if labels is not None:
+        arrays['labels'] = np.array(labels)
+    if scenario is not None:
+        arrays['scenario'] = np.array(scenario)
+    for name, grid_values in (grid or {}).items():
+        arrays[f'grid_{name}'] = grid_values
+    with open(path, 'wb') as f:
+        np.savez(f, **arrays)
+
+
+def load_results(path):
+    """Read a results file written by save_results, or a results cube directory written by sweep --cube.
+
+    Returns (values, labels, scenario, grid); labels is None for sweeps, and scenario
+    and grid are None for scenario runs. The values of a cube are memory-mapped, not read.
+    """
+    if os.path.isdir(path):
+        from .optimization.results_cube import ResultsCube
+
+        cube = ResultsCube.open(path)
+        pending = len(cube.pending())
+        if pending:
+            raise ValueError(f"Results cube '{path}' is missing {pending} combinations; resume the sweep first.")
+        return cube.values, None, cube.scenario, cube.grid
+    with np.load(path) as data:
+        if tuple(data['columns']) != COLUMNS:
+            raise ValueError(f"Results file '{path}' was written with different output columns.")
+        values = data['values']
+        labels = [str(label) for label in data['labels']] if 'labels' in data else None
+        scenario = str(data['scenario']) if 'scenario' in data else None
+        grid = {name: data[f'grid_{name}'] for name in BATCH_SCENARIOS[scenario]} if scenario is not None else None
+    return values, labels, scenario, grid
+
+
+@contextmanager
+def _output(path):
+    # Text outputs go to a file if one is given and to stdout otherwise
+    if path is None or path == '-':
+        yield sys.stdout
+    else:
+        with open(path, 'w', newline='') as f:
+            yield f
+
+
+def _load_parameters(source):
+    # A bundled profile name, a TOML or JSON profile file, or a parameter module
+    return load_profiles({source: source})[source]
+
+
+def _sweep_summary(reducers, grid, scenario, year):
+    # Best combinations per metric and the Pareto frontier, as a JSON-ready mapping
+    best_per_metric, pareto_frontier = reducers
+    return {
+        'scenario': scenario,
+        'year': year,
+        'combinations': best_per_metric.count,
+        'best': {metric: [{'grid': {name: int(values[index]) for name, values in grid.items()}, 'value': value}
+                          for index, value in best_per_metric.best(metric)] for metric in best_per_metric.metrics},
+        'pareto': [{'grid': {name: int(values[index]) for name, values in grid.items()},
+                    pareto_frontier.cost_metric: cost, pareto_frontier.value_metric: value}
+                   for index, cost, value in pareto_frontier.frontier()],
+    }
+
+
+def _grid_label(point):
+    # Describe the grid values of a summary entry, e.g. 'removal_rate=250'
+    return ', '.join(f'{name}={value}' for name, value in point.items())
+
+
+def _write_sweep_summary(out, summary, output_format):
+    if output_format == 'json':
+        json.dump(summary, out, indent=2)
+        out.write('\n')
+        return
+    print(f"{summary['scenario']}: {summary['combinations']} combinations", file=out)
+    print(f"Best Combinations for Each Metric (Evaluated at Year {summary['year']}):", file=out)
+    for metric, best in summary['best'].items():
+        for entry in best:
+            print(f"  {metric}: {_grid_label(entry['grid'])}, Value = {entry['value']:.2f}", file=out)
+    if 'pareto' not in summary:
+        # The branch-and-bound search finds the best combinations only
+        return
+    print(file=out)
+    print(f"Pareto Frontier (Evaluated at Year {summary['year']}):", file=out)
+    for entry in summary['pareto']:
+        metrics = {key: value for key, value in entry.items() if key != 'grid'}
+        print(f"  {_grid_label(entry['grid'])}: " + ', '.join(f'{key} = {value:.2f}' for key, value in metrics.items()),
+              file=out)
+
+
+def _row_values(values, columns):
+    # Years and tree counts as whole numbers, as in SimulationResult.to_frame
+    return [int(value) if column in INTEGER_COLUMNS else float(value) for column, value in zip(columns, values)]
+
+
+def _write_year_table(out, row_labels, row_values, columns, header):
+    # One CSV row per run scenario or sweep combination, with the values of the given columns
+    writer = csv.writer(out)
+    writer.writerow(header + list(columns))
+    indices = [COLUMN_INDEX[column] for column in columns]
+    for labels, values in zip(row_labels, row_values):
+        writer.writerow(list(labels) + _row_values(values[indices], columns))
+
+
+def _sweep_reducers(metrics, top_k, year):
+    from .optimization.sweep_reducers import BestPerMetric, ParetoFrontier
+
+    return [BestPerMetric(metrics, k=top_k, year=year, minimize=MINIMIZED_METRICS),
+            ParetoFrontier('Cumulative Costs', 'CTLA Value of All Trees', year=year)]
+
+
+def command_run(args):
+    """Run every scenario of run_simulations for one profile and management setting."""
+    parameters = _load_parameters(args.profile)
+    settings = dict(set_removal_rate=args.removal_rate, set_removal_year=args.removal_year,
+                    set_injection_years=args.injection_years, set_planting_rate=args.planting_rate,
+                    set_planting_year=args.planting_year)
+    simulation_results = run_simulations(**_simulation_inputs(parameters, settings))
+    if args.scenario:
+        unknown = [scenario for scenario in args.scenario if scenario not in simulation_results]
+        if unknown:
+            raise ValueError(f"Unknown scenarios: {', '.join(unknown)}; choose from {', '.join(simulation_results)}.")
+        simulation_results = {scenario: simulation_results[scenario] for scenario in args.scenario}
+
+    if args.summary:
+        # One tidy row per scenario and horizon, written to CSV or Parquet
+        from .summary_reports import summary_table, export_summary
+
+        export_summary(summary_table(simulation_results, args.horizon or [20]), args.summary)
+    if args.format == 'npz':
+        save_results(args.output, np.stack([results.values for results in simulation_results.values()]),
+                     labels=list(simulation_results))
+        return
+    with _output(args.output) as out:
+        if args.format == 'text':
+            report_values(simulation_results, args.horizon or [20], file=out)
+            report_counts(simulation_results, args.horizon or [20], file=out)
+        elif args.format == 'json':
+            json.dump({scenario: {column: results[column].astype(np.int64).tolist() if column in INTEGER_COLUMNS
+                                  else results[column].tolist() for column in COLUMNS}
+                       for scenario, results in simulation_results.items()}, out, indent=2)
+            out.write('\n')
+        else:
+            writer = csv.writer(out)
+            writer.writerow(['Scenario'] + list(COLUMNS))
+            for scenario, results in simulation_results.items():
+                writer.writerows([scenario] + _row_values(row, COLUMNS) for row in results.values)
+
+
+def command_sweep(args):
+    """Run a grid of management settings through the batched kernel."""
+    from .optimization.sweep_runner import run_sweep
+    from .optimization.sweep_reducers import YearValues
+
+    parameters = _load_parameters(args.profile)
+    grid_values = {}
+    for spec in args.grid:
+        name, _, values = spec.partition('=')
+        if not values:
+            raise ValueError(f"Grid spec '{spec}' must look like removal_rate=100,250,500,1000.")
+        grid_values[name.strip()] = parse_grid_values(values)
+    grid = build_grid(args.scenario, grid_values, args.where)
+    n_combinations = len(next(iter(grid.values())))
+    if n_combinations == 0:
+        raise ValueError("No grid combinations satisfy the constraints.")
+    if not 1 <= args.year <= parameters['years']:
+        raise ValueError(f"Year {args.year} is outside the simulated years 1 to {parameters['years']}.")
+    sweep_options = dict(workers=args.workers, checkpoint=args.checkpoint, resume=args.resume,
+                         use_cache=not args.no_cache, cube=args.cube)
+
+    if args.search == 'branch-and-bound':
+        from .optimization.policy_search import branch_and_bound
+
+        if args.format not in ('text', 'json'):
+            raise ValueError("The branch-and-bound search only reports the best combinations (text or json).")
+        best = {}
+        for metric in args.metric:
+            search = branch_and_bound(args.scenario, parameters, grid, metric, year=args.year)
+            best[metric] = [{'grid': {name: int(values[search.index]) for name, values in grid.items()},
+                             'value': search.value}]
+        with _output(args.output) as out:
+            _write_sweep_summary(out, {'scenario': args.scenario, 'year': args.year,
+                                       'combinations': n_combinations, 'best': best}, args.format)
+        return
+
+    if args.format == 'npz':
+        # Full results are needed on disk; everything else streams through reducers
+        results = run_sweep(args.scenario, parameters, grid, **sweep_options)
+        save_results(args.output, results.values, scenario=args.scenario, grid=grid)
+        return
+    if args.format == 'csv':
+        year_values = run_sweep(args.scenario, parameters, grid, reducer=YearValues(n_combinations, args.year),
+                                **sweep_options)
+        with _output(args.output) as out:
+            _write_year_table(out, zip(*[values.tolist() for values in grid.values()]), year_values.values,
+                              COLUMNS[1:], list(grid))
+        return
+    reducers = run_sweep(args.scenario, parameters, grid, reducer=_sweep_reducers(args.metric, args.top_k, args.year),
+                         **sweep_options)
+    with _output(args.output) as out:
+        _write_sweep_summary(out, _sweep_summary(reducers, grid, args.scenario, args.year), args.format)
+
+
+def command_report(args):
+    """Report on a results file written by run or sweep, at any simulated year."""
+    values, labels, scenario, grid = load_results(args.results)
+    if not 1 <= args.year <= values.shape[1]:
+        raise ValueError(f"Year {args.year} is outside the simulated years 1 to {values.shape[1]}.")
+    with _output(args.output) as out:
+        if scenario is not None and args.format != 'csv':
+            reducers = _sweep_reducers(args.metric, args.top_k, args.year)
+            for reducer in reducers:
+                reducer.update(np.arange(len(values)), values)
+            _write_sweep_summary(out, _sweep_summary(reducers, grid, scenario, args.year), args.format)
+        elif scenario is not None:
+            _write_year_table(out, zip(*[grid_values.tolist() for grid_values in grid.values()]),
+                              values[:, args.year - 1], COLUMNS[1:], list(grid))
+        elif args.format == 'csv':
+            _write_year_table(out, [[label] for label in labels], values[:, args.year - 1], COMPARISON_COLUMNS,
+                              ['Scenario'])
+        elif args.format == 'json':
+            json.dump({label: {column: float(row[args.year - 1, COLUMN_INDEX[column]])
+                               for column in COMPARISON_COLUMNS} for label, row in zip(labels, values)}, out, indent=2)
+            out.write('\n')
+        else:
+            for label, row in zip(labels, values):
+                print(f"Scenario: {label} (Year {args.year})", file=out)
+                for column in COMPARISON_COLUMNS:
+                    print(f"  {column}: {row[args.year - 1, COLUMN_INDEX[column]]:,.2f}", file=out)
+                print(file=out)
+
+
+def command_plot(args):
+    """Plot a results file written by run or sweep into image files, without a display."""
+    import matplotlib
+
+    # Batch jobs have no display; figures are only ever written to files
+    matplotlib.use('Agg')
+    from .simulation_plotter import plot_simulations
+    from .sweep_plotter import plot_sweep, plot_sweep_envelopes, plot_sweep_heatmap, sweep_heatmap
+
+    values, labels, scenario, grid = load_results(args.results)
+    os.makedirs(args.output_dir, exist_ok=True)
+    if scenario is None and args.kind != 'best':
+        raise ValueError(f"--kind {args.kind} needs a results file written by sweep.")
+    if args.kind in ('lines', 'envelope'):
+        # Every combination as lines, or only the band and median of each group
+        color_by = args.color_by or BATCH_SCENARIOS[scenario][-1]
+        if color_by not in grid:
+            raise ValueError(f"Cannot colour by '{color_by}'; the grid parameters are {', '.join(grid)}.")
+        group_values, groups = np.unique(grid[color_by], return_inverse=True)
+        group_labels = [f'{color_by}={value}' for value in group_values]
+        if args.kind == 'lines':
+            plot_sweep(values, os.path.join(args.output_dir, f'{scenario}.{args.image_format}'), groups=groups,
+                       group_labels=group_labels, legend_title=scenario, preview=args.preview,
+                       dpi=args.dpi, max_lines=args.max_lines)
+        else:
+            plot_sweep_envelopes(values, os.path.join(args.output_dir, f'{scenario} - Envelopes.{args.image_format}'),
+                                 groups, group_labels=group_labels, legend_title=scenario, dpi=args.dpi)
+        return
+    if args.kind == 'heatmap':
+        # One table per metric over two grid parameters, the others reduced to their best value
+        if not 1 <= args.year <= values.shape[1]:
+            raise ValueError(f"Year {args.year} is outside the simulated years 1 to {values.shape[1]}.")
+        x_name, y_name = args.axes or tuple(grid)[:2]
+        for name in (x_name, y_name):
+            if name not in grid:
+                raise ValueError(f"Cannot map '{name}'; the grid parameters are {', '.join(grid)}.")
+        if x_name == y_name:
+            raise ValueError("The heatmap axes must be two different grid parameters.")
+        for metric in args.metric or SWEEP_METRICS:
+            reduce = args.reduce if args.reduce != 'best' else 'min' if metric in MINIMIZED_METRICS else 'max'
+            table, x_values, y_values = sweep_heatmap(values, grid, x_name, y_name, metric, args.year, reduce)
+            path = os.path.join(args.output_dir, f'{scenario} - {metric} - Year {args.year}.{args.image_format}')
+            plot_sweep_heatmap(table, x_values, y_values, path, x_name, y_name, metric, args.year, dpi=args.dpi)
+        return
+
+    results = BatchResult(values)
+    if scenario is None:
+        plotted = dict(zip(labels, results))
+    else:
+        # One line per metric's best combination keeps sweep figures readable
+        if not 1 <= args.year <= values.shape[1]:
+            raise ValueError(f"Year {args.year} is outside the simulated years 1 to {values.shape[1]}.")
+        best_per_metric = _sweep_reducers(args.metric, 1, args.year)[0]
+        best_per_metric.update(np.arange(len(values)), values)
+        plotted = {}
+        for metric in best_per_metric.metrics:
+            for index, _ in best_per_metric.best(metric):
+                plotted[f'Best {metric}: {combination_label(grid, index)}'] = results[index]
+    plot_simulations(plotted, args.output_dir)
+
+
+def build_parser():
+    """Build the argument parser of the run, sweep, report and plot subcommands."""
+    parser = argparse.ArgumentParser(prog='python -m mississauga_eab',
+                                     description="Emerald ash borer management simulations for Mississauga.")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    run = subparsers.add_parser('run', help="run every scenario for one management setting")
+    run.add_argument('--profile', default='overall',
+                     help="bundled profile (overall, street, park, consistent), TOML/JSON profile file "
+                          "or parameter module")
+    run.add_argument('--scenario', action='append', help="scenario to keep (repeatable; default: all)")
+    run.add_argument('--removal-rate', type=int, default=400, help="ash trees removed each year")
+    run.add_argument('--removal-year', type=int, default=5, help="year in which ash removals begin")
+    run.add_argument('--injection-years', type=int, default=5, help="number of years ash are injected")
+    run.add_argument('--planting-rate', type=int, default=400, help="new trees planted each year")
+    run.add_argument('--planting-year', type=int, default=1, help="year in which planting starts")
+    run.add_argument('--horizon', type=int, action='append',
+                     help="simulated year of the text report and summary table (repeatable; default: 20)")
+    run.add_argument('--summary', metavar='PATH', help="also write the summary table to this .csv or .parquet file")
+    run.add_argument('--format', choices=RUN_FORMATS, default='text')
+    run.add_argument('--output', help="output file (default: stdout; required for npz)")
+    run.set_defaults(handler=command_run)
+
+    sweep = subparsers.add_parser('sweep', help="run a grid of management settings through the batched kernel")
+    sweep.add_argument('scenario', choices=list(BATCH_SCENARIOS))
+    sweep.add_argument('--profile', default='overall',
+                       help="bundled profile (overall, street, park, consistent), TOML/JSON profile file "
+                            "or parameter module")
+    sweep.add_argument('--grid', action='append', default=[], metavar='NAME=VALUES',
+                       help="grid values, e.g. removal_rate=100,250,500,1000 or removal_year=1:20 (repeatable)")
+    sweep.add_argument('--where', action='append', default=[], metavar='CONSTRAINT',
+                       help="keep only combinations satisfying e.g. removal_year>planting_year (repeatable)")
+    sweep.add_argument('--search', choices=('grid', 'branch-and-bound'), default='grid',
+                       help="simulate every combination, or only search for the best one per metric")
+    sweep.add_argument('--workers', type=int, help="worker processes (default: every CPU)")
+    sweep.add_argument('--checkpoint',
+                       help="append completed chunks to this checkpoint file, deleted once the sweep completes")
+    sweep.add_argument('--resume', action='store_true', help="skip the combinations already in the checkpoint or cube")
+    sweep.add_argument('--no-cache', action='store_true', help="do not read or write the result cache")
+    sweep.add_argument('--cube', metavar='DIR',
+                       help="write every result into a memory-mapped results cube in this directory, "
+                            "which report and plot open in place of a results file")
+    sweep.add_argument('--format', choices=SWEEP_FORMATS, default='text')
+    sweep.add_argument('--output', help="output file (default: stdout; required for npz)")
+    sweep.set_defaults(handler=command_sweep)
+
+    report = subparsers.add_parser('report', help="report on a results file written by run or sweep")
+    report.add_argument('results', help="npz results file or results cube directory")
+    report.add_argument('--format', choices=REPORT_FORMATS, default='text')
+    report.add_argument('--output', help="output file (default: stdout)")
+    report.set_defaults(handler=command_report)
+
+    plot = subparsers.add_parser('plot', help="plot a results file written by run or sweep")
+    plot.add_argument('results', help="npz results file or results cube directory")
+    plot.add_argument('--output-dir', default='.', help="directory the figures are written to")
+    plot.add_argument('--kind', choices=PLOT_KINDS, default='best',
+                      help="sweeps: the best combination per metric, every combination as lines, the "
+                           "min/median/max envelope of each --color-by group, or heatmaps over two grid parameters")
+    plot.add_argument('--color-by', metavar='NAME', help="grid parameter colouring the lines (default: the last one)")
+    plot.add_argument('--axes', nargs=2, metavar=('X', 'Y'),
+                      help="grid parameters of the --kind heatmap axes (default: the first two)")
+    plot.add_argument('--reduce', choices=('best', 'max', 'min'), default='best',
+                      help="how heatmap cells combine the other grid parameters (default: each metric's best)")
+    plot.add_argument('--preview', action='store_true', help="quick low-resolution render of a sample of the lines")
+    plot.add_argument('--max-lines', type=int, help="draw at most this many evenly spread combinations")
+    plot.add_argument('--dpi', type=int, default=SWEEP_DPI,
+                      help=f"resolution of the --kind lines, envelope and heatmap figures (default: {SWEEP_DPI}); "
+                           f"higher is slower")
+    plot.add_argument('--image-format', choices=('jpeg', 'png', 'pdf', 'svg'), default='jpeg',
+                      help="file type of the --kind lines, envelope and heatmap figures")
+    plot.set_defaults(handler=command_plot, top_k=1)
+
+    for subparser in (sweep, report, plot):
+        subparser.add_argument('--year', type=int, default=20, help="simulated year the metrics are evaluated at")
+        subparser.add_argument('--metric', action='append', choices=SWEEP_METRICS,
+                               help="metric to optimize (repeatable; default: all)")
+    for subparser in (sweep, report):
+        subparser.add_argument('--top-k', type=int, default=1, help="best combinations reported per metric")
+    return parser
+
+
+def main(argv=None):
+    """Parse the command line and run the subcommand; returns the exit status."""
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    if getattr(args, 'metric', ()) is None:
+        args.metric = list(SWEEP_METRICS)
+    if getattr(args, 'format', None) == 'npz' and args.output in (None, '-'):
+        parser.error("--format npz needs an --output file")
+    try:
+        args.handler(args)
+    except (ValueError, OSError) as error:
+        print(f"{parser.prog}: error: {error}", file=sys.stderr)
+        return 1
+    return 0
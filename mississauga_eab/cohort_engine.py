@@ -0,0 +1,128 @@
+import numpy as np
+from collections import namedtuple
+from .cost_brackets import CostBrackets
+
+# Totals produced by one yearly update of the non-ash cohorts
+CohortYear = namedtuple('CohortYear', [
+    'tree_count',         # Surviving non-ash trees after this year's mortality
+    'total_diameter',     # Sum of diameter * count over all cohorts, for averaging
+    'removal_cost',       # Removal cost of dead trees summed over every cohort aged 3 or more
+    'last_removal_cost',  # Removal cost of the youngest cohort aged 3 or more (the last one visited)
+    'replanting_cost',    # Replanting cost of dead trees summed over every cohort
+])
+
+
+def mortality_rates_array(mortality_rates_by_age, background_mortality_rate, years):
+    """Expand the mortality-by-age dictionary into an array indexed by cohort age."""
+    max_age = max([years] + list(mortality_rates_by_age))
+
+    # The final slot holds the background rate and catches every age beyond the table
+    mortality_table = np.full(max_age + 2, background_mortality_rate, dtype=float)
+    for age, mortality_rate in mortality_rates_by_age.items():
+        if age >= 0:
+            mortality_table[age] = mortality_rate
+    return mortality_table
+
+
+def vectorize_cost_lookup(get_cost_by_dbh):
+    """Wrap a scalar DBH cost lookup so it accepts an array of diameters.
+
+    Compiled CostBrackets already accept arrays and are returned unchanged.
+    """
+    if isinstance(get_cost_by_dbh, CostBrackets):
+        return get_cost_by_dbh
+
+    def lookup(diameters):
+        diameters = np.asarray(diameters, dtype=float)
+        costs = [get_cost_by_dbh(dbh) for dbh in diameters.ravel()]
+        return np.array(costs, dtype=float).reshape(diameters.shape)
+    return lookup
+
+
+class CohortStore:
+    """Non-ash tree cohorts held as parallel age, count and diameter arrays.
+
+    Cohorts are kept in planting order (oldest first), matching the list of
+    {'age', 'count', 'diameter'} dicts the simulations used previously, and
+    cohorts with no surviving trees are dropped at the end of each year.
+    """
+
+    def __init__(self, capacity=32):
+        self.ages = np.zeros(capacity, dtype=np.int64)
+        self.counts = np.zeros(capacity, dtype=np.int64)
+        self.diameters = np.zeros(capacity, dtype=float)
+        self.size = 0
+
+    def __len__(self):
+        return self.size
+
+    def plant(self, count, diameter):
+        """Add a new cohort of age 0 behind the existing cohorts."""
+        if self.size == len(self.ages):
+            self._grow()
+        self.ages[self.size] = 0
+        self.counts[self.size] = count
+        self.diameters[self.size] = diameter
+        self.size += 1
+
+    def _grow(self):
+        capacity = 2 * len(self.ages)
+        for name in ('ages', 'counts', 'diameters'):
+            column = getattr(self, name)
+            grown = np.zeros(capacity, dtype=column.dtype)
+            grown[:self.size] = column[:self.size]
+            setattr(self, name, grown)
+
+    def advance(self, growth_rate_new, mortality_table, inflation_factor, tree_planting_and_establishment_expense,
+                removal_cost_lookup, charge_young_replanting=False):
+        """Age, grow and thin every cohort by one year and return the year's CohortYear totals.
+
+        Trees dying at age 3 or more are removed and replanted at cost. Younger trees are
+        replaced under warranty unless charge_young_replanting is set.
+        """
+        if self.size == 0:
+            return CohortYear(0, 0.0, 0.0, 0.0, 0.0)
+
+        ages = self.ages[:self.size]
+        counts = self.counts[:self.size]
+        diameters = self.diameters[:self.size]
+
+        # Increment age and diameter for each cohort
+        ages += 1
+        diameters += growth_rate_new
+
+        # Apply age-based mortality with the same integer truncation as int(count * rate)
+        mortality_rates = mortality_table[np.minimum(ages, len(mortality_table) - 1)]
+        dead_trees = (counts * mortality_rates).astype(np.int64)
+        counts -= dead_trees
+
+        # Removal costs only apply to cohorts past the warranty period
+        charged = ages >= 3
+        removal_costs = np.zeros(self.size, dtype=float)
+        if charged.any():
+            removal_costs[charged] = (dead_trees[charged] * removal_cost_lookup(diameters[charged])
+                                      * inflation_factor)
+        replanted = dead_trees if charge_young_replanting else dead_trees * charged
+        replanting_cost = float(replanted.sum()) * tree_planting_and_establishment_expense * inflation_factor
+
+        # Cohorts are ordered oldest first, so the last charged cohort is the youngest one aged 3 or more
+        charged_index = np.flatnonzero(charged)
+        last_removal_cost = float(removal_costs[charged_index[-1]]) if len(charged_index) else 0.0
+
+        year = CohortYear(
+            tree_count=int(counts.sum()),
+            total_diameter=float(np.dot(diameters, counts)),
+            removal_cost=float(removal_costs.sum()),
+            last_removal_cost=last_removal_cost,
+            replanting_cost=replanting_cost,
+        )
+
+        # Retain surviving cohorts only
+        surviving = counts > 0
+        n_surviving = int(surviving.sum())
+        if n_surviving < self.size:
+            self.ages[:n_surviving] = ages[surviving]
+            self.counts[:n_surviving] = counts[surviving]
+            self.diameters[:n_surviving] = diameters[surviving]
+            self.size = n_surviving
+        return year
@@ -0,0 +1,46 @@
+import numpy as np
+
+
+class CostBrackets:
+    """DBH cost brackets compiled into sorted breakpoint arrays.
+
+    Each bracket (min DBH, max DBH, cost) covers min < DBH <= max. The table is
+    validated once when it is compiled; lookups accept a scalar DBH or an array of
+    diameters and raise ValueError if any diameter falls outside every bracket.
+    """
+
+    def __init__(self, cost_ranges):
+        if len(cost_ranges) == 0:
+            raise ValueError("Cost ranges must define at least one DBH bracket.")
+        brackets = sorted(cost_ranges, key=lambda bracket: bracket[0])
+        for min_dbh, max_dbh, cost in brackets:
+            if not min_dbh < max_dbh:
+                raise ValueError(f"Cost bracket ({min_dbh}, {max_dbh}, {cost}) has min DBH not below max DBH.")
+        for (_, max_dbh, _), (next_min_dbh, _, _) in zip(brackets, brackets[1:]):
+            if next_min_dbh < max_dbh:
+                raise ValueError(f"Cost brackets overlap between DBH {next_min_dbh} and {max_dbh}.")
+
+        self.cost_ranges = tuple(tuple(bracket) for bracket in brackets)
+        self.lower_bounds = np.array([bracket[0] for bracket in brackets], dtype=float)
+        self.upper_bounds = np.array([bracket[1] for bracket in brackets], dtype=float)
+        self.costs = np.array([bracket[2] for bracket in brackets], dtype=float)
+
+    def __call__(self, dbh):
+        """Get the cost for a DBH or an array of DBH values, with error if out of range."""
+        diameters = np.asarray(dbh, dtype=float)
+
+        # First bracket whose upper bound is at or above the diameter
+        index = np.searchsorted(self.upper_bounds, diameters, side='left')
+        clipped = np.minimum(index, len(self.costs) - 1)
+        in_range = (index < len(self.costs)) & (diameters > self.lower_bounds[clipped])
+        if not np.all(in_range):
+            outside = diameters[~in_range] if diameters.ndim else diameters
+            raise ValueError(f"DBH value {np.ravel(outside)[0]} falls outside defined cost ranges.")
+
+        costs = self.costs[clipped]
+        return costs.item() if costs.ndim == 0 else costs
+
+
+def compile_cost_brackets(cost_ranges):
+    """Compile a list of (min DBH, max DBH, cost) ranges into a vectorized cost lookup."""
+    return CostBrackets(cost_ranges)
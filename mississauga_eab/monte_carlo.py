@@ -0,0 +1,76 @@
+import os
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+from .batch_kernel import MODEL_PARAMETERS, BATCH_SCENARIOS, KernelModel, initial_state, advance_year
+from .result_buffers import COLUMNS, SimulationResult, BatchResult
+
+# Replicates simulated together by one random stream; fixed so results do not depend on the number of workers
+REPLICATE_CHUNK_SIZE = 1024
+
+
+def _simulate_replicates(scenario, parameters, grid, replicates, seed_sequence):
+    # Worker entry point: run one chunk of replicates of a single combination with binomial mortality
+    model = KernelModel(parameters)
+    rng = np.random.default_rng(seed_sequence)
+    state = initial_state(model, replicates)
+    grid = {name: np.full(replicates, value, dtype=np.int64) for name, value in grid.items()}
+    values = np.empty((replicates, model.years, len(COLUMNS)))
+    for year in range(1, model.years + 1):
+        values[:, year - 1] = advance_year(scenario, model, state, grid, rng)
+    return values
+
+
+class MonteCarloResult:
+    """Percentile bands of every output column over the replicates of a stochastic simulation.
+
+    Indexing with a percentile returns a SimulationResult of that band, e.g. result[50]
+    is the year-by-year median. The raw replicates are kept as a BatchResult.
+    """
+
+    def __init__(self, percentiles, values):
+        self.percentiles = tuple(percentiles)
+        self.replicates = BatchResult(values)
+        self.bands = np.percentile(values, self.percentiles, axis=0)
+
+    def __getitem__(self, percentile):
+        return SimulationResult(values=self.bands[self.percentiles.index(percentile)])
+
+    def band(self, column, low, high):
+        """Return the (low, high) percentile arrays of one column over the simulated years."""
+        return self[low][column], self[high][column]
+
+    def mean(self, column):
+        """Return the mean of one column over the replicates, for each simulated year."""
+        return self.replicates.column(column).mean(axis=0)
+
+
+def simulate_monte_carlo(scenario, parameters, replicates=1000, seed=None, percentiles=(5, 50, 95), workers=1,
+                         **grid):
+    """Run many stochastic replicates of one management combination as batched array computations.
+
+    Deaths of injected ash and of non-ash cohorts are drawn from binomial distributions
+    with the deterministic rates as probabilities. Replicates are simulated in chunks of
+    REPLICATE_CHUNK_SIZE, each with its own stream spawned from `seed`, so a seed always
+    reproduces the same replicates whatever the number of worker processes.
+
+    The grid parameters of the scenario (see BATCH_SCENARIOS) are given as scalars.
+    Returns a MonteCarloResult with the requested percentile bands.
+    """
+    if scenario not in BATCH_SCENARIOS:
+        raise ValueError(f"Scenario '{scenario}' is not supported by the batched kernel.")
+    missing = [name for name in BATCH_SCENARIOS[scenario] if name not in grid]
+    if missing:
+        raise ValueError(f"Scenario '{scenario}' requires grid parameters: {', '.join(missing)}")
+    grid = {name: int(grid[name]) for name in BATCH_SCENARIOS[scenario]}
+    parameters = {name: parameters[name] for name in MODEL_PARAMETERS}
+
+    sizes = [min(REPLICATE_CHUNK_SIZE, replicates - start) for start in range(0, replicates, REPLICATE_CHUNK_SIZE)]
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+    workers = workers or os.cpu_count() or 1
+    if workers == 1 or len(sizes) == 1:
+        chunks = [_simulate_replicates(scenario, parameters, grid, size, seed) for size, seed in zip(sizes, seeds)]
+    else:
+        with ProcessPoolExecutor(max_workers=min(workers, len(sizes))) as executor:
+            chunks = list(executor.map(_simulate_replicates, [scenario] * len(sizes), [parameters] * len(sizes),
+                                       [grid] * len(sizes), sizes, seeds))
+    return MonteCarloResult(percentiles, np.concatenate(chunks))
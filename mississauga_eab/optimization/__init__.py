@@ -0,0 +1 @@
+"""Management option optimization: grid sweeps, their reducers, policy search and yearly schedules."""
@@ -0,0 +1,148 @@
+import numpy as np
+from collections import namedtuple
+from math import pi
+from ..batch_kernel import BATCH_SCENARIOS, KernelModel, initial_state, advance_year, prefix_groups, simulate_batch
+from ..result_buffers import COLUMN_INDEX
+
+# Outcome of a policy search
+PolicySearchResult = namedtuple('PolicySearchResult', [
+    'index',              # Grid index of the best combination (the first one in grid order on ties)
+    'value',              # Value of the metric for that combination at the evaluated year
+    'simulated_years',    # Combination-years actually simulated, counting shared prefixes once
+    'exhaustive_years',   # Combination-years an exhaustive grid simulation would have run
+])
+
+# Metrics the search can optimize, and whether lower values are better
+SEARCH_METRICS = {
+    'Total Tree Count': False,
+    'Total Tree Basal Area': False,
+    'Cumulative Costs': True,
+    'CTLA Value of All Trees': False,
+    'Net Value of All Trees': False,
+}
+
+# Combinations simulated in full up front to give the search its first incumbent
+INCUMBENT_SAMPLE = 64
+
+
+def _group_reduce(function, initial, group, values, n_groups):
+    # Reduce member values into one value per group
+    reduced = np.full(n_groups, initial, dtype=float)
+    function.at(reduced, group, values)
+    return reduced
+
+
+def _bounds(scenario, model, state, rows, group, grid, horizon):
+    """Optimistic bounds on every group's year-`horizon` metrics from its state at the end of state.year.
+
+    Ash and cohort tree counts can only fall, while every diameter follows a fixed growth
+    path, so surviving trees are bounded by their current counts at their final size.
+    Summing basal area per cohort bounds the average-diameter basal area the simulation
+    reports (by Jensen's inequality). Trees planted later are bounded by the largest
+    planting the group's members allow, at the size of a tree planted next year. Costs
+    only accumulate, so the cumulative cost so far bounds the final cumulative cost.
+    """
+    year = state.year
+    n_groups = len(state)
+    remaining_years = horizon - year
+
+    # Surviving ash and non-ash trees at their final diameters
+    ash_diameter = state.average_diameter_ash + model.growth_rate * remaining_years
+    ash_tree_count = state.ash_tree_count
+    ash_area = pi * (ash_diameter / 2) ** 2 * ash_tree_count
+    cohort_diameters = state.cohort_diameters[:year] + model.growth_rate_new * remaining_years
+    counts = state.cohort_counts[:, :year]
+    non_ash_tree_count = counts.sum(axis=1)
+    non_ash_area = (counts * (pi * (cohort_diameters / 2) ** 2)).sum(axis=1)
+
+    # Largest trees planted in future years: planted in year y, they reach this diameter by the horizon
+    future_years = np.arange(year + 1, horizon + 1)
+    future_areas = pi * ((model.starting_diameter_new + model.growth_rate_new * (horizon - future_years + 1)) / 2) ** 2
+    if 'planting_rate' in grid:
+        # Each future planting year plants at most the group's largest planting rate
+        rate = np.minimum(_group_reduce(np.maximum, 0, group, grid['planting_rate'], n_groups),
+                          model.starting_ash_trees)
+        if 'planting_year' in grid:
+            first_year = _group_reduce(np.minimum, np.inf, group, grid['planting_year'], n_groups)
+        else:
+            first_year = np.full(n_groups, year + 1)
+        planting_years = future_years >= first_year[:, None]
+        future_tree_count = rate * planting_years.sum(axis=1)
+        future_area = rate * (planting_years * future_areas).sum(axis=1)
+    else:
+        # Every planted tree replaces an ash tree, so at most the remaining ash trees are planted
+        future_tree_count = ash_tree_count
+        future_area = ash_tree_count * (future_areas[0] if len(future_areas) else 0.0)
+
+    inflation_factor = state.inflation_factor * (1 + model.annual_inflation_rate) ** (remaining_years - 1)
+    ctla_rate = (model.planting_expense * inflation_factor) / ((model.starting_diameter_new / 2) ** 2)
+    ctla_value = ctla_rate * (model.depreciation_ash * ash_area
+                              + model.depreciation_non_ash * (non_ash_area + future_area))
+    cumulative_costs = rows[:, COLUMN_INDEX['Cumulative Costs']]
+    return {
+        'Total Tree Count': ash_tree_count + non_ash_tree_count + future_tree_count,
+        'Total Tree Basal Area': ash_area + non_ash_area + future_area,
+        'Cumulative Costs': cumulative_costs,
+        'CTLA Value of All Trees': ctla_value,
+        'Net Value of All Trees': ctla_value - cumulative_costs,
+    }
+
+
+def branch_and_bound(scenario, parameters, grid, metric='Net Value of All Trees', year=None):
+    """Find the grid combination with the best value of a metric without simulating the whole grid.
+
+    Combinations are advanced together through the prefix tree of simulate_batch, one
+    year at a time. After each year every group of combinations that still shares a
+    trajectory gets an optimistic bound on the metric at `year` (the final year by
+    default); groups that cannot match the best complete combination found so far are
+    dropped. The first incumbent comes from simulating a spread sample of the grid.
+
+    Returns a PolicySearchResult with the same best combination an exhaustive scan in
+    grid order would pick.
+    """
+    if metric not in SEARCH_METRICS:
+        raise ValueError(f"Metric '{metric}' cannot be optimized by the policy search.")
+    names = BATCH_SCENARIOS[scenario]
+    grid = dict(zip(names, np.broadcast_arrays(
+        *[np.atleast_1d(np.asarray(grid[name], dtype=np.int64)) for name in names])))
+    n_combinations = len(grid[names[0]])
+    model = KernelModel(parameters)
+    horizon = model.years if year is None else year
+    if not 1 <= horizon <= model.years:
+        raise ValueError(f"Year {horizon} is outside the simulated years 1 to {model.years}.")
+
+    # Scores are negated for minimized metrics so that higher is always better
+    sign = -1 if SEARCH_METRICS[metric] else 1
+
+    # Incumbent from a sample of complete combinations spread across the grid
+    sample = np.unique(np.linspace(0, n_combinations - 1, min(n_combinations, INCUMBENT_SAMPLE)).astype(np.int64))
+    sample_results = simulate_batch(scenario, parameters, **{name: values[sample] for name, values in grid.items()})
+    incumbent = (sign * sample_results.at_year(metric, horizon)).max()
+    simulated_years = len(sample) * horizon
+
+    alive = np.arange(n_combinations)
+    state = initial_state(model, 1)
+    group = np.zeros(n_combinations, dtype=np.int64)
+    for step_year in range(1, horizon + 1):
+        alive_grid = {name: values[alive] for name, values in grid.items()}
+        next_group, representatives = prefix_groups(scenario, alive_grid, step_year)
+        state = state.take(group[representatives])
+        rows = advance_year(scenario, model, state, {name: values[representatives]
+                                                     for name, values in alive_grid.items()})
+        simulated_years += len(representatives)
+        if step_year == horizon:
+            break
+
+        # Drop every group whose bound cannot reach the incumbent, allowing for rounding in the bound
+        bound = sign * _bounds(scenario, model, state, rows, next_group, alive_grid, horizon)[metric]
+        keep = bound >= incumbent - 1e-9 * max(1.0, abs(incumbent))
+        members = keep[next_group]
+        alive = alive[members]
+        group = (np.cumsum(keep) - 1)[next_group[members]]
+        state = state.take(np.flatnonzero(keep))
+
+    # Every surviving combination is now complete; ties go to the first one in grid order
+    scores = sign * rows[next_group, COLUMN_INDEX[metric]]
+    best = np.lexsort((alive, -scores))[0]
+    return PolicySearchResult(int(alive[best]), float(rows[next_group[best], COLUMN_INDEX[metric]]),
+                              simulated_years, n_combinations * horizon)
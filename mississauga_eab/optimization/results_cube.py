@@ -0,0 +1,93 @@
+import os
+import numpy as np
+from ..batch_kernel import BATCH_SCENARIOS
+from ..result_buffers import COLUMNS, BatchResult
+
+# Files of a cube directory: the results, the completed-combination flags and the grid index
+VALUES_FILE = 'values.npy'
+FILLED_FILE = 'filled.npy'
+INDEX_FILE = 'index.npz'
+
+
+class ResultsCube(BatchResult):
+    """Sweep results held in a memory-mapped (combinations x years x COLUMNS) cube on disk.
+
+    A cube is a directory holding values.npy, the float64 results; filled.npy, one flag
+    per combination set once its results are written; and index.npz, the sidecar index
+    naming the scenario, the fingerprint of the model parameters and the output columns
+    with the typed grid coordinate of every combination. Both .npy files are opened with np.load(mmap_mode=...), so reopening a
+    cube reads nothing but the headers and slicing it is zero-copy; pages are only read
+    as they are touched, so cubes larger than RAM can be filled and analysed.
+
+    Worker processes write their chunks straight into the values file with write_chunk;
+    the sweeping process then marks the chunk complete with mark_filled, so a sweep
+    that is interrupted can be resumed from the combinations still unfilled.
+    """
+
+    def __init__(self, path, values, filled, scenario, grid, parameters_key=''):
+        super().__init__(values)
+        self.path = path
+        self.filled = filled
+        self.scenario = scenario
+        self.grid = grid
+        self.parameters_key = parameters_key
+
+    @classmethod
+    def create(cls, path, scenario, grid, years, parameters_key=''):
+        """Allocate an empty cube for every combination of a sweep grid.
+
+        The values file is created sparse at its full size, so no memory or disk is used
+        for combinations until they are written.
+        """
+        names = BATCH_SCENARIOS[scenario]
+        grid = {name: np.asarray(grid[name]) for name in names}
+        n_combinations = len(grid[names[0]])
+        os.makedirs(path, exist_ok=True)
+        values = np.lib.format.open_memmap(os.path.join(path, VALUES_FILE), mode='w+', dtype=np.float64,
+                                           shape=(n_combinations, years, len(COLUMNS)))
+        filled = np.lib.format.open_memmap(os.path.join(path, FILLED_FILE), mode='w+', dtype=np.bool_,
+                                           shape=(n_combinations,))
+        filled.flush()
+        # The index is written last, so a directory without one is never mistaken for a cube
+        with open(os.path.join(path, INDEX_FILE), 'wb') as f:
+            np.savez(f, scenario=np.array(scenario), parameters_key=np.array(parameters_key), columns=np.array(COLUMNS),
+                     **{f'grid_{name}': grid_values for name, grid_values in grid.items()})
+        return cls(path, values, filled, scenario, grid, parameters_key)
+
+    @classmethod
+    def open(cls, path, mode='r'):
+        """Open an existing cube without reading its results; mode='r+' allows filling it further."""
+        if not os.path.exists(os.path.join(path, INDEX_FILE)):
+            raise ValueError(f"'{path}' is not a results cube: {INDEX_FILE} is missing.")
+        with np.load(os.path.join(path, INDEX_FILE)) as index:
+            if tuple(index['columns']) != COLUMNS:
+                raise ValueError(f"Results cube '{path}' was written with different output columns.")
+            scenario = str(index['scenario'])
+            grid = {name: index[f'grid_{name}'] for name in BATCH_SCENARIOS[scenario]}
+            parameters_key = str(index['parameters_key']) if 'parameters_key' in index else ''
+        values = np.load(os.path.join(path, VALUES_FILE), mmap_mode=mode)
+        filled = np.load(os.path.join(path, FILLED_FILE), mmap_mode=mode)
+        return cls(path, values, filled, scenario, grid, parameters_key)
+
+    def matches(self, scenario, grid, years, parameters_key):
+        """Whether the cube was allocated for exactly this sweep and model parameters, so it can be resumed."""
+        return (self.scenario == scenario and self.values.shape[1] == years
+                and self.parameters_key == parameters_key
+                and all(np.array_equal(self.grid[name], grid[name]) for name in BATCH_SCENARIOS[scenario]))
+
+    def pending(self):
+        """Grid indices whose results have not been written yet."""
+        return np.flatnonzero(~np.asarray(self.filled))
+
+    def mark_filled(self, indices):
+        """Record that the results of these grid indices are on disk."""
+        self.values.flush()
+        self.filled[indices] = True
+        self.filled.flush()
+
+    @staticmethod
+    def write_chunk(path, indices, values):
+        """Write the results of a chunk of grid indices into the cube at path, from any process."""
+        cube = np.load(os.path.join(path, VALUES_FILE), mmap_mode='r+')
+        cube[indices] = values
+        cube.flush()
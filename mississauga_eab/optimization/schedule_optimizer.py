@@ -0,0 +1,123 @@
+import numpy as np
+from collections import namedtuple
+from ..batch_kernel import KernelModel, initial_state, advance_year
+from ..result_buffers import COLUMN_INDEX, SimulationResult
+
+# Best yearly schedule found by the optimizer
+ScheduleResult = namedtuple('ScheduleResult', [
+    'removal_rates',   # Ash trees to remove in each year (0 means the ash are injected that year)
+    'planting_rates',  # Non-ash trees to plant in each year
+    'value',           # Net Value of All Trees at the final year
+    'results',         # SimulationResult of the schedule
+    'states',          # Largest number of memoized states carried between two years
+])
+
+
+def replay_schedule(parameters, removal_rates, planting_rates):
+    """Simulate one yearly schedule and return its SimulationResult."""
+    model = KernelModel(parameters)
+    state = initial_state(model, 1)
+    results = SimulationResult(len(removal_rates))
+    for year, (removal_rate, planting_rate) in enumerate(zip(removal_rates, planting_rates), start=1):
+        row = advance_year('Yearly Schedule', model, state, {'removal_rate': np.array([removal_rate]),
+                                                             'planting_rate': np.array([planting_rate])})
+        results.values[year - 1] = row[0]
+    return results
+
+
+def _ash_keys(state):
+    # The ash DBH is the same for every state in a year, so the ash count alone determines the ash future
+    return state.ash_tree_count[:, None]
+
+
+def _cohort_keys(tree_resolution, diameter_resolution):
+    # Aggregated cohort state: non-ash count and mean non-ash DBH, discretized
+    def keys(state):
+        non_ash_tree_count = state.cohort_counts.sum(axis=1)
+        total_diameter_non_ash = (state.cohort_counts * state.cohort_diameters).sum(axis=1)
+        mean_diameter_non_ash = total_diameter_non_ash / np.maximum(non_ash_tree_count, 1)
+        return np.column_stack([non_ash_tree_count // tree_resolution,
+                                np.floor(mean_diameter_non_ash / diameter_resolution).astype(np.int64)])
+    return keys
+
+
+def _memoized_search(model, removal_options, planting_options, state_keys):
+    """Forward dynamic program over yearly decisions.
+
+    removal_options and planting_options list the allowed values for each year. Each
+    year every kept state is advanced by every decision at once through the batched
+    kernel, and only the state with the highest Net Value so far is kept per key.
+    Returns the per-year removal and planting arrays of the best final state and the
+    largest number of states kept.
+    """
+    state = initial_state(model, 1)
+    parents, decisions = [], []
+    largest = 1
+    for removal_rates, planting_rates in zip(removal_options, planting_options):
+        actions = np.array([(removal_rate, planting_rate) for removal_rate in removal_rates
+                            for planting_rate in planting_rates], dtype=np.int64)
+        n_actions, n_states = len(actions), len(state)
+        state = state.take(np.repeat(np.arange(n_states), n_actions))
+        action = np.tile(np.arange(n_actions), n_states)
+        rows = advance_year('Yearly Schedule', model, state, {'removal_rate': actions[action, 0],
+                                                              'planting_rate': actions[action, 1]})
+
+        # Memoize: keep the best state for each key, the first expanded one on ties
+        values = rows[:, COLUMN_INDEX['Net Value of All Trees']]
+        _, bucket = np.unique(state_keys(state), axis=0, return_inverse=True)
+        bucket = bucket.ravel()
+        order = np.lexsort((np.arange(len(values)), -values, bucket))
+        first = np.ones(len(order), dtype=bool)
+        first[1:] = bucket[order[1:]] != bucket[order[:-1]]
+        kept = order[first]
+
+        parents.append(kept // n_actions)
+        decisions.append(actions[action[kept]])
+        state = state.take(kept)
+        largest = max(largest, len(kept))
+        final_values = values[kept]
+
+    # Trace the best final state back through the kept parents
+    best = int(np.argmax(final_values))
+    schedule = []
+    for year in range(len(decisions) - 1, -1, -1):
+        schedule.append(decisions[year][best])
+        best = parents[year][best]
+    schedule = np.array(schedule[::-1])
+    return schedule[:, 0], schedule[:, 1], largest
+
+
+def optimize_schedule(parameters, removal_rates, planting_rates, years=None, tree_resolution=10,
+                      diameter_resolution=0.5):
+    """Find the year-by-year removal and planting schedule that maximizes Net Value of All Trees.
+
+    In the 'Yearly Schedule' model the Net Value splits into an ash part (ash removal,
+    injection and pruning costs and the ash CTLA value) and a non-ash part (planting,
+    cohort removal and pruning costs and the non-ash CTLA value), and neither part
+    depends on the other's decisions. The two schedules are therefore solved in turn by
+    dynamic programming instead of enumerating (decisions ** years) schedules:
+
+    - removals, over the exact ash count, which with the year fixes the whole ash
+      future, so this step is exact;
+    - planting, with the removals fixed, over the cohorts aggregated into non-ash count
+      (tree_resolution trees per step) and mean non-ash DBH (diameter_resolution cm per
+      step). States sharing a step face almost the same future, and only the one with
+      the highest Net Value so far is kept. Coarser steps are faster but may miss the
+      optimum by a little.
+
+    A removal rate of 0 means the remaining ash are injected that year instead.
+    Returns a ScheduleResult.
+    """
+    model = KernelModel(parameters)
+    years = model.years if years is None else years
+    if not 1 <= years <= model.years:
+        raise ValueError(f"Schedules can span 1 to the {model.years} simulated years, not {years}.")
+
+    removal_schedule, _, ash_states = _memoized_search(model, [removal_rates] * years, [[0]] * years, _ash_keys)
+    _, planting_schedule, cohort_states = _memoized_search(
+        model, [[removal_rate] for removal_rate in removal_schedule], [planting_rates] * years,
+        _cohort_keys(tree_resolution, diameter_resolution))
+
+    results = replay_schedule(parameters, removal_schedule, planting_schedule)
+    return ScheduleResult(removal_schedule, planting_schedule, float(results.value('Net Value of All Trees', years)),
+                          results, max(ash_states, cohort_states))
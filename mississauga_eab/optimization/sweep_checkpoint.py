@@ -0,0 +1,89 @@
+import os
+import numpy as np
+
+
+class SweepCheckpoint:
+    """Append-only on-disk log of the completed chunks of a parameter sweep.
+
+    The file is a sequence of .npy records: a header naming the scenario, the simulated
+    years, a fingerprint of the model parameters and the grid parameters, then one
+    (grid points, results) record pair per completed chunk. Every pair is flushed and
+    synced to disk before the sweep moves on, so after a crash, OOM or Ctrl-C all chunks
+    written so far can be read back. A log written for other model parameters is
+    rejected, and a torn record at the end of the file is discarded when the log is
+    reopened with resume. Once the sweep completes the log is no longer needed and is
+    removed.
+    """
+
+    def __init__(self, path, scenario, names, years, parameters_key):
+        self.path = path
+        self.header = np.array([scenario, str(years), parameters_key] + list(names))
+        self._file = None
+        self._end = None
+
+    def completed(self):
+        """Yield the (grid points, results) chunks already in the log, one at a time.
+
+        Only one chunk is held in memory at once. Reading to the end records where the
+        last complete record stops, which open(resume=True) keeps.
+        """
+        self._end = None
+        if not os.path.exists(self.path):
+            return
+        with open(self.path, 'rb') as f:
+            try:
+                header = np.load(f)
+            except (EOFError, ValueError):
+                return
+            if not np.array_equal(header, self.header):
+                raise ValueError(f"Checkpoint '{self.path}' was written for a different sweep or different model "
+                                 f"parameters: {', '.join(header)}. Remove it or run without resume.")
+            self._end = f.tell()
+            while True:
+                try:
+                    points = np.load(f)
+                    values = np.load(f)
+                except (EOFError, ValueError):
+                    break
+                self._end = f.tell()
+                yield points, values
+
+    def open(self, resume=False):
+        """Open the log for appending.
+
+        With resume, a readable log at path is kept up to its last complete record (read
+        it with completed() first); otherwise, or if there is none, a new log is started.
+        """
+        if resume and self._end is None:
+            for _ in self.completed():
+                pass
+        if resume and self._end is not None:
+            # Drop anything after the last complete record, e.g. a write cut short by a crash
+            with open(self.path, 'r+b') as f:
+                f.truncate(self._end)
+            self._file = open(self.path, 'ab')
+            return
+
+        self._file = open(self.path, 'wb')
+        self._append(self.header)
+
+    def _append(self, *arrays):
+        for array in arrays:
+            np.save(self._file, array)
+        self._file.flush()
+        os.fsync(self._file.fileno())
+
+    def append(self, points, values):
+        """Record the results of a completed chunk of grid points."""
+        self._append(points, values)
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def remove(self):
+        """Close and delete the log, once every chunk of the sweep is complete."""
+        self.close()
+        if os.path.exists(self.path):
+            os.remove(self.path)
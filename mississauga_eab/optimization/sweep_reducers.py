@@ -0,0 +1,127 @@
+import numpy as np
+from ..result_buffers import COLUMN_INDEX
+
+
+class BestPerMetric:
+    """Running top-k grid combinations for each metric at one simulated year.
+
+    Chunks of sweep results are consumed with update() as they complete; only the k
+    best values and their grid indices are kept per metric, so memory stays constant
+    in the number of grid points. Metrics listed in `minimize` are ranked lowest first,
+    all others highest first. Ties go to the lowest grid index, matching a scan over
+    the combinations in grid order that only replaces the best on a strict improvement.
+    """
+
+    def __init__(self, metrics, k=1, year=20, minimize=('Cumulative Costs',)):
+        self.metrics = list(metrics)
+        self.k = k
+        self.year = year
+        self.minimize = set(minimize)
+        self._indices = {metric: np.zeros(0, dtype=np.int64) for metric in self.metrics}
+        self._scores = {metric: np.zeros(0) for metric in self.metrics}
+        self.count = 0
+
+    def update(self, indices, values):
+        """Consume a chunk of results: values has shape (len(indices), years, COLUMNS)."""
+        indices = np.asarray(indices, dtype=np.int64)
+        self.count += len(indices)
+        if not 1 <= self.year <= values.shape[1]:
+            return
+        for metric in self.metrics:
+            # Scores are negated for minimized metrics so that higher is always better
+            scores = values[:, self.year - 1, COLUMN_INDEX[metric]]
+            if metric in self.minimize:
+                scores = -scores
+            valid = ~np.isnan(scores)
+            scores = np.concatenate([self._scores[metric], scores[valid]])
+            candidates = np.concatenate([self._indices[metric], indices[valid]])
+
+            if len(scores) > self.k:
+                # Keep everything tied with the k-th best so ties can be broken by grid index
+                threshold = np.partition(scores, len(scores) - self.k)[len(scores) - self.k]
+                keep = scores >= threshold
+                scores, candidates = scores[keep], candidates[keep]
+            order = np.lexsort((candidates, -scores))[:self.k]
+            self._scores[metric], self._indices[metric] = scores[order], candidates[order]
+
+    def best(self, metric):
+        """Return up to k (grid index, value) pairs for a metric, best first."""
+        sign = -1 if metric in self.minimize else 1
+        return [(int(index), sign * float(score))
+                for index, score in zip(self._indices[metric], self._scores[metric])]
+
+
+def pareto_front(costs, values):
+    """Return the positions of the points no other point dominates, ordered by cost.
+
+    A point is dominated if another costs no more and is worth no less, and is strictly
+    better in one of the two. Once the points are sorted by cost (ties by value, highest
+    first) a point is on the frontier exactly when its value beats every point before
+    it, so a single running-maximum pass finds the skyline in O(n log n). Of identical
+    points only the first is kept; points with a NaN cost or value are ignored.
+    """
+    costs = np.asarray(costs, dtype=float)
+    values = np.asarray(values, dtype=float)
+    candidates = np.flatnonzero(~(np.isnan(costs) | np.isnan(values)))
+    order = candidates[np.lexsort((candidates, -values[candidates], costs[candidates]))]
+
+    sorted_values = values[order]
+    best_before = np.concatenate([[-np.inf], np.maximum.accumulate(sorted_values)[:-1]])
+    return order[sorted_values > best_before]
+
+
+class ParetoFrontier:
+    """Running cost-versus-value Pareto frontier of sweep results at one simulated year.
+
+    Chunks are consumed with update() as they complete. Only the current frontier is
+    kept, and merging it with each chunk's points gives the frontier of everything seen
+    so far, since a point dominated within a subset is dominated overall.
+    """
+
+    def __init__(self, cost_metric='Cumulative Costs', value_metric='CTLA Value of All Trees', year=20):
+        self.cost_metric = cost_metric
+        self.value_metric = value_metric
+        self.year = year
+        self._indices = np.zeros(0, dtype=np.int64)
+        self._costs = np.zeros(0)
+        self._values = np.zeros(0)
+        self.count = 0
+
+    def update(self, indices, values):
+        """Consume a chunk of results: values has shape (len(indices), years, COLUMNS)."""
+        indices = np.asarray(indices, dtype=np.int64)
+        self.count += len(indices)
+        if not 1 <= self.year <= values.shape[1]:
+            return
+        candidates = np.concatenate([self._indices, indices])
+        costs = np.concatenate([self._costs, values[:, self.year - 1, COLUMN_INDEX[self.cost_metric]]])
+        metric_values = np.concatenate([self._values, values[:, self.year - 1, COLUMN_INDEX[self.value_metric]]])
+
+        # Order by grid index first so identical points resolve to the earliest combination
+        by_index = np.argsort(candidates, kind='stable')
+        front = by_index[pareto_front(costs[by_index], metric_values[by_index])]
+        self._indices, self._costs, self._values = candidates[front], costs[front], metric_values[front]
+
+    def frontier(self):
+        """Return the frontier as (grid index, cost, value) tuples, cheapest first."""
+        return [(int(index), float(cost), float(value))
+                for index, cost, value in zip(self._indices, self._costs, self._values)]
+
+
+class YearValues:
+    """Every combination's row of results at one simulated year, in grid order.
+
+    Keeps a (combinations x COLUMNS) array instead of the full (combinations x years x
+    COLUMNS) results, so per-combination tables can be written from a streamed sweep.
+    """
+
+    def __init__(self, n_combinations, year=20):
+        self.year = year
+        self.values = np.full((n_combinations, len(COLUMN_INDEX)), np.nan)
+        self.count = 0
+
+    def update(self, indices, values):
+        """Consume a chunk of results: values has shape (len(indices), years, COLUMNS)."""
+        self.count += len(indices)
+        if 1 <= self.year <= values.shape[1]:
+            self.values[np.asarray(indices, dtype=np.int64)] = values[:, self.year - 1]
@@ -0,0 +1,341 @@
+import os
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+from ..batch_kernel import MODEL_PARAMETERS, BATCH_SCENARIOS, simulate_batch
+from ..result_buffers import COLUMNS, BatchResult
+from .sweep_checkpoint import SweepCheckpoint
+from .results_cube import ResultsCube
+from ..result_cache import default_cache, fingerprint
+
+
+def sweep_parameters(parameters):
+    """Keep only the model parameters the kernel reads, so they can be sent to worker processes."""
+    return {name: parameters[name] for name in MODEL_PARAMETERS}
+
+
+def _simulate_chunk(scenario, parameters, grid):
+    # Worker entry point: run one chunk of the grid through the batched kernel
+    return simulate_batch(scenario, parameters, **grid).values
+
+
+def _fill_chunk(scenario, parameters, grid, path, chunk):
+    # Worker entry point: run one chunk of the grid and write it straight into the results cube
+    ResultsCube.write_chunk(path, chunk, simulate_batch(scenario, parameters, **grid).values)
+    return chunk
+
+
+def _chunk_results(scenario, parameters, grid, chunks, workers):
+    # Yield the result values of each chunk of grid indices, in chunk order
+    chunk_grids = [{name: values[chunk] for name, values in grid.items()} for chunk in chunks]
+    if workers == 1 or len(chunks) <= 1:
+        for chunk_grid in chunk_grids:
+            yield _simulate_chunk(scenario, parameters, chunk_grid)
+        return
+    with ProcessPoolExecutor(max_workers=min(workers, len(chunks))) as executor:
+        # map() yields chunks in submission order, which keeps the output deterministic
+        yield from executor.map(_simulate_chunk, [scenario] * len(chunks), [parameters] * len(chunks), chunk_grids)
+
+
+def _point_codes(points, axes):
+    # Encode grid points as one integer each from their rank along every grid parameter; -1 if off the grid
+    codes = np.zeros(len(points), dtype=np.int64)
+    on_grid = np.ones(len(points), dtype=bool)
+    for column, values in enumerate(axes):
+        rank = np.searchsorted(values, points[:, column]).clip(0, len(values) - 1)
+        on_grid &= values[rank] == points[:, column]
+        codes = codes * len(values) + rank
+    return np.where(on_grid, codes, -1)
+
+
+def _restore_completed(points, completed, pending):
+    # Yield the grid indices still pending in each checkpointed chunk, with their values, as each chunk is read;
+    # pending is a boolean mask over the grid and restored indices are cleared from it
+    axes = [np.unique(points[:, column]) for column in range(points.shape[1])]
+    codes = _point_codes(points, axes)
+    order = np.argsort(codes, kind='stable')
+    sorted_codes = codes[order]
+    for chunk_points, chunk_values in completed:
+        chunk_codes = _point_codes(chunk_points, axes)
+        position = np.searchsorted(sorted_codes, chunk_codes).clip(0, len(sorted_codes) - 1)
+        found = (chunk_codes >= 0) & (sorted_codes[position] == chunk_codes)
+        indices = order[position[found]]
+        still_pending = pending[indices]
+        indices, indices_position = np.unique(indices[still_pending], return_index=True)
+        if len(indices):
+            pending[indices] = False
+            yield indices, chunk_values[found][still_pending][indices_position]
+
+
+# Sweeps are cached in fixed blocks of this many consecutive grid points, so a warm sweep reads a
+# few large entries instead of one small file per point
+CACHE_BLOCK_SIZE = 1024
+
+
+def _parameters_key(scenario, parameters):
+    # Fingerprint of the scenario and model parameters (and engine version), or None if they cannot be fingerprinted
+    try:
+        return fingerprint(['run_sweep', scenario, parameters])
+    except TypeError:
+        return None
+
+
+def _block_keys(base, points):
+    # Cache key of every block of grid points: the parameters' fingerprint combined with the block's grid values
+    return [fingerprint([base, points[start:start + CACHE_BLOCK_SIZE]])
+            for start in range(0, len(points), CACHE_BLOCK_SIZE)]
+
+
+def _restore_cached(cache, keys, shape, pending):
+    # Yield every block of grid points still pending that is found in the cache, with its values, as it is found;
+    # pending is a boolean mask over the grid and restored indices are cleared from it
+    n_combinations = len(pending)
+    for block, key in enumerate(keys):
+        indices = np.arange(block * CACHE_BLOCK_SIZE, min((block + 1) * CACHE_BLOCK_SIZE, n_combinations))
+        if not pending[indices].all():
+            continue
+        values = cache.get(key)
+        if values is not None and values.shape == (len(indices),) + shape:
+            pending[indices] = False
+            yield indices, values
+
+
+def _plan_chunks(pending, chunk_size, cache_blocks):
+    # Split the pending grid indices into chunks of at most chunk_size; with cache_blocks, chunks are built from
+    # whole cache blocks where they fit, so every block simulated in full can be stored
+    if not cache_blocks:
+        return [pending[start:start + chunk_size] for start in range(0, len(pending), chunk_size)]
+    pieces = np.split(pending, np.flatnonzero(np.diff(pending // CACHE_BLOCK_SIZE)) + 1) if len(pending) else []
+    chunks, current, current_size = [], [], 0
+    for piece in pieces:
+        for start in range(0, len(piece), chunk_size):
+            part = piece[start:start + chunk_size]
+            if current_size + len(part) > chunk_size:
+                chunks.append(np.concatenate(current))
+                current, current_size = [], 0
+            current.append(part)
+            current_size += len(part)
+    if current:
+        chunks.append(np.concatenate(current))
+    return chunks
+
+
+def _store_cached(cache, keys, chunk, values, n_combinations):
+    # Store every cache block a simulated chunk holds in full; chunk indices are in increasing order
+    blocks, starts, counts = np.unique(chunk // CACHE_BLOCK_SIZE, return_index=True, return_counts=True)
+    for block, start, count in zip(blocks, starts, counts):
+        if count == min(CACHE_BLOCK_SIZE, n_combinations - block * CACHE_BLOCK_SIZE):
+            cache.put(keys[block], values[start:start + count])
+
+
+# Smallest chunk worth sending to a worker process; smaller sweeps are cheaper to run in-process
+MIN_CHUNK_SIZE = 1024
+
+# Largest chunk written into a results cube at once (about 55 MB of 20-year results), so
+# the memory a cube sweep needs does not grow with the grid
+MAX_CUBE_CHUNK_SIZE = 16384
+
+
+def _sweep_grid(scenario, grid):
+    # Broadcast the scenario's grid parameters to 1-D arrays of equal length
+    names = BATCH_SCENARIOS[scenario]
+    return dict(zip(names, np.broadcast_arrays(*[np.atleast_1d(grid[name]) for name in names])))
+
+
+def _default_chunk_size(n_combinations, workers):
+    # A few chunks per worker keeps every core busy while each chunk stays a large batch
+    return max(MIN_CHUNK_SIZE, -(-n_combinations // (workers * 4)))
+
+
+def iter_sweep(scenario, parameters, grid, workers=None, chunk_size=None, checkpoint=None, resume=False,
+               use_cache=True):
+    """Run every grid combination of a management option, yielding results chunk by chunk.
+
+    Yields (grid indices, values) pairs as chunks complete, where values has shape
+    (len(indices), years, len(COLUMNS)). Points restored from the cache or a checkpoint
+    come first, then freshly simulated chunks in grid order. Every grid index is yielded
+    exactly once and only one chunk of results is held at a time.
+
+    See run_sweep for the meaning of the arguments.
+    """
+    names = BATCH_SCENARIOS[scenario]
+    grid = _sweep_grid(scenario, grid)
+    n_combinations = len(grid[names[0]])
+    parameters = sweep_parameters(parameters)
+
+    workers = workers or os.cpu_count() or 1
+    if chunk_size is None:
+        chunk_size = _default_chunk_size(n_combinations, workers)
+
+    points = np.column_stack([np.asarray(grid[name], dtype=np.int64) for name in names])
+    # Restored blocks are yielded as they are found, so only one is held at a time
+    pending = np.ones(n_combinations, dtype=bool)
+
+    # Parameters that cannot be fingerprinted (e.g. plain cost functions) are swept uncached
+    parameters_key = _parameters_key(scenario, parameters)
+    cache = default_cache() if use_cache and parameters_key is not None else None
+    if cache is not None:
+        keys = _block_keys(parameters_key, points)
+        yield from _restore_cached(cache, keys, (parameters['years'], len(COLUMNS)), pending)
+
+    log = None
+    if checkpoint is not None:
+        if resume and parameters_key is None:
+            raise ValueError("Cannot resume from a checkpoint: the model parameters cannot be fingerprinted to check "
+                             "that they match (e.g. plain cost functions instead of compiled CostBrackets).")
+        log = SweepCheckpoint(checkpoint, scenario, names, parameters['years'], str(parameters_key))
+        if resume:
+            # The log is read one chunk at a time, so resuming needs no more memory than sweeping
+            restored = 0
+            for indices, values in _restore_completed(points, log.completed(), pending):
+                restored += len(indices)
+                yield indices, values
+            if restored:
+                print(f"Resuming sweep: {restored} of {n_combinations} combinations restored from {checkpoint}")
+        log.open(resume)
+    pending = np.flatnonzero(pending)
+
+    if workers == 1 and checkpoint is None:
+        # Without a checkpoint to write there is no reason to split an in-process sweep
+        chunk_size = max(len(pending), 1)
+    chunks = _plan_chunks(pending, chunk_size, cache is not None)
+    try:
+        for chunk, values in zip(chunks, _chunk_results(scenario, parameters, grid, chunks, workers)):
+            if log is not None:
+                log.append(points[chunk], values)
+            if cache is not None:
+                _store_cached(cache, keys, chunk, values, n_combinations)
+            yield chunk, values
+        if log is not None:
+            # Every combination has been handed out, so there is nothing left to resume
+            log.remove()
+    finally:
+        if log is not None:
+            log.close()
+
+
+def _sweep_into_cube(scenario, parameters, grid, path, workers, chunk_size, resume, use_cache, reducers):
+    # Fill a results cube chunk by chunk; workers write their own slices, so no results pass between processes
+    names = BATCH_SCENARIOS[scenario]
+    grid = _sweep_grid(scenario, grid)
+    n_combinations = len(grid[names[0]])
+    parameters = sweep_parameters(parameters)
+    years = parameters['years']
+
+    parameters_key = _parameters_key(scenario, parameters)
+    cube = None
+    if resume and os.path.exists(path):
+        if parameters_key is None:
+            raise ValueError("Cannot resume a results cube: the model parameters cannot be fingerprinted to check "
+                             "that they match (e.g. plain cost functions instead of compiled CostBrackets).")
+        cube = ResultsCube.open(path, mode='r+')
+        if not cube.matches(scenario, grid, years, parameters_key):
+            raise ValueError(f"Results cube '{path}' was written for a different sweep or different model "
+                             f"parameters. Remove it or run without resume.")
+        print(f"Resuming sweep: {n_combinations - len(cube.pending())} of {n_combinations} combinations "
+              f"already in {path}")
+    if cube is None:
+        cube = ResultsCube.create(path, scenario, grid, years, str(parameters_key))
+    pending = ~np.asarray(cube.filled)
+
+    workers = workers or os.cpu_count() or 1
+    if chunk_size is None:
+        chunk_size = min(_default_chunk_size(n_combinations, workers), MAX_CUBE_CHUNK_SIZE)
+
+    # Parameters that cannot be fingerprinted (e.g. plain cost functions) are swept uncached
+    cache = default_cache() if use_cache and parameters_key is not None else None
+    if cache is not None:
+        points = np.column_stack([np.asarray(grid[name], dtype=np.int64) for name in names])
+        keys = _block_keys(parameters_key, points)
+        for indices, values in _restore_cached(cache, keys, (years, len(COLUMNS)), pending):
+            cube.values[indices] = values
+            cube.mark_filled(indices)
+    pending = np.flatnonzero(pending)
+
+    chunks = _plan_chunks(pending, chunk_size, cache is not None)
+    chunk_grids = [{name: values[chunk] for name, values in grid.items()} for chunk in chunks]
+    if workers == 1 or len(chunks) <= 1:
+        filled_chunks = (_fill_chunk(scenario, parameters, chunk_grid, path, chunk)
+                         for chunk_grid, chunk in zip(chunk_grids, chunks))
+        executor = None
+    else:
+        executor = ProcessPoolExecutor(max_workers=min(workers, len(chunks)))
+        filled_chunks = executor.map(_fill_chunk, [scenario] * len(chunks), [parameters] * len(chunks),
+                                     chunk_grids, [path] * len(chunks), chunks)
+    try:
+        for chunk in filled_chunks:
+            # A chunk only counts as done once the worker's writes are on disk
+            cube.mark_filled(chunk)
+            if cache is not None:
+                _store_cached(cache, keys, chunk, cube.values[chunk], n_combinations)
+    finally:
+        if executor is not None:
+            executor.shutdown()
+
+    # Reducers read the finished cube in chunks, so their memory stays bounded by the chunk size
+    for reducer in reducers:
+        for start in range(0, n_combinations, chunk_size):
+            indices = np.arange(start, min(start + chunk_size, n_combinations))
+            reducer.update(indices, cube.values[indices])
+    cube.values.flush()
+    return cube
+
+
+def run_sweep(scenario, parameters, grid, workers=None, chunk_size=None, checkpoint=None, resume=False,
+              use_cache=True, reducer=None, cube=None):
+    """Run every grid combination of a management option, fanning chunks out across processes.
+
+    `grid` maps each grid parameter of the scenario to a 1-D array with one entry per
+    combination. Chunks of combinations are simulated by the batched kernel in a
+    ProcessPoolExecutor and written back in grid order, so the result is identical to a
+    single serial simulate_batch call. With workers=1 the sweep runs in this process.
+
+    With a checkpoint path, each completed chunk is appended to a SweepCheckpoint log as
+    it finishes. With resume, grid points already in the log are read back instead of
+    simulated, so an interrupted sweep carries on where it stopped. The log is deleted
+    once the sweep completes.
+
+    With use_cache, the grid is looked up in the on-disk ResultCache in blocks of
+    CACHE_BLOCK_SIZE consecutive points, keyed by a fingerprint of the model parameters
+    and the block's grid values, and blocks simulated in full are stored there, so a
+    repeated sweep reads a few large entries instead of simulating again.
+
+    Returns a BatchResult in the same order as the grid arrays. If a reducer (e.g. a
+    BestPerMetric or ParetoFrontier) or a list of reducers is given, each chunk is passed
+    to reducer.update(indices, values) as it completes instead, no results are kept, and
+    the reducer is returned.
+
+    With a cube directory, results are written into a memory-mapped ResultsCube there
+    instead: worker processes fill their slices of the file directly, a chunk at a time,
+    so sweeps larger than memory can run. The filled cube records which combinations
+    are complete, so with resume only the rest are simulated; a checkpoint cannot be
+    combined with a cube. Reducers are fed from the finished cube, and the cube, which
+    is also a BatchResult, is returned (or the reducer, if one was given).
+    """
+    if cube is not None:
+        if checkpoint is not None:
+            raise ValueError("A results cube records its own progress; do not combine it with a checkpoint.")
+        reducers = [] if reducer is None else reducer if isinstance(reducer, (list, tuple)) else [reducer]
+        results = _sweep_into_cube(scenario, parameters, grid, cube, workers, chunk_size, resume, use_cache,
+                                   reducers)
+        return results if reducer is None else reducer
+
+    sweep = iter_sweep(scenario, parameters, grid, workers, chunk_size, checkpoint, resume, use_cache)
+    if reducer is not None:
+        reducers = reducer if isinstance(reducer, (list, tuple)) else [reducer]
+        for indices, values in sweep:
+            for each_reducer in reducers:
+                each_reducer.update(indices, values)
+        return reducer
+
+    grid = _sweep_grid(scenario, grid)
+    n_combinations = len(next(iter(grid.values())))
+    workers = workers or os.cpu_count() or 1
+    chunk_size = chunk_size or _default_chunk_size(n_combinations, workers)
+    cache = default_cache() if use_cache else None
+    if checkpoint is None and cache is None and (workers == 1 or n_combinations <= chunk_size):
+        return simulate_batch(scenario, sweep_parameters(parameters), **grid)
+
+    results = np.empty((n_combinations, parameters['years'], len(COLUMNS)))
+    for indices, values in sweep:
+        results[indices] = values
+    return BatchResult(results)
@@ -0,0 +1,234 @@
+import os
+import json
+import pickle
+import hashlib
+from collections import namedtuple
+from math import isfinite
+from .cohort_engine import mortality_rates_array
+from .cost_brackets import compile_cost_brackets
+from .result_cache import DEFAULT_CACHE_DIR
+
+# Bump whenever the compiled profile changes shape, so stale binary caches are never loaded
+PROFILE_FORMAT_VERSION = 1
+
+# Profiles shipped with the package, loadable by name ('overall', 'street', 'park', 'consistent')
+PROFILES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'profiles')
+
+# Keys of a profile file, by section, and the check each value must pass
+PROFILE_FIELDS = {
+    '': {'name': 'text', 'years': 'count'},
+    'inventory': {'starting_ash_trees': 'count', 'starting_diameter': 'positive', 'growth_rate': 'non_negative'},
+    'mortality': {'background_mortality_rate': 'rate', 'injected_ash_mortality_rate': 'rate',
+                  'ash_mortality_rate': 'rate', 'post_planting': 'rates'},
+    'replanting': {'starting_diameter_new': 'positive', 'growth_rate_new': 'non_negative',
+                   'warranty_period_ends': 'count'},
+    'expenses': {'tree_planting_and_establishment_expense': 'non_negative',
+                 'ash_tree_injections_expense': 'non_negative', 'annual_inflation_rate': 'number',
+                 'removal_cost_ranges': 'cost_ranges', 'pruning_cost_ranges': 'cost_ranges'},
+    'ctla.ash': {'condition_rating': 'rate', 'functional_limitations': 'rate', 'external_limitations': 'rate'},
+    'ctla.non_ash': {'condition_rating': 'rate', 'functional_limitations': 'rate', 'external_limitations': 'rate'},
+}
+
+# Keys that may be left out of a profile file
+OPTIONAL_FIELDS = {('', 'name')}
+
+
+class ParameterProfile(namedtuple('ParameterProfile', [
+    'name', 'years',
+    'starting_ash_trees', 'starting_diameter', 'growth_rate',
+    'background_mortality_rate', 'injected_ash_mortality_rate', 'ash_mortality_rate',
+    'starting_diameter_new', 'growth_rate_new', 'warranty_period_ends',
+    'mortality_table',  # Read-only mortality rate by cohort age, as built by mortality_rates_array
+    'tree_planting_and_establishment_expense', 'ash_tree_injections_expense', 'annual_inflation_rate',
+    'get_removal_cost_by_dbh', 'get_pruning_cost_by_dbh',  # Compiled CostBrackets
+    'depreciation_ash', 'depreciation_non_ash',
+])):
+    """A validated, compiled and immutable set of simulation parameters."""
+
+    __slots__ = ()
+
+    @property
+    def mortality_rates_by_age(self):
+        """Mortality rate by age for ages 1 to years, as the parameter modules define it."""
+        return {age: float(self.mortality_table[age]) for age in range(1, self.years + 1)}
+
+    def parameters(self):
+        """Return the parameters as a mapping with the names of the parameter modules."""
+        parameters = self._asdict()
+        del parameters['name'], parameters['mortality_table']
+        parameters['mortality_rates_by_age'] = self.mortality_rates_by_age
+        return parameters
+
+
+def _check(path, key, value, check):
+    # Validate one value and return it in its compiled form
+    def fail(requirement):
+        raise ValueError(f"Profile '{path}': {key} must be {requirement}, not {value!r}.")
+
+    def number(item):
+        return isinstance(item, (int, float)) and not isinstance(item, bool)
+
+    if check == 'text':
+        if not isinstance(value, str):
+            fail("a string")
+        return value
+    if check == 'count':
+        if not isinstance(value, int) or isinstance(value, bool) or value < 0:
+            fail("a whole number of at least 0")
+        return value
+    if check == 'rates':
+        if not isinstance(value, list) or not all(number(rate) and 0 <= rate <= 1 for rate in value):
+            fail("a list of rates between 0 and 1")
+        return [float(rate) for rate in value]
+    if check == 'cost_ranges':
+        # An open-ended last bracket may give its max DBH as inf (TOML), Infinity (JSON) or null
+        if not isinstance(value, list) or not all(isinstance(bracket, list) and len(bracket) == 3 for bracket in value):
+            fail("a list of [min DBH, max DBH, cost] brackets")
+        brackets = [(low, float('inf') if high is None else high, cost) for low, high, cost in value]
+        if not all(number(item) for bracket in brackets for item in bracket):
+            fail("a list of [min DBH, max DBH, cost] brackets")
+        try:
+            return compile_cost_brackets(brackets)
+        except ValueError as error:
+            raise ValueError(f"Profile '{path}': {key}: {error}") from None
+    if not number(value) or not isfinite(value):
+        fail("a number")
+    if check == 'positive' and not value > 0:
+        fail("above 0")
+    if check == 'non_negative' and value < 0:
+        fail("at least 0")
+    if check == 'rate' and not 0 <= value <= 1:
+        fail("a rate between 0 and 1")
+    return value
+
+
+def compile_profile(data, path='<profile>'):
+    """Validate a parsed profile (nested sections of values) and compile it into a ParameterProfile."""
+    if not isinstance(data, dict):
+        raise ValueError(f"Profile '{path}' must hold a table of sections.")
+
+    # Flatten the sections, then reject unknown and missing keys
+    values = {}
+    sections = [('', data)]
+    while sections:
+        section, table = sections.pop()
+        for key, value in table.items():
+            if isinstance(value, dict):
+                sections.append((f'{section}.{key}'.lstrip('.'), value))
+            else:
+                values[(section, key)] = value
+    expected = {(section, key) for section, keys in PROFILE_FIELDS.items() for key in keys}
+    unknown = sorted(f'{section}.{key}'.lstrip('.') for section, key in values.keys() - expected)
+    if unknown:
+        raise ValueError(f"Profile '{path}' has unknown keys: {', '.join(unknown)}")
+    missing = sorted(f'{section}.{key}'.lstrip('.') for section, key in expected - values.keys() - OPTIONAL_FIELDS)
+    if missing:
+        raise ValueError(f"Profile '{path}' is missing keys: {', '.join(missing)}")
+    checked = {(section, key): _check(path, f'{section}.{key}'.lstrip('.'), values[(section, key)], check)
+               for section, keys in PROFILE_FIELDS.items() for key, check in keys.items()
+               if (section, key) in values}
+
+    def section(name):
+        return {key: value for (section_name, key), value in checked.items() if section_name == name}
+
+    inventory, mortality, replanting, expenses = (section(name) for name in ('inventory', 'mortality', 'replanting',
+                                                                             'expenses'))
+    years = checked[('', 'years')]
+    if len(mortality['post_planting']) > years:
+        raise ValueError(f"Profile '{path}': mortality.post_planting lists more years than the {years} simulated.")
+
+    # Post-planting mortality for the first years after planting, the background rate afterwards
+    mortality_rates_by_age = {age: rate for age, rate in enumerate(mortality['post_planting'], start=1)}
+    mortality_rates_by_age.update({age: mortality['background_mortality_rate']
+                                   for age in range(len(mortality['post_planting']) + 1, years + 1)})
+    mortality_table = mortality_rates_array(mortality_rates_by_age, mortality['background_mortality_rate'], years)
+
+    # CTLA Trunk Formula Technique
+    ash, non_ash = section('ctla.ash'), section('ctla.non_ash')
+    depreciation_ash = ash['condition_rating'] * ash['functional_limitations'] * ash['external_limitations']
+    depreciation_non_ash = (non_ash['condition_rating'] * non_ash['functional_limitations']
+                            * non_ash['external_limitations'])
+
+    return _freeze(ParameterProfile(
+        name=checked.get(('', 'name'), os.path.splitext(os.path.basename(str(path)))[0]),
+        years=years,
+        starting_ash_trees=inventory['starting_ash_trees'],
+        starting_diameter=inventory['starting_diameter'],
+        growth_rate=inventory['growth_rate'],
+        background_mortality_rate=mortality['background_mortality_rate'],
+        injected_ash_mortality_rate=mortality['injected_ash_mortality_rate'],
+        ash_mortality_rate=mortality['ash_mortality_rate'],
+        starting_diameter_new=replanting['starting_diameter_new'],
+        growth_rate_new=replanting['growth_rate_new'],
+        warranty_period_ends=replanting['warranty_period_ends'],
+        mortality_table=mortality_table,
+        tree_planting_and_establishment_expense=expenses['tree_planting_and_establishment_expense'],
+        ash_tree_injections_expense=expenses['ash_tree_injections_expense'],
+        annual_inflation_rate=expenses['annual_inflation_rate'],
+        get_removal_cost_by_dbh=expenses['removal_cost_ranges'],
+        get_pruning_cost_by_dbh=expenses['pruning_cost_ranges'],
+        depreciation_ash=depreciation_ash,
+        depreciation_non_ash=depreciation_non_ash,
+    ))
+
+
+def _freeze(profile):
+    # Make the arrays of a compiled profile read-only; unpickling gives back writeable copies
+    arrays = [profile.mortality_table]
+    for brackets in (profile.get_removal_cost_by_dbh, profile.get_pruning_cost_by_dbh):
+        arrays += [brackets.lower_bounds, brackets.upper_bounds, brackets.costs]
+    for array in arrays:
+        array.flags.writeable = False
+    return profile
+
+
+def _parse(path, source):
+    # Parse a TOML or JSON profile from its raw bytes
+    if path.endswith('.json'):
+        return json.loads(source)
+    if path.endswith('.toml'):
+        try:
+            import tomllib
+        except ImportError:  # Python < 3.11
+            import tomli as tomllib
+        return tomllib.loads(source.decode())
+    raise ValueError(f"Profile '{path}' must be a .toml or .json file.")
+
+
+def bundled_profiles():
+    """Names of the profiles shipped with the package."""
+    return sorted(os.path.splitext(name)[0] for name in os.listdir(PROFILES_DIR) if name.endswith('.toml'))
+
+
+def load_profile(path, use_cache=True):
+    """Load a TOML or JSON parameter profile into a ParameterProfile.
+
+    `path` is a profile file or the name of a bundled profile (see bundled_profiles).
+    The compiled profile is kept as a binary blob in the cache directory, keyed by the
+    file's name and contents, so later loads skip parsing and validation. Set EAB_CACHE=0
+    or use_cache=False to always compile from the file.
+    """
+    path = os.fspath(path)
+    if path in bundled_profiles():
+        path = os.path.join(PROFILES_DIR, path + '.toml')
+    with open(path, 'rb') as f:
+        source = f.read()
+    use_cache = use_cache and os.environ.get('EAB_CACHE', '1') != '0'
+    key = hashlib.sha256(f'{PROFILE_FORMAT_VERSION}\0{os.path.basename(path)}\0'.encode() + source).hexdigest()
+    cache_path = os.path.join(DEFAULT_CACHE_DIR, 'profiles', key + '.pickle')
+    if use_cache:
+        try:
+            with open(cache_path, 'rb') as f:
+                return _freeze(pickle.load(f))
+        except (OSError, EOFError, pickle.UnpicklingError, AttributeError, ImportError):
+            pass
+
+    profile = compile_profile(_parse(path, source), path)
+    if use_cache:
+        # Write to a temporary file first so readers never see a partial blob
+        os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+        temporary = f'{cache_path}.{os.getpid()}.tmp'
+        with open(temporary, 'wb') as f:
+            pickle.dump(profile, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(temporary, cache_path)
+    return profile
@@ -0,0 +1,4 @@
+"""Parameter modules: the overall, street and park inventories, and the consistent set used by the optimizations.
+
+Each module loads the bundled TOML profile of the same name from mississauga_eab/profiles.
+"""
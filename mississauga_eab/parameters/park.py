@@ -0,0 +1,11 @@
+"""Parameters of the park tree inventory, loaded from the bundled profile profiles/park.toml.
+
+The profile is the single source of these values; this module only exposes them under
+the parameter names, for code that imports a parameter module (e.g. profile sources
+given as module names). Edit the profile, not this module.
+"""
+from ..parameter_profiles import load_profile
+
+_parameters = load_profile('park').parameters()
+globals().update(_parameters)
+__all__ = list(_parameters)
@@ -0,0 +1,60 @@
+import inspect
+import importlib
+from .batch_kernel import simulate_samples
+from .simulation_module import run_simulations
+from .parameter_profiles import bundled_profiles, load_profile
+
+# Year-20 values compared across profiles by default
+COMPARISON_COLUMNS = (
+    'Ash Tree Count', 'Non-Ash Tree Count', 'Total Tree Count', 'Total Tree Basal Area',
+    'Cumulative Costs', 'CTLA Value of All Trees', 'Net Value of All Trees',
+)
+
+
+def load_profiles(sources):
+    """Load profiles given as {profile name: source} and return {profile name: parameters}.
+
+    A source is a bundled profile name, a TOML or JSON profile file, or the name of a
+    parameter module (e.g. 'mississauga_eab.parameters.street').
+    """
+    return {profile: load_profile(source).parameters()
+            if source in bundled_profiles() or source.endswith(('.toml', '.json'))
+            else vars(importlib.import_module(source)) for profile, source in sources.items()}
+
+
+def _simulation_inputs(parameters, settings):
+    # Keep only the run_simulations arguments of a parameter mapping or module namespace
+    inputs = {**parameters, **settings}
+    return {name: inputs[name] for name in inspect.signature(run_simulations).parameters}
+
+
+def run_profiles(profiles, settings):
+    """Run every scenario of every parameter profile with the same management settings.
+
+    `profiles` maps profile names to parameter mappings (e.g. from load_profiles) and
+    `settings` holds the set_* management settings of run_simulations. Profiles that
+    simulate the same number of years are stacked along the batch axis and run in one
+    pass of each scenario (see simulate_samples), so every profile's mortality table and
+    cost lookups are compiled once and shared by all the scenarios.
+    Returns {profile: {scenario: SimulationResult}}.
+    """
+    stacks = {}
+    for profile, parameters in profiles.items():
+        stacks.setdefault(parameters['years'], []).append(profile)
+    results = {}
+    for stacked in stacks.values():
+        batch = simulate_samples([profiles[profile] for profile in stacked], settings)
+        for row, profile in enumerate(stacked):
+            results[profile] = {scenario: scenario_results[row] for scenario, scenario_results in batch.items()}
+    return {profile: results[profile] for profile in profiles}
+
+
+def comparison_table(profile_results, year=20, columns=COMPARISON_COLUMNS):
+    """Build one DataFrame of the values at `year`, indexed by profile and scenario."""
+    import pandas as pd
+
+    rows = {(profile, scenario): [results.value(column, year) for column in columns]
+            for profile, simulation_results in profile_results.items()
+            for scenario, results in simulation_results.items()}
+    index = pd.MultiIndex.from_tuples(list(rows), names=['Profile', 'Scenario'])
+    return pd.DataFrame(list(rows.values()), index=index, columns=list(columns))
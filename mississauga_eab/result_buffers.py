@@ -0,0 +1,106 @@
+import numpy as np
+
+# Output columns, in the same order as the per-year result rows of the simulations
+COLUMNS = (
+    'Year',
+    'Ash Tree Count', 'Non-Ash Tree Count', 'Total Tree Count',
+    'Ash Tree Basal Area', 'Non-Ash Tree Basal Area', 'Total Tree Basal Area',
+    'Cost of Tree Planting and Establishment', 'Cost of Pruning', 'Cost of Injection', 'Cost of Removal',
+    'Total Costs',
+    'Cumulative Cost of Tree Planting and Establishment', 'Cumulative Cost of Pruning',
+    'Cumulative Cost of Injection', 'Cumulative Cost of Removal', 'Cumulative Costs',
+    'CTLA Value of Ash', 'CTLA Value of Non-Ash', 'CTLA Value of All Trees',
+    'Net Value of All Trees',
+)
+COLUMN_INDEX = {column: idx for idx, column in enumerate(COLUMNS)}
+
+# Columns that hold whole numbers of trees or years; they are stored exactly in the float buffer
+INTEGER_COLUMNS = ('Year', 'Ash Tree Count', 'Non-Ash Tree Count', 'Total Tree Count')
+
+
+# Python's round() on every value, as the simulations rounded each result row; NumPy and pandas
+# round the scaled binary value half-to-even, which differs on values such as 498472.21499999997
+_python_round = np.vectorize(lambda value, decimals: round(float(value), decimals), otypes=[float])
+
+
+def _to_frame(values, decimals):
+    import pandas as pd
+
+    if decimals is not None:
+        values = _python_round(values, decimals)
+    frame = pd.DataFrame(values, columns=COLUMNS)
+    frame[list(INTEGER_COLUMNS)] = frame[list(INTEGER_COLUMNS)].astype(np.int64)
+    return frame
+
+
+class SimulationResult:
+    """Yearly results of one simulation held in a preallocated (years x COLUMNS) buffer.
+
+    Values are stored unrounded; rounding happens only when a DataFrame is requested
+    with to_frame(), which imports pandas and builds the frame on first use.
+    """
+
+    def __init__(self, years=None, values=None):
+        if values is None:
+            values = np.zeros((years, len(COLUMNS)))
+        self.values = values
+        self.columns = COLUMNS
+        self._frames = {}
+
+    def __len__(self):
+        return len(self.values)
+
+    def __getitem__(self, column):
+        """Return one column as a read-only array over the simulated years."""
+        view = self.values[:, COLUMN_INDEX[column]]
+        view.flags.writeable = False
+        return view
+
+    def record(self, year, row):
+        """Write the results for a simulated year (1-based) from a column -> value mapping."""
+        buffer = self.values[year - 1]
+        for column, value in row.items():
+            buffer[COLUMN_INDEX[column]] = value
+
+    def value(self, column, year, default=None):
+        """Return the value of a column at a simulated year, or default if the year was not simulated."""
+        if not 1 <= year <= len(self.values):
+            return default
+        return self.values[year - 1, COLUMN_INDEX[column]]
+
+    def to_frame(self, decimals=2):
+        """Build (once) a DataFrame of the results rounded to the given number of decimals."""
+        if decimals not in self._frames:
+            self._frames[decimals] = _to_frame(self.values, decimals)
+        return self._frames[decimals]
+
+
+class BatchResult:
+    """Results of many simulations held in one (combinations x years x COLUMNS) buffer."""
+
+    def __init__(self, values):
+        self.values = values
+        self.columns = COLUMNS
+
+    def __len__(self):
+        return len(self.values)
+
+    def __getitem__(self, combination):
+        """Return a SimulationResult viewing the results of one combination."""
+        return SimulationResult(values=self.values[combination])
+
+    def __iter__(self):
+        for combination in range(len(self.values)):
+            yield self[combination]
+
+    def column(self, column):
+        """Return one column for every combination, shaped (combinations, years)."""
+        return self.values[:, :, COLUMN_INDEX[column]]
+
+    def at_year(self, column, year):
+        """Return one column at a simulated year (1-based) for every combination."""
+        return self.values[:, year - 1, COLUMN_INDEX[column]]
+
+    def frames(self, decimals=2):
+        """Build one rounded DataFrame per combination."""
+        return [result.to_frame(decimals) for result in self]
@@ -0,0 +1,200 @@
+import os
+import json
+import hashlib
+import inspect
+import functools
+from collections import OrderedDict
+import numpy as np
+from .cost_brackets import CostBrackets
+from .result_buffers import SimulationResult
+
+# Bump whenever a change to the simulation engine changes its results, so stale entries are never returned
+ENGINE_VERSION = 1
+
+# Cache location and size limit; set EAB_CACHE=0 to turn the cache off
+DEFAULT_CACHE_DIR = os.environ.get('EAB_CACHE_DIR', os.path.join(os.path.expanduser('~'), '.cache', 'mississauga-eab'))
+DEFAULT_MAX_BYTES = int(os.environ.get('EAB_CACHE_MAX_BYTES', 512 * 1024 ** 2))
+
+# Fraction of max_bytes a full cache is trimmed back to, so evictions happen in batches
+EVICT_TO = 0.8
+
+
+def _canonical(value):
+    # Convert an input into a JSON-able form that is equal exactly when the inputs are equal
+    if isinstance(value, CostBrackets):
+        return ['CostBrackets', _canonical(value.cost_ranges)]
+    if isinstance(value, (bool, np.bool_)):
+        return ['bool', bool(value)]
+    if isinstance(value, (int, np.integer)):
+        return ['int', int(value)]
+    if isinstance(value, (float, np.floating)):
+        return ['float', float(value).hex()]
+    if value is None or isinstance(value, str):
+        return ['str', value]
+    if isinstance(value, (list, tuple)):
+        return ['list', [_canonical(item) for item in value]]
+    if isinstance(value, dict):
+        items = [[_canonical(key), _canonical(item)] for key, item in value.items()]
+        return ['dict', sorted(items, key=json.dumps)]
+    if isinstance(value, np.ndarray):
+        array = np.ascontiguousarray(value)
+        return ['array', array.dtype.str, list(array.shape), hashlib.sha256(array.tobytes()).hexdigest()]
+    raise TypeError(f"Cannot fingerprint a value of type {type(value).__name__}.")
+
+
+def fingerprint(value):
+    """Return a SHA-256 hex digest of the canonical form of an input, including the engine version."""
+    encoded = json.dumps([ENGINE_VERSION, _canonical(value)], separators=(',', ':'))
+    return hashlib.sha256(encoded.encode()).hexdigest()
+
+
+class ResultCache:
+    """Content-addressed on-disk store of simulation results.
+
+    Entries are named by the fingerprint of every input that produced them and hold
+    either one array (.npy) or a mapping of named arrays (.npz). Reading an entry marks
+    it as recently used; once the cache grows past max_bytes the least recently used
+    entries are deleted until it is back under EVICT_TO of max_bytes.
+
+    The directory is scanned once, on first use, into an in-memory LRU index of entry
+    sizes that puts, gets and evictions then keep up to date, so no call rescans it.
+    """
+
+    def __init__(self, directory=DEFAULT_CACHE_DIR, max_bytes=DEFAULT_MAX_BYTES):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self._index = None
+        self._size = 0
+
+    def _path(self, key, extension):
+        return os.path.join(self.directory, key[:2], key + extension)
+
+    def _entries(self):
+        # Load the LRU index once: entry path -> size, least recently used first
+        if self._index is None:
+            entries = []
+            if os.path.isdir(self.directory):
+                for prefix in os.listdir(self.directory):
+                    folder = os.path.join(self.directory, prefix)
+                    if not os.path.isdir(folder):
+                        continue
+                    for name in os.listdir(folder):
+                        if name.endswith(('.npy', '.npz')):
+                            stat = os.stat(os.path.join(folder, name))
+                            entries.append((stat.st_mtime, os.path.join(folder, name), stat.st_size))
+            self._index = OrderedDict((path, size) for _, path, size in sorted(entries))
+            self._size = sum(self._index.values())
+        return self._index
+
+    def get(self, key):
+        """Return the array or dict of arrays stored under key, or None on a miss."""
+        for extension in ('.npy', '.npz'):
+            path = self._path(key, extension)
+            try:
+                with open(path, 'rb') as f:
+                    if extension == '.npy':
+                        value = np.load(f)
+                    else:
+                        with np.load(f) as archive:
+                            value = {name: archive[name] for name in archive.files}
+            except (FileNotFoundError, EOFError, ValueError, OSError):
+                continue
+            # Touch the entry so eviction sees it as recently used, here and in later processes
+            os.utime(path)
+            index = self._entries()
+            if path in index:
+                index.move_to_end(path)
+            return value
+        return None
+
+    def put(self, key, value):
+        """Store an array or a dict of arrays under key, evicting old entries if the cache is full."""
+        extension = '.npz' if isinstance(value, dict) else '.npy'
+        path = self._path(key, extension)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+
+        # Write to a temporary file first so readers never see a partial entry
+        temporary = f'{path}.{os.getpid()}.tmp'
+        with open(temporary, 'wb') as f:
+            if isinstance(value, dict):
+                np.savez(f, **value)
+            else:
+                np.save(f, value)
+        os.replace(temporary, path)
+
+        index = self._entries()
+        self._size += os.path.getsize(path) - index.pop(path, 0)
+        index[path] = os.path.getsize(path)
+        if self._size > self.max_bytes:
+            # Evict in one batch down to the low-water mark, so the next puts do not evict again
+            self.evict(int(self.max_bytes * EVICT_TO))
+
+    def evict(self, max_bytes=None):
+        """Delete least recently used entries until the cache fits in max_bytes."""
+        max_bytes = self.max_bytes if max_bytes is None else max_bytes
+        index = self._entries()
+        while index and self._size > max_bytes:
+            path, size = index.popitem(last=False)
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            self._size -= size
+
+    def clear(self):
+        """Delete every entry in the cache."""
+        self.evict(max_bytes=0)
+
+
+_default_cache = None
+
+
+def default_cache():
+    """Return the shared ResultCache, or None if caching is turned off with EAB_CACHE=0."""
+    global _default_cache
+    if os.environ.get('EAB_CACHE', '1') == '0':
+        return None
+    if _default_cache is None:
+        _default_cache = ResultCache()
+    return _default_cache
+
+
+def _encode(result):
+    if isinstance(result, SimulationResult):
+        return result.values
+    return {name: scenario_result.values for name, scenario_result in result.items()}
+
+
+def _decode(value):
+    if isinstance(value, np.ndarray):
+        return SimulationResult(values=value)
+    return {name: SimulationResult(values=values) for name, values in value.items()}
+
+
+def cached(function):
+    """Cache a function returning a SimulationResult or a dict of them, keyed on all of its arguments.
+
+    Calls whose arguments cannot be fingerprinted (e.g. a plain Python cost function
+    instead of compiled CostBrackets) run uncached.
+    """
+    signature = inspect.signature(function)
+
+    @functools.wraps(function)
+    def wrapper(*args, **kwargs):
+        cache = default_cache()
+        if cache is None:
+            return function(*args, **kwargs)
+        bound = signature.bind(*args, **kwargs)
+        bound.apply_defaults()
+        try:
+            key = fingerprint([function.__qualname__, dict(bound.arguments)])
+        except TypeError:
+            return function(*args, **kwargs)
+
+        value = cache.get(key)
+        if value is not None:
+            return _decode(value)
+        result = function(*args, **kwargs)
+        cache.put(key, _encode(result))
+        return result
+    return wrapper
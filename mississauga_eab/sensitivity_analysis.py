@@ -0,0 +1,220 @@
+import os
+import inspect
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+from .batch_kernel import simulate_samples
+from .simulation_module import run_simulations
+
+# Point estimates varied by default. Post-planting mortality is named by age, as in mortality_rates_by_age
+SENSITIVITY_PARAMETERS = (
+    'growth_rate', 'growth_rate_new',
+    'background_mortality_rate', 'injected_ash_mortality_rate', 'ash_mortality_rate',
+    'mortality_rate_age_1', 'mortality_rate_age_2', 'mortality_rate_age_3', 'mortality_rate_age_4',
+    'tree_planting_and_establishment_expense', 'ash_tree_injections_expense', 'annual_inflation_rate',
+    'depreciation_ash', 'depreciation_non_ash',
+)
+
+# Year-20 outputs whose variance is attributed to the parameters by default
+SENSITIVITY_OUTPUTS = ('Cumulative Costs', 'CTLA Value of All Trees', 'Net Value of All Trees')
+
+# Parameters the batched kernel takes a value of per sample; sampling any other parameter (e.g. years or the
+# starting ash count) falls back to one run_simulations call per sample
+BATCHED_PARAMETERS = SENSITIVITY_PARAMETERS + ('starting_diameter', 'starting_diameter_new')
+
+# Samples evaluated together in one batched pass, and per task sent to a worker process
+EVALUATION_CHUNK_SIZE = 4096
+
+
+def _base_value(parameters, name):
+    if name.startswith('mortality_rate_age_'):
+        return parameters['mortality_rates_by_age'][int(name.rsplit('_', 1)[1])]
+    return parameters[name]
+
+
+def default_bounds(parameters, names=SENSITIVITY_PARAMETERS, spread=0.2):
+    """Sampling ranges of +/- spread around each point estimate; rates and depreciation factors stay within [0, 1]."""
+    bounds = {}
+    for name in names:
+        value = _base_value(parameters, name)
+        low, high = value * (1 - spread), value * (1 + spread)
+        if 'mortality' in name or 'depreciation' in name:
+            low, high = max(low, 0.0), min(high, 1.0)
+        bounds[name] = (low, high)
+    return bounds
+
+
+def _halton(n, dimensions, rng):
+    # Halton points from the first prime bases, each dimension rotated by a random shift (Cranley-Patterson)
+    primes = []
+    candidate = 2
+    while len(primes) < dimensions:
+        if all(candidate % prime for prime in primes):
+            primes.append(candidate)
+        candidate += 1
+    points = np.zeros((n, dimensions))
+    for dimension, base in enumerate(primes):
+        index = np.arange(1, n + 1)
+        fraction = 1.0
+        while index.any():
+            fraction /= base
+            points[:, dimension] += fraction * (index % base)
+            index //= base
+    return (points + rng.random(dimensions)) % 1.0
+
+
+def _unit_sample(design, n, dimensions, seed):
+    # n points in the unit hypercube from the requested design
+    rng = np.random.default_rng(seed)
+    if design == 'halton':
+        return _halton(n, dimensions, rng)
+    if design == 'lhs':
+        strata = np.argsort(rng.random((n, dimensions)), axis=0)
+        return (strata + rng.random((n, dimensions))) / n
+    if design == 'sobol':
+        try:
+            from scipy.stats import qmc
+        except ImportError as error:
+            raise ImportError("The 'sobol' design requires scipy; use 'halton' or 'lhs' without it.") from error
+        return qmc.Sobol(dimensions, scramble=True, seed=rng).random(n)
+    raise ValueError(f"Unknown sampling design '{design}'; use 'halton', 'lhs' or 'sobol'.")
+
+
+def saltelli_samples(bounds, base_samples, design='halton', seed=None):
+    """Build the Saltelli design for Sobol indices.
+
+    Returns (A, B, AB): two independent (base_samples, d) matrices drawn from one
+    2d-dimensional design scaled to the bounds, and AB of shape (d, base_samples, d),
+    where AB[i] is A with column i taken from B. The model is evaluated
+    base_samples * (d + 2) times in total.
+    """
+    low, high = np.array(list(bounds.values()), dtype=float).T
+    dimensions = len(low)
+    unit = _unit_sample(design, base_samples, 2 * dimensions, seed)
+    a = low + unit[:, :dimensions] * (high - low)
+    b = low + unit[:, dimensions:] * (high - low)
+    ab = np.repeat(a[None], dimensions, axis=0)
+    for column in range(dimensions):
+        ab[column, :, column] = b[:, column]
+    return a, b, ab
+
+
+def _model_inputs(parameters, sample):
+    # Parameter set for one sample: post-planting mortality goes into mortality_rates_by_age, and ages
+    # at the background rate follow a sampled background rate
+    inputs = dict(parameters)
+    inputs.update({name: value for name, value in sample.items() if not name.startswith('mortality_rate_age_')})
+    mortality_rates_by_age = {}
+    for age, rate in parameters['mortality_rates_by_age'].items():
+        if f'mortality_rate_age_{age}' in sample:
+            rate = sample[f'mortality_rate_age_{age}']
+        elif rate == parameters['background_mortality_rate']:
+            rate = inputs['background_mortality_rate']
+        mortality_rates_by_age[age] = rate
+    inputs['mortality_rates_by_age'] = mortality_rates_by_age
+    return inputs
+
+
+def _evaluate_chunk(parameters, settings, names, samples, outputs, year):
+    # Worker entry point: simulate every sample of the chunk and keep the chosen outputs at one year
+    if set(names) <= set(BATCHED_PARAMETERS):
+        # One batched pass per scenario, with the sampled parameters held per row
+        results = simulate_samples([_model_inputs(parameters, dict(zip(names, sample))) for sample in samples],
+                                   settings)
+        values = [[results[scenario].at_year(output, year) for output in outputs] for scenario in results]
+        return list(results), np.moveaxis(np.array(values, dtype=float), -1, 0)
+
+    # Fallback for parameters the batched kernel cannot vary per row: one run_simulations call per sample
+    simulate = getattr(run_simulations, '__wrapped__', run_simulations)  # Samples are one-offs, so skip the cache
+    arguments = list(inspect.signature(simulate).parameters)
+    values = []
+    for sample in samples:
+        inputs = _model_inputs(parameters, dict(zip(names, sample)))
+        inputs.update(settings)
+        results = simulate(**{name: inputs[name] for name in arguments})
+        values.append([[results[scenario].value(output, year) for output in outputs] for scenario in results])
+    return list(results), np.array(values, dtype=float)
+
+
+class SobolIndices:
+    """First-order and total Sobol indices of simulation outputs, per scenario.
+
+    first_order and total have shape (scenarios, outputs, parameters). An index is NaN
+    when the output does not vary over the samples.
+    """
+
+    def __init__(self, parameters, scenarios, outputs, first_order, total, evaluations):
+        self.parameters = list(parameters)
+        self.scenarios = list(scenarios)
+        self.outputs = list(outputs)
+        self.first_order = first_order
+        self.total = total
+        self.evaluations = evaluations
+
+    def to_frame(self, scenario, output):
+        """DataFrame of the first-order and total indices of one output, indexed by parameter."""
+        import pandas as pd
+
+        s, o = self.scenarios.index(scenario), self.outputs.index(output)
+        return pd.DataFrame({'First Order': self.first_order[s, o], 'Total': self.total[s, o]},
+                            index=pd.Index(self.parameters, name='Parameter'))
+
+
+def sobol_analysis(parameters, settings, bounds=None, base_samples=1024, outputs=SENSITIVITY_OUTPUTS, year=20,
+                   design='halton', seed=None, workers=None):
+    """Estimate Sobol indices of year-`year` outputs of every run_simulations scenario.
+
+    `parameters` is a parameter module's namespace (e.g. vars() of it) and `settings` the
+    management settings passed to run_simulations (set_removal_rate, set_removal_year,
+    set_injection_years, set_planting_rate, set_planting_year). `bounds` maps each varied
+    parameter to a (low, high) range and defaults to default_bounds(parameters).
+
+    Samples come from a Saltelli design built on a scrambled Halton, Latin hypercube or
+    Sobol' (requires scipy) sequence. Each chunk of EVALUATION_CHUNK_SIZE samples is
+    simulated in one batched pass (see simulate_samples), with chunks spread over
+    `workers` processes (default: every CPU); varying a parameter outside
+    BATCHED_PARAMETERS falls back to one run_simulations call per sample. First-order
+    indices use the Saltelli (2010) estimator and total indices the Jansen estimator.
+    Returns SobolIndices.
+    """
+    bounds = default_bounds(parameters) if bounds is None else bounds
+    names = list(bounds)
+    a, b, ab = saltelli_samples(bounds, base_samples, design, seed)
+    samples = np.concatenate([a, b, ab.reshape(-1, len(names))])
+
+    chunks = [samples[start:start + EVALUATION_CHUNK_SIZE] for start in range(0, len(samples), EVALUATION_CHUNK_SIZE)]
+    workers = workers or os.cpu_count() or 1
+    arguments = [dict(parameters), settings, names]
+    if workers == 1:
+        evaluated = [_evaluate_chunk(*arguments, chunk, outputs, year) for chunk in chunks]
+    else:
+        with ProcessPoolExecutor(max_workers=min(workers, len(chunks))) as executor:
+            evaluated = list(executor.map(_evaluate_chunk, *[[argument] * len(chunks) for argument in arguments],
+                                          chunks, [outputs] * len(chunks), [year] * len(chunks)))
+    scenarios = evaluated[0][0]
+    values = np.concatenate([chunk_values for _, chunk_values in evaluated])
+
+    # values: (samples, scenarios, outputs), split back into f(A), f(B) and f(AB_i)
+    f_a, f_b = values[:base_samples], values[base_samples:2 * base_samples]
+    f_ab = values[2 * base_samples:].reshape(len(names), base_samples, *values.shape[1:])
+    variance = np.var(np.concatenate([f_a, f_b]), axis=0)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        first_order = np.mean(f_b * (f_ab - f_a), axis=1) / variance
+        total = 0.5 * np.mean((f_a - f_ab) ** 2, axis=1) / variance
+    first_order[:, variance == 0] = np.nan
+    total[:, variance == 0] = np.nan
+
+    # (parameters, scenarios, outputs) -> (scenarios, outputs, parameters)
+    return SobolIndices(names, scenarios, outputs, np.moveaxis(first_order, 0, -1), np.moveaxis(total, 0, -1),
+                        len(samples))
+
+
+def report_sobol_indices(indices):
+    """Print the first-order and total indices of every scenario and output, most influential first."""
+    for s, scenario in enumerate(indices.scenarios):
+        print(f"Scenario: {scenario}")
+        for o, output in enumerate(indices.outputs):
+            print(f"  {output} (First Order / Total):")
+            order = np.argsort(-np.nan_to_num(indices.total[s, o], nan=-1.0))
+            for p in order:
+                print(f"    {indices.parameters[p]}: {indices.first_order[s, o, p]:.3f} / {indices.total[s, o, p]:.3f}")
+        print()
@@ -1,6 +1,11 @@
-import pandas as pd
 from math import pi
+from .cohort_engine import CohortStore, mortality_rates_array, vectorize_cost_lookup
+from .result_buffers import SimulationResult
+from .result_cache import cached
+from .summary_reports import report_values, report_counts
 
+# Results are cached on disk by a fingerprint of every argument, so unchanged reruns skip the simulation
+@cached
 def run_simulations(
     starting_ash_trees, starting_diameter, starting_diameter_new, growth_rate,
     growth_rate_new, ash_mortality_rate, injected_ash_mortality_rate, tree_planting_and_establishment_expense,
@@ -11,8 +16,12 @@ def run_simulations(
     # Initialize results containers
     all_results = {}
 
+    # Precompute the age-indexed mortality table and an array-aware removal cost lookup for the cohort engine
+    mortality_table = mortality_rates_array(mortality_rates_by_age, background_mortality_rate, years)
+    removal_cost_lookup = vectorize_cost_lookup(get_removal_cost_by_dbh)
+
     def simulate_control_and_remove():
-        results_control_and_remove = []
+        results_control_and_remove = SimulationResult(years)
 
         # Initialize variables for the simulation
         ash_tree_count = starting_ash_trees
@@ -51,40 +60,40 @@ def run_simulations(
             # Calculate CTLA values (placeholder logic as needed)
             ctla_value_ash = (ash_tree_basal_area * ((tree_planting_and_establishment_expense * inflation_factor) / ((starting_diameter_new / 2) ** 2))) * depreciation_ash
 
-            # Store results for the year in the list directly
-            results_control_and_remove.append({
+            # Store results for the year in the result buffer
+            results_control_and_remove.record(year, {
                 'Year': year,
                 'Ash Tree Count': ash_tree_count,
                 'Non-Ash Tree Count': 0,
                 'Total Tree Count': total_tree_count,
-                'Ash Tree Basal Area': round(ash_tree_basal_area, 2),
+                'Ash Tree Basal Area': ash_tree_basal_area,
                 'Non-Ash Tree Basal Area': 0,
-                'Total Tree Basal Area': round(total_tree_basal_area, 2),
+                'Total Tree Basal Area': total_tree_basal_area,
                 'Cost of Tree Planting and Establishment': 0,  # No tree planting in control simulation
-                'Cost of Pruning': round(pruning_cost, 2),
+                'Cost of Pruning': pruning_cost,
                 'Cost of Injection': 0,  # No tree injection in control simulation
-                'Cost of Removal': round(removal_cost, 2),
-                'Total Costs': round((pruning_cost + removal_cost), 2),
+                'Cost of Removal': removal_cost,
+                'Total Costs': pruning_cost + removal_cost,
                 'Cumulative Cost of Tree Planting and Establishment': 0,  # No tree planting in control simulation
-                'Cumulative Cost of Pruning': round(cumulative_pruning_cost, 2),
+                'Cumulative Cost of Pruning': cumulative_pruning_cost,
                 'Cumulative Cost of Injection': 0,  # No tree injection in control simulation
-                'Cumulative Cost of Removal': round(cumulative_removal_cost, 2),
-                'Cumulative Costs': round((cumulative_pruning_cost + cumulative_removal_cost), 2),
-                'CTLA Value of Ash': round(ctla_value_ash, 2),
+                'Cumulative Cost of Removal': cumulative_removal_cost,
+                'Cumulative Costs': cumulative_pruning_cost + cumulative_removal_cost,
+                'CTLA Value of Ash': ctla_value_ash,
                 'CTLA Value of Non-Ash': 0,
-                'CTLA Value of All Trees': round(ctla_value_ash, 2),
-                'Net Value of All Trees': round((ctla_value_ash - (cumulative_pruning_cost + cumulative_removal_cost)), 2)
+                'CTLA Value of All Trees': ctla_value_ash,
+                'Net Value of All Trees': ctla_value_ash - (cumulative_pruning_cost + cumulative_removal_cost)
             })
 
             # Update the inflation factor for the next year
             inflation_factor *= 1 + annual_inflation_rate
 
-        return pd.DataFrame(results_control_and_remove)
+        return results_control_and_remove
 
     def simulate_control_and_remove_and_replant():
-        # List to store results
-        results_control_and_remove_and_replant = []
-        cohorts = []  # Track non-ash tree cohorts with ages and diameters
+        # Buffer to store results
+        results_control_and_remove_and_replant = SimulationResult(years)
+        cohorts = CohortStore(years + 1)  # Track non-ash tree cohorts with ages and diameters
 
         # Initialize variables for the simulation
         ash_tree_count = starting_ash_trees
@@ -106,47 +115,17 @@ def run_simulations(
             ash_tree_count -= dead_ash_tree_count
             removal_cost_ash = get_removal_cost_by_dbh(average_diameter_ash) * dead_ash_tree_count * inflation_factor
 
-            # Reset non-ash tree count, total diameter, and removal cost for non-ash trees each year
-            non_ash_tree_count = 0
-            total_diameter_non_ash = 0  # Reset total diameter for averaging
-            removal_cost_non_ash = 0
-
             # Apply age-based mortality to each cohort and update non-ash tree count
-            surviving_cohorts = []
-            for cohort in cohorts:
-                cohort['age'] += 1  # Increment age for each cohort
-                cohort['diameter'] += growth_rate_new  # Increment diameter for each cohort
-
-                # Get mortality rate for the cohort's current age
-                mortality_rate = mortality_rates_by_age.get(cohort['age'], background_mortality_rate)
-                dead_trees = int(cohort['count'] * mortality_rate)
-                cohort['count'] -= dead_trees
-
-                # Apply conditional cost logic
-                if cohort['age'] >= 3:
-                    # Removal and replanting costs for trees older than 3 years
-                    removal_cost_non_ash = get_removal_cost_by_dbh(cohort['diameter']) * dead_trees * inflation_factor
-                    cumulative_removal_cost += removal_cost_non_ash
-                    replanting_cost_non_ash = dead_trees * tree_planting_and_establishment_expense * inflation_factor
-                    cumulative_planting_cost += replanting_cost_non_ash
-                else:
-                    # Free replanting for younger trees
-                    replanting_cost_non_ash = 0
-                    cumulative_planting_cost += replanting_cost_non_ash
-
-                # Update non-ash tree count and diameter
-                non_ash_tree_count += cohort['count']
-                total_diameter_non_ash += cohort['diameter'] * cohort['count']
-
-                # Retain surviving cohorts
-                if cohort['count'] > 0:
-                    surviving_cohorts.append(cohort)
-
-            # Replace cohorts with the updated list
-            cohorts = surviving_cohorts
+            cohort_year = cohorts.advance(growth_rate_new, mortality_table, inflation_factor,
+                                          tree_planting_and_establishment_expense, removal_cost_lookup)
+            cumulative_removal_cost += cohort_year.removal_cost
+            cumulative_planting_cost += cohort_year.replanting_cost
+            removal_cost_non_ash = cohort_year.last_removal_cost
+            non_ash_tree_count = cohort_year.tree_count
+            total_diameter_non_ash = cohort_year.total_diameter
 
             # Add a new cohort for the replanted trees (from dead ash trees)
-            cohorts.append({'age': 0, 'count': dead_ash_tree_count, 'diameter': starting_diameter_new})
+            cohorts.plant(dead_ash_tree_count, starting_diameter_new)
 
             # Calculate the average diameter for all non-ash trees
             if non_ash_tree_count > 0:
@@ -180,46 +159,45 @@ def run_simulations(
             ctla_value_all_trees = ctla_value_ash + ctla_value_non_ash
 
             # Store results for the year
-            results_control_and_remove_and_replant.append({
+            results_control_and_remove_and_replant.record(year, {
                 'Year': year,
 
                 'Ash Tree Count': ash_tree_count,
                 'Non-Ash Tree Count': non_ash_tree_count,
                 'Total Tree Count': total_tree_count,
 
-                'Ash Tree Basal Area': round(ash_tree_basal_area, 2),
-                'Non-Ash Tree Basal Area': round(non_ash_tree_basal_area, 2),
-                'Total Tree Basal Area': round(total_tree_basal_area, 2),
+                'Ash Tree Basal Area': ash_tree_basal_area,
+                'Non-Ash Tree Basal Area': non_ash_tree_basal_area,
+                'Total Tree Basal Area': total_tree_basal_area,
 
-                'Cost of Tree Planting and Establishment': round(replanting_cost, 2),
-                'Cost of Pruning': round(pruning_cost, 2),
+                'Cost of Tree Planting and Establishment': replanting_cost,
+                'Cost of Pruning': pruning_cost,
                 'Cost of Injection': 0,  # No tree injection in control simulation
-                'Cost of Removal': round(total_removal_cost, 2),
-                'Total Costs': round((replanting_cost + pruning_cost + total_removal_cost), 2),
+                'Cost of Removal': total_removal_cost,
+                'Total Costs': replanting_cost + pruning_cost + total_removal_cost,
 
-                'Cumulative Cost of Tree Planting and Establishment': round(cumulative_planting_cost, 2),
-                'Cumulative Cost of Pruning': round(cumulative_pruning_cost, 2),
+                'Cumulative Cost of Tree Planting and Establishment': cumulative_planting_cost,
+                'Cumulative Cost of Pruning': cumulative_pruning_cost,
                 'Cumulative Cost of Injection': 0,  # No tree injection in control simulation
-                'Cumulative Cost of Removal': round(cumulative_removal_cost, 2),
-                'Cumulative Costs': round((cumulative_planting_cost + cumulative_pruning_cost + cumulative_removal_cost), 2),
+                'Cumulative Cost of Removal': cumulative_removal_cost,
+                'Cumulative Costs': cumulative_planting_cost + cumulative_pruning_cost + cumulative_removal_cost,
 
-                'CTLA Value of Ash': round(ctla_value_ash, 2),
-                'CTLA Value of Non-Ash': round(ctla_value_non_ash, 2),
-                'CTLA Value of All Trees': round(ctla_value_all_trees, 2),
+                'CTLA Value of Ash': ctla_value_ash,
+                'CTLA Value of Non-Ash': ctla_value_non_ash,
+                'CTLA Value of All Trees': ctla_value_all_trees,
 
-                'Net Value of All Trees': round((ctla_value_all_trees - (cumulative_planting_cost + cumulative_pruning_cost + cumulative_removal_cost)), 2)
+                'Net Value of All Trees': ctla_value_all_trees - (cumulative_planting_cost + cumulative_pruning_cost + cumulative_removal_cost)
             })
 
             # Update the inflation factor for the next year
             inflation_factor *= 1 + annual_inflation_rate
 
-        # After the loop, convert to DataFrame
-        return pd.DataFrame(results_control_and_remove_and_replant)
+        return results_control_and_remove_and_replant
 
     def simulate_remove_then_replant():
-        # List to store results
-        results_remove_then_replant = []
-        cohorts = []  # Track non-ash tree cohorts with ages
+        # Buffer to store results
+        results_remove_then_replant = SimulationResult(years)
+        cohorts = CohortStore(years + 1)  # Track non-ash tree cohorts with ages
 
         # Initialize variables for the simulation
         ash_tree_count = starting_ash_trees
@@ -244,43 +222,16 @@ def run_simulations(
             ash_tree_count -= trees_to_remove
 
             # Add removed ash trees as a new non-ash cohort (replanting) with initial diameter
-            cohorts.append({'age': 0, 'count': trees_to_remove, 'diameter': starting_diameter_new})
-
-            # Reset non-ash tree count, total diameter, and removal cost for non-ash trees each year
-            non_ash_tree_count = 0
-            total_diameter_non_ash = 0  # Reset this each year
-            removal_cost_non_ash = 0
+            cohorts.plant(trees_to_remove, starting_diameter_new)
 
             # Apply age-based mortality to each cohort and update non-ash tree count
-            surviving_cohorts = []
-            for cohort in cohorts:
-                cohort['age'] += 1  # Increment age for each cohort
-                cohort['diameter'] += growth_rate_new  # Increment diameter for each cohort
-
-                # Get mortality rate for the cohort's current age
-                mortality_rate = mortality_rates_by_age.get(cohort['age'], background_mortality_rate)
-                dead_trees = int(cohort['count'] * mortality_rate)
-                cohort['count'] -= dead_trees
-
-                # Conditional cost logic based on age
-                if cohort['age'] >= 3:
-                    removal_cost_non_ash = get_removal_cost_by_dbh(cohort['diameter']) * dead_trees * inflation_factor
-                    cumulative_removal_cost += removal_cost_non_ash
-                    replanting_cost_non_ash = dead_trees * tree_planting_and_establishment_expense * inflation_factor
-                    cumulative_planting_cost += replanting_cost_non_ash
-                else:
-                    replanting_cost_non_ash = 0
-                    cumulative_planting_cost += replanting_cost_non_ash
-
-                # Update non-ash tree count and diameter
-                non_ash_tree_count += cohort['count']
-                total_diameter_non_ash += cohort['diameter'] * cohort['count']
-
-                if cohort['count'] > 0:
-                    surviving_cohorts.append(cohort)
-
-            # Update cohorts with surviving trees
-            cohorts = surviving_cohorts
+            cohort_year = cohorts.advance(growth_rate_new, mortality_table, inflation_factor,
+                                          tree_planting_and_establishment_expense, removal_cost_lookup)
+            cumulative_removal_cost += cohort_year.removal_cost
+            cumulative_planting_cost += cohort_year.replanting_cost
+            removal_cost_non_ash = cohort_year.last_removal_cost
+            non_ash_tree_count = cohort_year.tree_count
+            total_diameter_non_ash = cohort_year.total_diameter
 
             # Calculate the average diameter for all non-ash trees
             if non_ash_tree_count > 0:
@@ -315,45 +266,45 @@ def run_simulations(
             ctla_value_all_trees = ctla_value_ash + ctla_value_non_ash
 
             # Store results for the year
-            results_remove_then_replant.append({
+            results_remove_then_replant.record(year, {
                 'Year': year,
 
                 'Ash Tree Count': ash_tree_count,
                 'Non-Ash Tree Count': non_ash_tree_count,
                 'Total Tree Count': total_tree_count,
 
-                'Ash Tree Basal Area': round(ash_tree_basal_area, 2),
-                'Non-Ash Tree Basal Area': round(non_ash_tree_basal_area, 2),
-                'Total Tree Basal Area': round(total_tree_basal_area, 2),
+                'Ash Tree Basal Area': ash_tree_basal_area,
+                'Non-Ash Tree Basal Area': non_ash_tree_basal_area,
+                'Total Tree Basal Area': total_tree_basal_area,
 
-                'Cost of Tree Planting and Establishment': round(replanting_cost, 2),
-                'Cost of Pruning': round(pruning_cost, 2),  # Pruning costs applied to non-ash trees
+                'Cost of Tree Planting and Establishment': replanting_cost,
+                'Cost of Pruning': pruning_cost,  # Pruning costs applied to non-ash trees
                 'Cost of Injection': 0,  # No tree injection in this simulation
-                'Cost of Removal': round(total_removal_cost, 2),
-                'Total Costs': round((replanting_cost + pruning_cost + total_removal_cost), 2),
+                'Cost of Removal': total_removal_cost,
+                'Total Costs': replanting_cost + pruning_cost + total_removal_cost,
 
-                'Cumulative Cost of Tree Planting and Establishment': round(cumulative_planting_cost, 2),
-                'Cumulative Cost of Pruning': round(cumulative_pruning_cost, 2),
+                'Cumulative Cost of Tree Planting and Establishment': cumulative_planting_cost,
+                'Cumulative Cost of Pruning': cumulative_pruning_cost,
                 'Cumulative Cost of Injection': 0,  # No tree injection in this simulation
-                'Cumulative Cost of Removal': round(cumulative_removal_cost, 2),
-                'Cumulative Costs': round((cumulative_planting_cost + cumulative_pruning_cost + cumulative_removal_cost), 2),
+                'Cumulative Cost of Removal': cumulative_removal_cost,
+                'Cumulative Costs': cumulative_planting_cost + cumulative_pruning_cost + cumulative_removal_cost,
 
-                'CTLA Value of Ash': round(ctla_value_ash, 2),
-                'CTLA Value of Non-Ash': round(ctla_value_non_ash, 2),
-                'CTLA Value of All Trees': round(ctla_value_all_trees, 2),
+                'CTLA Value of Ash': ctla_value_ash,
+                'CTLA Value of Non-Ash': ctla_value_non_ash,
+                'CTLA Value of All Trees': ctla_value_all_trees,
 
-                'Net Value of All Trees': round((ctla_value_all_trees - (cumulative_planting_cost + cumulative_pruning_cost + cumulative_removal_cost)), 2)
+                'Net Value of All Trees': ctla_value_all_trees - (cumulative_planting_cost + cumulative_pruning_cost + cumulative_removal_cost)
             })
 
             # Update the inflation factor for the next year
             inflation_factor *= 1 + annual_inflation_rate
 
-        return pd.DataFrame(results_remove_then_replant)
+        return results_remove_then_replant
 
     def simulate_replant_inject_then_remove():
-        # List to store results
-        results_replant_inject_then_remove = []
-        cohorts = []  # Track non-ash tree cohorts with ages
+        # Buffer to store results
+        results_replant_inject_then_remove = SimulationResult(years)
+        cohorts = CohortStore(years + 1)  # Track non-ash tree cohorts with ages
 
         # Initialize variables for the simulation
         ash_tree_count = starting_ash_trees
@@ -407,7 +358,7 @@ def run_simulations(
                 remaining_trees_to_replace = max(0, starting_ash_trees - non_ash_tree_count)
                 planting_rate = min(set_planting_rate, remaining_trees_to_replace)
                 non_ash_tree_count += planting_rate
-                cohorts.append({'age': 0, 'count': planting_rate, 'diameter': starting_diameter_new})
+                cohorts.plant(planting_rate, starting_diameter_new)
 
             # Calculate replanting cost with inflation (only for newly planted trees during replanting years)
             if year >= set_removal_year:
@@ -416,44 +367,15 @@ def run_simulations(
             else:
                 replanting_cost = 0
 
-            # Reset non-ash tree count and total diameter each year
-            non_ash_tree_count = 0
-            total_diameter_non_ash = 0
-            removal_cost_non_ash = 0
-
             # Age-based mortality and diameter growth for each non-ash cohort
-            surviving_cohorts = []
-            for cohort in cohorts:
-                cohort['age'] += 1
-                cohort['diameter'] += growth_rate_new
-
-                # Mortality for each cohort
-                mortality_rate = mortality_rates_by_age.get(cohort['age'], background_mortality_rate)
-                dead_trees = int(cohort['count'] * mortality_rate)
-                cohort['count'] -= dead_trees
-
-                # Conditional cost logic based on age
-                if cohort['age'] >= 3:
-                    # Apply both removal and replanting costs for trees older than 3 years
-                    removal_cost_non_ash = dead_trees * get_removal_cost_by_dbh(cohort['diameter']) * inflation_factor
-                    cumulative_removal_cost += removal_cost_non_ash
-                    replanting_cost_non_ash = dead_trees * tree_planting_and_establishment_expense * inflation_factor
-                    cumulative_planting_cost += replanting_cost_non_ash
-                else:
-                    # Free replanting cost without removal for trees younger than 3 years
-                    replanting_cost_non_ash = dead_trees * tree_planting_and_establishment_expense * inflation_factor
-                    cumulative_planting_cost += replanting_cost_non_ash
-
-                # Update non-ash tree count and total diameter
-                non_ash_tree_count += cohort['count']
-                total_diameter_non_ash += cohort['diameter'] * cohort['count']
-
-                # Keep cohorts with surviving trees
-                if cohort['count'] > 0:
-                    surviving_cohorts.append(cohort)
-
-            # Update cohorts with surviving trees
-            cohorts = surviving_cohorts
+            cohort_year = cohorts.advance(growth_rate_new, mortality_table, inflation_factor,
+                                          tree_planting_and_establishment_expense, removal_cost_lookup,
+                                          charge_young_replanting=True)
+            cumulative_removal_cost += cohort_year.removal_cost
+            cumulative_planting_cost += cohort_year.replanting_cost
+            removal_cost_non_ash = cohort_year.last_removal_cost
+            non_ash_tree_count = cohort_year.tree_count
+            total_diameter_non_ash = cohort_year.total_diameter
 
             # Average diameter for non-ash trees
             if non_ash_tree_count > 0:
@@ -481,45 +403,45 @@ def run_simulations(
             ctla_value_all_trees = ctla_value_ash + ctla_value_non_ash
 
             # Store results
-            results_replant_inject_then_remove.append({
+            results_replant_inject_then_remove.record(year, {
                 'Year': year,
 
                 'Ash Tree Count': ash_tree_count,
                 'Non-Ash Tree Count': non_ash_tree_count,
                 'Total Tree Count': total_tree_count,
 
-                'Ash Tree Basal Area': round(ash_tree_basal_area, 2),
-                'Non-Ash Tree Basal Area': round(non_ash_tree_basal_area, 2),
-                'Total Tree Basal Area': round(total_tree_basal_area, 2),
+                'Ash Tree Basal Area': ash_tree_basal_area,
+                'Non-Ash Tree Basal Area': non_ash_tree_basal_area,
+                'Total Tree Basal Area': total_tree_basal_area,
 
-                'Cost of Tree Planting and Establishment': round(replanting_cost, 2),
-                'Cost of Pruning': round(total_pruning_cost, 2),
-                'Cost of Injection': round(injection_cost, 2),
-                'Cost of Removal': round(removal_cost + removal_cost_non_ash, 2),
-                'Total Costs': round(replanting_cost + total_pruning_cost + injection_cost + removal_cost + removal_cost_non_ash, 2),
+                'Cost of Tree Planting and Establishment': replanting_cost,
+                'Cost of Pruning': total_pruning_cost,
+                'Cost of Injection': injection_cost,
+                'Cost of Removal': removal_cost + removal_cost_non_ash,
+                'Total Costs': replanting_cost + total_pruning_cost + injection_cost + removal_cost + removal_cost_non_ash,
 
-                'Cumulative Cost of Tree Planting and Establishment': round(cumulative_planting_cost, 2),
-                'Cumulative Cost of Pruning': round(cumulative_pruning_cost, 2),
-                'Cumulative Cost of Injection': round(cumulative_injection_cost, 2),
-                'Cumulative Cost of Removal': round(cumulative_removal_cost, 2),
-                'Cumulative Costs': round(cumulative_planting_cost + cumulative_pruning_cost + cumulative_injection_cost + cumulative_removal_cost, 2),
+                'Cumulative Cost of Tree Planting and Establishment': cumulative_planting_cost,
+                'Cumulative Cost of Pruning': cumulative_pruning_cost,
+                'Cumulative Cost of Injection': cumulative_injection_cost,
+                'Cumulative Cost of Removal': cumulative_removal_cost,
+                'Cumulative Costs': cumulative_planting_cost + cumulative_pruning_cost + cumulative_injection_cost + cumulative_removal_cost,
 
-                'CTLA Value of Ash': round(ctla_value_ash, 2),
-                'CTLA Value of Non-Ash': round(ctla_value_non_ash, 2),
-                'CTLA Value of All Trees': round(ctla_value_all_trees, 2),
+                'CTLA Value of Ash': ctla_value_ash,
+                'CTLA Value of Non-Ash': ctla_value_non_ash,
+                'CTLA Value of All Trees': ctla_value_all_trees,
 
-                'Net Value of All Trees': round(ctla_value_all_trees - cumulative_planting_cost - cumulative_pruning_cost - cumulative_injection_cost - cumulative_removal_cost, 2)
+                'Net Value of All Trees': ctla_value_all_trees - cumulative_planting_cost - cumulative_pruning_cost - cumulative_injection_cost - cumulative_removal_cost
             })
 
             # Update the inflation factor for the next year
             inflation_factor *= 1 + annual_inflation_rate
 
-        return pd.DataFrame(results_replant_inject_then_remove)
+        return results_replant_inject_then_remove
 
     def simulate_inject_remove_and_replant():
-        # List to store results
-        results_inject_remove_and_replant = []
-        cohorts = []  # Track non-ash tree cohorts with ages
+        # Buffer to store results
+        results_inject_remove_and_replant = SimulationResult(years)
+        cohorts = CohortStore(years + 1)  # Track non-ash tree cohorts with ages
 
         # Initialize variables for the simulation
         ash_tree_count = starting_ash_trees
@@ -555,7 +477,7 @@ def run_simulations(
                 cumulative_removal_cost += removal_cost
 
                 # Replant dead ash trees as non-ash trees in a new cohort
-                cohorts.append({'age': 0, 'count': trees_died, 'diameter': starting_diameter_new})
+                cohorts.plant(trees_died, starting_diameter_new)
 
                 # Calculate replanting cost for new non-ash trees
                 replanting_cost = trees_died * tree_planting_and_establishment_expense * inflation_factor
@@ -572,7 +494,7 @@ def run_simulations(
                 cumulative_removal_cost += removal_cost
 
                 # Replant the removed ash trees with non-ash trees in a new cohort
-                cohorts.append({'age': 0, 'count': trees_to_remove, 'diameter': starting_diameter_new})
+                cohorts.plant(trees_to_remove, starting_diameter_new)
 
                 # Calculate replanting cost for new non-ash trees
                 replanting_cost = trees_to_remove * tree_planting_and_establishment_expense * inflation_factor
@@ -581,40 +503,14 @@ def run_simulations(
                 # Set injection cost to zero after the injection period
                 injection_cost = 0
 
-            # Reset non-ash tree count, total diameter, and removal cost each year
-            non_ash_tree_count = 0
-            total_diameter_non_ash = 0
-            removal_cost_non_ash = 0
-            surviving_cohorts = []
-            for cohort in cohorts:
-                cohort['age'] += 1
-                cohort['diameter'] += growth_rate_new
-
-                # Mortality for each cohort
-                mortality_rate = mortality_rates_by_age.get(cohort['age'], background_mortality_rate)
-                dead_trees = int(cohort['count'] * mortality_rate)
-                cohort['count'] -= dead_trees
-
-                # Conditional cost logic based on age
-                if cohort['age'] >= 3:
-                    # Calculate removal cost for dead non-ash trees using cost lookup
-                    removal_cost_non_ash = dead_trees * get_removal_cost_by_dbh(cohort['diameter']) * inflation_factor
-                    cumulative_removal_cost += removal_cost_non_ash
-                    replanting_cost_non_ash = dead_trees * tree_planting_and_establishment_expense * inflation_factor
-                    cumulative_planting_cost += replanting_cost_non_ash
-                else:
-                    replanting_cost_non_ash = 0
-                    cumulative_planting_cost += replanting_cost_non_ash
-
-                # Update non-ash tree count and diameter
-                non_ash_tree_count += cohort['count']
-                total_diameter_non_ash += cohort['diameter'] * cohort['count']
-
-                if cohort['count'] > 0:
-                    surviving_cohorts.append(cohort)
-
-            # Update cohorts with surviving trees
-            cohorts = surviving_cohorts
+            # Age-based mortality and diameter growth for each non-ash cohort
+            cohort_year = cohorts.advance(growth_rate_new, mortality_table, inflation_factor,
+                                          tree_planting_and_establishment_expense, removal_cost_lookup)
+            cumulative_removal_cost += cohort_year.removal_cost
+            cumulative_planting_cost += cohort_year.replanting_cost
+            removal_cost_non_ash = cohort_year.last_removal_cost
+            non_ash_tree_count = cohort_year.tree_count
+            total_diameter_non_ash = cohort_year.total_diameter
 
             # Calculate average diameter for non-ash trees
             if non_ash_tree_count > 0:
@@ -642,45 +538,44 @@ def run_simulations(
             ctla_value_all_trees = ctla_value_ash + ctla_value_non_ash
 
             # Store results
-            results_inject_remove_and_replant.append({
+            results_inject_remove_and_replant.record(year, {
                 'Year': year,
 
                 'Ash Tree Count': ash_tree_count,
                 'Non-Ash Tree Count': non_ash_tree_count,
                 'Total Tree Count': total_tree_count,
 
-                'Ash Tree Basal Area': round(ash_tree_basal_area, 2),
-                'Non-Ash Tree Basal Area': round(non_ash_tree_basal_area, 2),
-                'Total Tree Basal Area': round(total_tree_basal_area, 2),
+                'Ash Tree Basal Area': ash_tree_basal_area,
+                'Non-Ash Tree Basal Area': non_ash_tree_basal_area,
+                'Total Tree Basal Area': total_tree_basal_area,
 
-                'Cost of Tree Planting and Establishment': round(replanting_cost, 2),
-                'Cost of Pruning': round(total_pruning_cost, 2),
-                'Cost of Injection': round(injection_cost, 2),
-                'Cost of Removal': round(removal_cost + removal_cost_non_ash, 2),
-                'Total Costs': round(replanting_cost + total_pruning_cost + injection_cost + removal_cost + removal_cost_non_ash, 2),
+                'Cost of Tree Planting and Establishment': replanting_cost,
+                'Cost of Pruning': total_pruning_cost,
+                'Cost of Injection': injection_cost,
+                'Cost of Removal': removal_cost + removal_cost_non_ash,
+                'Total Costs': replanting_cost + total_pruning_cost + injection_cost + removal_cost + removal_cost_non_ash,
 
-                'Cumulative Cost of Tree Planting and Establishment': round(cumulative_planting_cost, 2),
-                'Cumulative Cost of Pruning': round(cumulative_pruning_cost, 2),
-                'Cumulative Cost of Injection': round(cumulative_injection_cost, 2),
-                'Cumulative Cost of Removal': round(cumulative_removal_cost, 2),
-                'Cumulative Costs': round(cumulative_planting_cost + cumulative_pruning_cost + cumulative_injection_cost + cumulative_removal_cost, 2),
+                'Cumulative Cost of Tree Planting and Establishment': cumulative_planting_cost,
+                'Cumulative Cost of Pruning': cumulative_pruning_cost,
+                'Cumulative Cost of Injection': cumulative_injection_cost,
+                'Cumulative Cost of Removal': cumulative_removal_cost,
+                'Cumulative Costs': cumulative_planting_cost + cumulative_pruning_cost + cumulative_injection_cost + cumulative_removal_cost,
 
-                'CTLA Value of Ash': round(ctla_value_ash, 2),
-                'CTLA Value of Non-Ash': round(ctla_value_non_ash, 2),
-                'CTLA Value of All Trees': round(ctla_value_all_trees, 2),
+                'CTLA Value of Ash': ctla_value_ash,
+                'CTLA Value of Non-Ash': ctla_value_non_ash,
+                'CTLA Value of All Trees': ctla_value_all_trees,
 
-                'Net Value of All Trees': round(
-                    ctla_value_all_trees - (cumulative_planting_cost + cumulative_pruning_cost + cumulative_injection_cost + cumulative_removal_cost), 2)
+                'Net Value of All Trees': ctla_value_all_trees - (cumulative_planting_cost + cumulative_pruning_cost + cumulative_injection_cost + cumulative_removal_cost)
             })
 
             # Update the inflation factor for the next year
             inflation_factor *= 1 + annual_inflation_rate
 
-        return pd.DataFrame(results_inject_remove_and_replant)
+        return results_inject_remove_and_replant
 
     def simulate_inject_in_perpetuity():
-        # List to store results
-        results_inject_in_perpetuity = []
+        # Buffer to store results
+        results_inject_in_perpetuity = SimulationResult(years)
 
         # Initialize variables for the simulation
         ash_tree_count = starting_ash_trees
@@ -724,50 +619,49 @@ def run_simulations(
             ctla_value_ash = ((tree_planting_and_establishment_expense * inflation_factor) / ((starting_diameter_new / 2) ** 2)) * depreciation_ash * ash_tree_basal_area
 
             # Store results for the year
-            results_inject_in_perpetuity.append({
+            results_inject_in_perpetuity.record(year, {
                 'Year': year,
 
                 'Ash Tree Count': ash_tree_count,
                 'Non-Ash Tree Count': 0,
                 'Total Tree Count': total_tree_count,
 
-                'Ash Tree Basal Area': round(ash_tree_basal_area, 2),
+                'Ash Tree Basal Area': ash_tree_basal_area,
                 'Non-Ash Tree Basal Area': 0,
-                'Total Tree Basal Area': round(total_tree_basal_area, 2),
+                'Total Tree Basal Area': total_tree_basal_area,
 
                 'Cost of Tree Planting and Establishment': 0,
-                'Cost of Pruning': round(pruning_cost_ash, 2),
-                'Cost of Injection': round(annual_injection_cost, 2),
-                'Cost of Removal': round(annual_removal_cost, 2),
-                'Total Costs': round((pruning_cost_ash + annual_injection_cost + annual_removal_cost), 2),
+                'Cost of Pruning': pruning_cost_ash,
+                'Cost of Injection': annual_injection_cost,
+                'Cost of Removal': annual_removal_cost,
+                'Total Costs': pruning_cost_ash + annual_injection_cost + annual_removal_cost,
 
                 'Cumulative Cost of Tree Planting and Establishment': 0,
-                'Cumulative Cost of Pruning': round(cumulative_pruning_cost, 2),
-                'Cumulative Cost of Injection': round(cumulative_injection_cost, 2),
-                'Cumulative Cost of Removal': round(cumulative_removal_cost, 2),
-                'Cumulative Costs': round((cumulative_pruning_cost + cumulative_injection_cost + cumulative_removal_cost), 2),
+                'Cumulative Cost of Pruning': cumulative_pruning_cost,
+                'Cumulative Cost of Injection': cumulative_injection_cost,
+                'Cumulative Cost of Removal': cumulative_removal_cost,
+                'Cumulative Costs': cumulative_pruning_cost + cumulative_injection_cost + cumulative_removal_cost,
 
-                'CTLA Value of Ash': round(ctla_value_ash, 2),
+                'CTLA Value of Ash': ctla_value_ash,
                 'CTLA Value of Non-Ash': 0,
-                'CTLA Value of All Trees': round(ctla_value_ash, 2),
+                'CTLA Value of All Trees': ctla_value_ash,
 
-                'Net Value of All Trees': round(
-                    (ctla_value_ash - (cumulative_pruning_cost + cumulative_injection_cost + cumulative_removal_cost)), 2)
+                'Net Value of All Trees': ctla_value_ash - (cumulative_pruning_cost + cumulative_injection_cost + cumulative_removal_cost)
             })
 
             # Update the inflation factor for the next year
             inflation_factor *= 1 + annual_inflation_rate
 
-        return pd.DataFrame(results_inject_in_perpetuity)
+        return results_inject_in_perpetuity
 
     def simulate_inject_in_perpetuity_and_replant():
-        # List to store results
-        results_inject_in_perpetuity_and_replant = []
+        # Buffer to store results
+        results_inject_in_perpetuity_and_replant = SimulationResult(years)
 
         # Initialize variables for the simulation
         ash_tree_count = starting_ash_trees
         average_diameter_ash = starting_diameter
-        cohorts = []  # Track non-ash tree cohorts with their age and diameter
+        cohorts = CohortStore(years + 1)  # Track non-ash tree cohorts with their age and diameter
 
         # Cumulative cost trackers
         cumulative_removal_cost = 0
@@ -796,48 +690,19 @@ def run_simulations(
             cumulative_removal_cost += annual_removal_cost
 
             # Replant dead ash trees as new non-ash trees in a cohort with initial diameter
-            cohorts.append({'age': 0, 'count': trees_died, 'diameter': starting_diameter_new})
+            cohorts.plant(trees_died, starting_diameter_new)
 
             # Calculate replanting cost for new non-ash trees with inflation
             annual_replanting_cost = trees_died * tree_planting_and_establishment_expense * inflation_factor
             cumulative_planting_cost += annual_replanting_cost
 
-            # Track non-ash tree count and reset for calculation each year
-            non_ash_tree_count = 0
-            total_diameter_non_ash = 0  # To calculate the average diameter of non-ash trees
-
             # Update each cohort's age and diameter, apply mortality, and calculate removal costs
-            surviving_cohorts = []
-            for cohort in cohorts:
-                cohort['age'] += 1
-                cohort['diameter'] += growth_rate_new
-
-                # Apply mortality to the cohort based on age
-                mortality_rate = mortality_rates_by_age.get(cohort['age'], background_mortality_rate)
-                dead_trees = int(cohort['count'] * mortality_rate)
-                cohort['count'] -= dead_trees
-
-                # Check age to determine costs
-                if cohort['age'] >= 3:
-                    # Removal and replanting costs for trees older than 3 years
-                    removal_cost_non_ash = dead_trees * get_removal_cost_by_dbh(cohort['diameter']) * inflation_factor
-                    cumulative_removal_cost += removal_cost_non_ash
-                    replanting_cost_non_ash = dead_trees * tree_planting_and_establishment_expense * inflation_factor
-                    cumulative_planting_cost += replanting_cost_non_ash
-                else:
-                    # Free replanting for younger trees
-                    replanting_cost_non_ash = 0
-                    cumulative_planting_cost += replanting_cost_non_ash
-
-                # Update non-ash tree count and diameter
-                non_ash_tree_count += cohort['count']
-                total_diameter_non_ash += cohort['diameter'] * cohort['count']
-
-                if cohort['count'] > 0:
-                    surviving_cohorts.append(cohort)
-
-            # Update cohorts with surviving trees
-            cohorts = surviving_cohorts
+            cohort_year = cohorts.advance(growth_rate_new, mortality_table, inflation_factor,
+                                          tree_planting_and_establishment_expense, removal_cost_lookup)
+            cumulative_removal_cost += cohort_year.removal_cost
+            cumulative_planting_cost += cohort_year.replanting_cost
+            non_ash_tree_count = cohort_year.tree_count
+            total_diameter_non_ash = cohort_year.total_diameter
 
             # Calculate the average diameter for all non-ash trees
             if non_ash_tree_count > 0:
@@ -863,34 +728,34 @@ def run_simulations(
             ctla_value_all_trees = ctla_value_ash + ctla_value_non_ash
 
             # Store results for the year
-            results_inject_in_perpetuity_and_replant.append({
+            results_inject_in_perpetuity_and_replant.record(year, {
                 'Year': year,
                 'Ash Tree Count': ash_tree_count,
                 'Non-Ash Tree Count': non_ash_tree_count,
                 'Total Tree Count': total_tree_count,
-                'Ash Tree Basal Area': round(ash_tree_basal_area, 2),
-                'Non-Ash Tree Basal Area': round(non_ash_tree_basal_area, 2),
-                'Total Tree Basal Area': round(total_tree_basal_area, 2),
-                'Cost of Tree Planting and Establishment': round(annual_replanting_cost, 2),
-                'Cost of Pruning': round(total_pruning_cost, 2),
-                'Cost of Injection': round(annual_injection_cost, 2),
-                'Cost of Removal': round(annual_removal_cost, 2),
-                'Total Costs': round((annual_replanting_cost + total_pruning_cost + annual_injection_cost + annual_removal_cost), 2),
-                'Cumulative Cost of Tree Planting and Establishment': round(cumulative_planting_cost, 2),
-                'Cumulative Cost of Pruning': round(cumulative_pruning_cost, 2),
-                'Cumulative Cost of Injection': round(cumulative_injection_cost, 2),
-                'Cumulative Cost of Removal': round(cumulative_removal_cost, 2),
-                'Cumulative Costs': round((cumulative_planting_cost + cumulative_pruning_cost + cumulative_injection_cost + cumulative_removal_cost), 2),
-                'CTLA Value of Ash': round(ctla_value_ash, 2),
-                'CTLA Value of Non-Ash': round(ctla_value_non_ash, 2),
-                'CTLA Value of All Trees': round(ctla_value_all_trees, 2),
-                'Net Value of All Trees': round((ctla_value_all_trees - (cumulative_planting_cost + cumulative_pruning_cost + cumulative_injection_cost + cumulative_removal_cost)), 2)
+                'Ash Tree Basal Area': ash_tree_basal_area,
+                'Non-Ash Tree Basal Area': non_ash_tree_basal_area,
+                'Total Tree Basal Area': total_tree_basal_area,
+                'Cost of Tree Planting and Establishment': annual_replanting_cost,
+                'Cost of Pruning': total_pruning_cost,
+                'Cost of Injection': annual_injection_cost,
+                'Cost of Removal': annual_removal_cost,
+                'Total Costs': annual_replanting_cost + total_pruning_cost + annual_injection_cost + annual_removal_cost,
+                'Cumulative Cost of Tree Planting and Establishment': cumulative_planting_cost,
+                'Cumulative Cost of Pruning': cumulative_pruning_cost,
+                'Cumulative Cost of Injection': cumulative_injection_cost,
+                'Cumulative Cost of Removal': cumulative_removal_cost,
+                'Cumulative Costs': cumulative_planting_cost + cumulative_pruning_cost + cumulative_injection_cost + cumulative_removal_cost,
+                'CTLA Value of Ash': ctla_value_ash,
+                'CTLA Value of Non-Ash': ctla_value_non_ash,
+                'CTLA Value of All Trees': ctla_value_all_trees,
+                'Net Value of All Trees': ctla_value_all_trees - (cumulative_planting_cost + cumulative_pruning_cost + cumulative_injection_cost + cumulative_removal_cost)
             })
 
             # Update the inflation factor for the next year
             inflation_factor *= 1 + annual_inflation_rate
 
-        return pd.DataFrame(results_inject_in_perpetuity_and_replant)
+        return results_inject_in_perpetuity_and_replant
 
     # Run simulations and store results
     all_results['Control and Remove'] = simulate_control_and_remove()
@@ -905,47 +770,10 @@ def run_simulations(
     return all_results
 
 
-# Function to extract and report year 20 values
+# Report the year 20 values of every scenario; report_values takes any list of horizons
 def report_year_20_values(simulation_results):
-    # Iterate through each simulation scenario
-    for scenario, df in simulation_results.items():
-        # Filter data for year 20
-        year_20_data = df[df['Year'] == 20]
-        if not year_20_data.empty:
-            # Extract relevant values and convert to thousands of dollars, rounded to 1 decimal place
-            cumulative_costs = round(year_20_data['Cumulative Costs'].values[0] / 1000, 1)
-            ctla_value_all_trees = round(year_20_data['CTLA Value of All Trees'].values[0] / 1000, 1)
-            net_value_all_trees = round(year_20_data['Net Value of All Trees'].values[0] / 1000, 1)
-
-            # Print the results
-            print(f"Scenario: {scenario}")
-            print(f"  Cumulative Costs: ${cumulative_costs}k")
-            print(f"  CTLA Value of All Trees: ${ctla_value_all_trees}k")
-            print(f"  Net Value of All Trees: ${net_value_all_trees}k")
-            print()
-
-# Function to extract and report year 20 counts
+    report_values(simulation_results, horizons=(20,))
+
+# Report the year 20 counts of every scenario; report_counts takes any list of horizons
 def report_year_20_counts(simulation_results):
-    # Iterate through each simulation scenario
-    for scenario, df in simulation_results.items():
-        # Filter data for year 20
-        year_20_data = df[df['Year'] == 20]
-        if not year_20_data.empty:
-            # Extract relevant values and convert to thousands of dollars, rounded to 1 decimal place
-            ash_tree_basal_count = year_20_data['Ash Tree Count'].values[0]
-            non_ash_tree_count = year_20_data['Non-Ash Tree Count'].values[0]
-            total_tree_basal_count = year_20_data['Total Tree Count'].values[0]
-
-            ash_tree_basal_area = year_20_data['Ash Tree Basal Area'].values[0]
-            non_ash_tree_basal_area = year_20_data['Non-Ash Tree Basal Area'].values[0]
-            total_tree_basal_area = year_20_data['Total Tree Basal Area'].values[0]
-
-            # Print the results
-            print(f"Scenario: {scenario}")
-            print(f"  Ash Tree Count: {ash_tree_basal_count}")
-            print(f"  Non-Ash Tree Count: {non_ash_tree_count}")
-            print(f"  Total Tree Count: {total_tree_basal_count}")
-            print(f"  Ash Tree Basal Area: {ash_tree_basal_area}")
-            print(f"  Non-Ash Tree Basal Area: {non_ash_tree_basal_area}")
-            print(f"  Total Tree Basal Area: {total_tree_basal_area}")
-            print()
+    report_counts(simulation_results, horizons=(20,))
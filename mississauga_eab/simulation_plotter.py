@@ -0,0 +1,164 @@
+import os
+import pickle
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+
+# Metrics to plot: (column, y-axis label, subplot title)
+SIMULATION_PLOT_METRICS = (
+    ('Total Tree Count', 'Tree Count', 'Total Tree Count Over Time'),
+    ('Total Tree Basal Area', 'Basal Area (cubic meters)', 'Total Tree Basal Area Over Time'),
+    ('Total Costs', 'Cost (per $1k)', 'Annual Costs'),
+    ('Cumulative Costs', 'Cost (per $1k)', 'Cumulative Costs Over Time'),
+    ('CTLA Value of All Trees', 'CTLA Value (per $1k)', 'CTLA Value of All Trees Over Time'),
+    ('Net Value of All Trees', 'Net Value (per $1k)', 'Net Value of All Trees Over Time'),
+)
+
+# Metrics shown per $1,000
+THOUSANDS_METRICS = ('Total Costs', 'Cumulative Costs', 'CTLA Value of All Trees', 'Net Value of All Trees')
+
+# Legend names of the scenarios
+SCENARIO_LABELS = {
+    'Control and Remove': 'Remove Dead Ash Only',
+    'Control, Remove, then Replant': 'Remove Dead Ash then Replant',
+    'Remove then Replant': 'Preemptive Removal then Replant',
+    'Replant, Inject, then Remove': 'Replant, Inject, then Preemptive Removal',
+    'Inject, Remove, and Replant': 'Inject, Preemptive Removal, and Replant',
+    'Inject in Perpetuity': 'Injection in Perpetuity',
+    'Inject in Perpetuity with Replanting': 'Injection in Perpetuity with Replanting',
+}
+
+# Each variant of the figure restyles the same lines: colours, line styles, legend options and output file
+FIGURE_STYLES = {
+    'colour': {
+        'colors': ['red', 'pink', 'blue', 'orange', 'green', 'purple', 'black'],
+        'linestyles': ['solid'] * 7,
+        'legend': dict(fontsize=10, title_fontsize=14),
+        'file': "Figure 1 - Colour.jpeg",
+    },
+    'black_and_white': {
+        'colors': ['black'] * 7,
+        'linestyles': ['solid', 'dotted', 'dashed', 'dashdot', (0, (3, 5, 1, 5, 1, 5)), (0, (3, 10, 1, 10)),
+                       (0, (5, 5))],
+        'legend': dict(fontsize=10, title_fontsize=14, handlelength=4, handletextpad=1),
+        'file': "Figure 1 - B&W.jpeg",
+    },
+}
+
+
+# Formatter function to add commas
+def format_with_commas(x, pos):
+    return f"{int(x):,}"
+
+
+def scaled_series(simulation_results):
+    """Compute the plotted series of every scenario once, as read-only arrays.
+
+    `simulation_results` maps scenarios to DataFrames or SimulationResults; neither is
+    modified. Cost and value metrics are scaled to $1,000s into new arrays, the others
+    are views of the caller's data.
+    Returns {scenario: {column: array}} for 'Year' and every plotted metric.
+    """
+    series = {}
+    for scenario, data in simulation_results.items():
+        columns = {}
+        for metric in ('Year',) + tuple(metric for metric, _, _ in SIMULATION_PLOT_METRICS):
+            values = np.asarray(data[metric])
+            if metric in THOUSANDS_METRICS:
+                values = values / 1000  # Scale to per $1,000
+            else:
+                values = values.view()
+            values.flags.writeable = False
+            columns[metric] = values
+        series[scenario] = columns
+    return series
+
+
+def build_figure(series):
+    """Build the 3x2 figure of scaled series once, without pyplot.
+
+    Returns (figure, lines) where lines maps each scenario to its Line2D in every
+    subplot; styles are applied afterwards with apply_style.
+    """
+    from matplotlib.figure import Figure
+    from matplotlib.ticker import FuncFormatter
+
+    fig = Figure(figsize=(18, 12), dpi=400)
+    lines = {scenario: [] for scenario in series}
+    for idx, (metric, ylabel, title) in enumerate(SIMULATION_PLOT_METRICS, start=1):
+        ax = fig.add_subplot(3, 2, idx)
+        for scenario, columns in series.items():
+            line, = ax.plot(columns['Year'], columns[metric], label=scenario, linewidth=2)
+            lines[scenario].append(line)
+        ax.set_xlabel('Year')
+        ax.set_ylabel(ylabel)
+        ax.set_title(title)
+        ax.grid()
+
+        # Apply the formatter to add commas to y-axis numbers
+        ax.yaxis.set_major_formatter(FuncFormatter(format_with_commas))
+    return fig, lines
+
+
+def apply_style(fig, lines, style):
+    """Restyle the lines of a figure from build_figure and rebuild its legend."""
+    from matplotlib import rcParams
+    from matplotlib.lines import Line2D
+
+    # Scenarios beyond the style's colours are left out, as zip() left them out of the original figures
+    shown = list(zip(lines, style['colors'], style['linestyles']))
+    for scenario, scenario_lines in lines.items():
+        for line in scenario_lines:
+            line.set_visible(False)
+    for scenario, color, linestyle in shown:
+        for line in lines[scenario]:
+            line.set(color=color, linestyle=linestyle, visible=True)
+
+    # Add legend only to the first subplot in the second column
+    ax = fig.axes[3]
+    handles = [Line2D([0], [0], color=color, linestyle=linestyle, linewidth=2) for _, color, linestyle in shown]
+    labels = [SCENARIO_LABELS.get(scenario, scenario) for scenario, _, _ in shown]
+    ax.legend(handles, labels, loc='center left', bbox_to_anchor=(1.1, 0.5), title="Scenarios", **style['legend'])
+
+    # Adjust layout for space around the legend, starting from the default spacing so that
+    # every variant gets the layout it would have had as the only figure
+    fig.subplots_adjust(**{name: rcParams[f'figure.subplot.{name}']
+                           for name in ('left', 'bottom', 'right', 'top', 'wspace', 'hspace')})
+    fig.tight_layout(rect=[0, 0, 1, 1])
+
+
+def _save_figure(figure_bytes, path):
+    # Worker entry point: render one pickled figure variant to its file
+    pickle.loads(figure_bytes).savefig(path, format='jpeg')
+    return path
+
+
+def plot_simulations(simulation_results, output_dir='.', styles=('colour', 'black_and_white'), workers=None):
+    """Write the colour and black-and-white figures of the simulation results.
+
+    The scaled series and the figure are built once; each variant in `styles` (keys of
+    FIGURE_STYLES) only restyles the lines and legend. The variants are then rendered
+    and written to output_dir by worker processes in parallel, or in this process when
+    workers=1, there is a single variant or a single CPU. The caller's data is never
+    modified, and nothing is shown on screen.
+    Returns the paths written.
+    """
+    fig, lines = build_figure(scaled_series(simulation_results))
+    variants = []
+    for name in styles:
+        style = FIGURE_STYLES[name]
+        apply_style(fig, lines, style)
+        variants.append((pickle.dumps(fig), os.path.join(output_dir, style['file'])))
+
+    workers = min(workers or os.cpu_count() or 1, len(variants))
+    if workers <= 1:
+        return [_save_figure(figure_bytes, path) for figure_bytes, path in variants]
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        return list(executor.map(_save_figure, *zip(*variants)))
+
+
+def plot_simulations_colour(simulation_results, output_dir='.'):
+    return plot_simulations(simulation_results, output_dir, styles=('colour',))
+
+
+def plot_simulations_black_and_white(simulation_results, output_dir='.'):
+    return plot_simulations(simulation_results, output_dir, styles=('black_and_white',))
@@ -0,0 +1,211 @@
+import numpy as np
+from math import pi
+from .batch_kernel import KernelModel
+from .result_buffers import COLUMNS, COLUMN_INDEX, SimulationResult
+
+# Management options the spatial mode can simulate; both let infested ash die and remove them
+SPREAD_SCENARIOS = ('Control and Remove', 'Control, Remove, then Replant')
+
+
+def _fast_length(n):
+    # Smallest 2^a * 3^b * 5^c at or above n, a length the FFT handles quickly
+    best = 1 << (n - 1).bit_length()
+    power_of_5 = 1
+    while power_of_5 < best:
+        product = power_of_5
+        while product < best:
+            length = product
+            while length < n:
+                length *= 2
+            best = min(best, length)
+            product *= 3
+        power_of_5 *= 5
+    return best
+
+
+def dispersal_kernel(distance, radius=None):
+    """Exponential dispersal kernel over grid cells, normalized to sum to 1.
+
+    `distance` is the mean dispersal distance in cells; the kernel is truncated at
+    `radius` cells (three times the distance by default).
+    """
+    if distance <= 0:
+        raise ValueError("The dispersal distance must be positive.")
+    radius = int(np.ceil(3 * distance)) if radius is None else int(radius)
+    offsets = np.arange(-radius, radius + 1)
+    weights = np.exp(-np.hypot(offsets[:, None], offsets[None, :]) / distance)
+    return weights / weights.sum()
+
+
+class SpreadConvolution:
+    """Convolve grids of one shape with a fixed kernel through zero-padded real FFTs.
+
+    The kernel's transform is computed once. Padding to at least the grid plus the
+    kernel size keeps the spread from wrapping around the edges of the city.
+    """
+
+    def __init__(self, shape, kernel):
+        self.shape = tuple(shape)
+        self.offsets = tuple(size // 2 for size in kernel.shape)
+        self.padded = tuple(_fast_length(n + size - 1) for n, size in zip(self.shape, kernel.shape))
+        self.kernel_transform = np.fft.rfft2(kernel, self.padded)
+
+    def __call__(self, grid):
+        spread = np.fft.irfft2(np.fft.rfft2(grid, self.padded) * self.kernel_transform, self.padded)
+        (row, column), (rows, columns) = self.offsets, self.shape
+        return spread[row:row + rows, column:column + columns]
+
+
+class SpreadResult:
+    """Citywide yearly results of a spatial simulation, with the yearly maps of every cell.
+
+    infestation and ash_trees have shape (years, rows, columns) and hold each cell's
+    infestation level and ash trees at the end of every year.
+    """
+
+    def __init__(self, values, infestation, ash_trees):
+        self.total = SimulationResult(values=values)
+        self.infestation = infestation
+        self.ash_trees = ash_trees
+
+    def infested_share(self):
+        """Share of the ash trees standing in infested cells, weighted by infestation, for each year."""
+        ash_trees = self.ash_trees.reshape(len(self.ash_trees), -1)
+        infested = (self.infestation.reshape(len(self.infestation), -1) * ash_trees).sum(axis=1)
+        total = ash_trees.sum(axis=1)
+        return np.divide(infested, total, out=np.zeros(len(total)), where=total > 0)
+
+
+def simulate_spread(scenario, parameters, ash_trees, infestation, dispersal_distance=2.0, transmission_rate=0.5):
+    """Simulate EAB spreading across a grid of cells, each with its own ash and cohort state.
+
+    `ash_trees` is a (rows, columns) map of ash trees per cell and `infestation` the
+    starting infestation level of each cell, from 0 (free) to 1 (fully infested). Each
+    year the infested ash of every cell put pressure on the cells around them through
+    the dispersal kernel, applied to the whole grid at once by FFT convolution, and a
+    cell's infestation rises to 1 - (1 - infestation) * exp(-transmission_rate * pressure).
+    Ash in a cell then die at ash_mortality_rate times its infestation, so a fully
+    infested city reproduces the citywide rate.
+
+    Dead ash are removed and, in 'Control, Remove, then Replant', replaced by a new
+    cohort in the same cell; cohorts age and thin as in the batched kernel. Cells hold
+    expected (fractional) tree numbers, and the cost and CTLA accounting of the
+    aggregate model is applied cell by cell and summed citywide. Returns a SpreadResult.
+    """
+    if scenario not in SPREAD_SCENARIOS:
+        raise ValueError(f"Scenario '{scenario}' is not supported by the spatial mode.")
+    ash_map = np.asarray(ash_trees, dtype=float)
+    if ash_map.ndim != 2:
+        raise ValueError("The ash tree map must be a two-dimensional grid.")
+    infestation = np.broadcast_to(np.asarray(infestation, dtype=float), ash_map.shape)
+    if not ((infestation >= 0) & (infestation <= 1)).all():
+        raise ValueError("Infestation levels must lie between 0 and 1.")
+
+    model = KernelModel(parameters)
+    ash_mortality_rate = parameters['ash_mortality_rate']
+    replanting = scenario == 'Control, Remove, then Replant'
+    shape, n_cells = ash_map.shape, ash_map.size
+    convolve = SpreadConvolution(shape, dispersal_kernel(dispersal_distance))
+
+    # Cell state; cohort p (row p of the cohort matrix) holds the trees planted in year p + 1 in every cell
+    ash = ash_map.ravel().copy()
+    infested = infestation.ravel().copy()
+    cohorts = np.zeros((model.years, n_cells))
+    cohort_diameters = np.zeros(model.years)
+    average_diameter_ash = model.starting_diameter
+
+    values = np.zeros((model.years, len(COLUMNS)))
+    infestation_maps = np.zeros((model.years,) + shape, dtype=np.float32)
+    ash_maps = np.zeros((model.years,) + shape, dtype=np.float32)
+    cumulative_planting_cost = cumulative_pruning_cost = cumulative_removal_cost = 0.0
+    inflation_factor = 1
+
+    for year in range(1, model.years + 1):
+        # Spread: pressure from the infested ash around each cell raises its infestation
+        pressure = np.maximum(convolve((infested * ash).reshape(shape)).ravel(), 0.0)
+        infested = 1 - (1 - infested) * np.exp(-transmission_rate * pressure)
+
+        # Local ash mortality; dead ash are removed at the citywide average ash diameter
+        average_diameter_ash += model.growth_rate
+        dead_ash = ash * (ash_mortality_rate * infested)
+        ash -= dead_ash
+        dead_ash_tree_count = dead_ash.sum()
+        removal_cost_ash = model.get_removal_cost_by_dbh(average_diameter_ash) * dead_ash_tree_count * inflation_factor
+        replanting_cost = dead_ash_tree_count * model.planting_expense * inflation_factor if replanting else 0.0
+
+        # Plant the replacements, then age, grow and thin the cohorts of every cell
+        if replanting:
+            cohorts[year - 1] = dead_ash
+        cohort_diameters[year - 1] = model.starting_diameter_new
+        counts = cohorts[:year]
+        cohort_diameters[:year] += model.growth_rate_new
+        diameters = cohort_diameters[:year]
+        ages = year - np.arange(year)
+        mortality_rates = model.mortality_table[np.minimum(ages, len(model.mortality_table) - 1)]
+        dead_trees = (counts * mortality_rates[:, None]).sum(axis=1)
+        counts *= 1 - mortality_rates[:, None]
+
+        # Cohorts past the warranty period are removed and replanted at cost
+        charged = ages >= 3
+        removal_cost_non_ash = float(np.dot(dead_trees, np.where(charged, model.removal_cost_lookup(diameters), 0.0))
+                                     * inflation_factor)
+        replanting_cost_non_ash = dead_trees[charged].sum() * model.planting_expense * inflation_factor
+
+        # Average non-ash diameter of every cell
+        non_ash = counts.sum(axis=0)
+        total_diameter_non_ash = diameters @ counts
+        average_diameter_non_ash = np.divide(total_diameter_non_ash, non_ash, where=non_ash > 0,
+                                             out=np.full(n_cells, float(model.starting_diameter_new)))
+
+        # Pruning and basal area per cell, summed citywide
+        ash_tree_count = ash.sum()
+        non_ash_tree_count = non_ash.sum()
+        pruning_cost = (float(np.dot(non_ash, model.pruning_cost_lookup(average_diameter_non_ash)))
+                        + ash_tree_count * model.get_pruning_cost_by_dbh(average_diameter_ash)) / 7 * inflation_factor
+        ash_tree_basal_area = ((average_diameter_ash / 2) ** 2) * pi * ash_tree_count
+        non_ash_tree_basal_area = float(np.dot((average_diameter_non_ash / 2) ** 2, non_ash)) * pi
+        total_tree_basal_area = ash_tree_basal_area + non_ash_tree_basal_area
+
+        total_removal_cost = removal_cost_ash + removal_cost_non_ash
+        total_replanting_cost = replanting_cost + replanting_cost_non_ash
+        cumulative_planting_cost += total_replanting_cost
+        cumulative_pruning_cost += pruning_cost
+        cumulative_removal_cost += total_removal_cost
+        cumulative_costs = cumulative_planting_cost + cumulative_pruning_cost + cumulative_removal_cost
+
+        # CTLA values
+        ctla_rate = (model.planting_expense * inflation_factor) / ((model.starting_diameter_new / 2) ** 2)
+        ctla_value_ash = ctla_rate * model.depreciation_ash * ash_tree_basal_area
+        ctla_value_non_ash = ctla_rate * model.depreciation_non_ash * non_ash_tree_basal_area
+        ctla_value_all_trees = ctla_value_ash + ctla_value_non_ash
+
+        # Store results for the year and the maps of every cell
+        row = values[year - 1]
+        row[COLUMN_INDEX['Year']] = year
+        row[COLUMN_INDEX['Ash Tree Count']] = ash_tree_count
+        row[COLUMN_INDEX['Non-Ash Tree Count']] = non_ash_tree_count
+        row[COLUMN_INDEX['Total Tree Count']] = ash_tree_count + non_ash_tree_count
+        row[COLUMN_INDEX['Ash Tree Basal Area']] = ash_tree_basal_area
+        row[COLUMN_INDEX['Non-Ash Tree Basal Area']] = non_ash_tree_basal_area
+        row[COLUMN_INDEX['Total Tree Basal Area']] = total_tree_basal_area
+        row[COLUMN_INDEX['Cost of Tree Planting and Establishment']] = total_replanting_cost
+        row[COLUMN_INDEX['Cost of Pruning']] = pruning_cost
+        row[COLUMN_INDEX['Cost of Injection']] = 0  # No tree injection in the spatial options
+        row[COLUMN_INDEX['Cost of Removal']] = total_removal_cost
+        row[COLUMN_INDEX['Total Costs']] = total_replanting_cost + pruning_cost + total_removal_cost
+        row[COLUMN_INDEX['Cumulative Cost of Tree Planting and Establishment']] = cumulative_planting_cost
+        row[COLUMN_INDEX['Cumulative Cost of Pruning']] = cumulative_pruning_cost
+        row[COLUMN_INDEX['Cumulative Cost of Injection']] = 0
+        row[COLUMN_INDEX['Cumulative Cost of Removal']] = cumulative_removal_cost
+        row[COLUMN_INDEX['Cumulative Costs']] = cumulative_costs
+        row[COLUMN_INDEX['CTLA Value of Ash']] = ctla_value_ash
+        row[COLUMN_INDEX['CTLA Value of Non-Ash']] = ctla_value_non_ash
+        row[COLUMN_INDEX['CTLA Value of All Trees']] = ctla_value_all_trees
+        row[COLUMN_INDEX['Net Value of All Trees']] = ctla_value_all_trees - cumulative_costs
+        infestation_maps[year - 1] = infested.reshape(shape)
+        ash_maps[year - 1] = ash.reshape(shape)
+
+        # Update the inflation factor for the next year
+        inflation_factor *= 1 + model.annual_inflation_rate
+
+    return SpreadResult(values, infestation_maps, ash_maps)
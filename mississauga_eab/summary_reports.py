@@ -0,0 +1,119 @@
+import numpy as np
+from .result_buffers import COLUMNS, COLUMN_INDEX, INTEGER_COLUMNS, SimulationResult, BatchResult
+
+# Columns of the value report, reported in $1,000s
+SUMMARY_VALUE_COLUMNS = ('Cumulative Costs', 'CTLA Value of All Trees', 'Net Value of All Trees')
+
+# Columns of the count report: whole tree counts, then basal areas
+SUMMARY_COUNT_COLUMNS = ('Ash Tree Count', 'Non-Ash Tree Count', 'Total Tree Count')
+SUMMARY_AREA_COLUMNS = ('Ash Tree Basal Area', 'Non-Ash Tree Basal Area', 'Total Tree Basal Area')
+
+
+def stack_results(simulation_results):
+    """Stack the results of every scenario into one (scenarios, years, COLUMNS) array.
+
+    `simulation_results` maps scenarios to SimulationResults or DataFrames, or is a
+    BatchResult. Scenarios simulated over fewer years are padded with NaN.
+    Returns (labels, values).
+    """
+    if isinstance(simulation_results, BatchResult):
+        return list(range(len(simulation_results))), simulation_results.values
+    labels = list(simulation_results)
+    buffers = []
+    for data in simulation_results.values():
+        if isinstance(data, SimulationResult):
+            buffers.append(data.values)
+        else:
+            buffers.append(np.column_stack([np.asarray(data[column], dtype=float) for column in COLUMNS]))
+    values = np.full((len(buffers), max((len(buffer) for buffer in buffers), default=0), len(COLUMNS)), np.nan)
+    for row, buffer in enumerate(buffers):
+        values[row, :len(buffer)] = buffer
+    return labels, values
+
+
+def summary_values(values, horizons=(20,), columns=COLUMNS):
+    """Gather columns at several simulated years (1-based) for every scenario in one indexing step.
+
+    Returns an array shaped (scenarios, horizons, columns); horizons outside the
+    simulated years are NaN.
+    """
+    horizons = np.atleast_1d(np.asarray(horizons, dtype=int))
+    simulated = (horizons >= 1) & (horizons <= values.shape[1])
+    if not simulated.any():
+        return np.full((len(values), len(horizons), len(columns)), np.nan)
+    rows = np.where(simulated, horizons - 1, 0)
+    summary = values[:, rows][:, :, [COLUMN_INDEX[column] for column in columns]]
+    summary[:, ~simulated] = np.nan
+    return summary
+
+
+def summary_table(simulation_results, horizons=(20,), columns=None):
+    """Build one tidy DataFrame of every scenario at every horizon.
+
+    Each row holds a scenario, a horizon (simulated year) and the value of every
+    column in `columns` (default: all output columns but Year). Horizons a scenario
+    was not simulated to are left out.
+    """
+    import pandas as pd
+
+    columns = tuple(column for column in COLUMNS if column != 'Year') if columns is None else tuple(columns)
+    labels, values = stack_results(simulation_results)
+    horizons = np.atleast_1d(np.asarray(horizons, dtype=int))
+    summary = summary_values(values, horizons, ('Year',) + columns)
+    table = pd.DataFrame(summary[:, :, 1:].reshape(-1, len(columns)), columns=columns)
+    table.insert(0, 'Scenario', np.repeat(np.asarray(labels, dtype=object), len(horizons)))
+    table.insert(1, 'Horizon', np.tile(horizons, len(labels)))
+    table = table[~np.isnan(summary[:, :, 0].ravel())].reset_index(drop=True)
+
+    # Tree counts are whole numbers, as in SimulationResult.to_frame
+    counts = [column for column in columns if column in INTEGER_COLUMNS]
+    table[counts] = table[counts].astype(np.int64)
+    return table
+
+
+def export_summary(table, path):
+    """Write a summary table to CSV, or to Parquet when the path ends in .parquet.
+
+    Parquet needs pyarrow or fastparquet, which are optional; without either a
+    ValueError is raised before anything is written.
+    """
+    if str(path).lower().endswith('.parquet'):
+        import importlib.util
+
+        if not any(importlib.util.find_spec(engine) for engine in ('pyarrow', 'fastparquet')):
+            raise ValueError(f"Cannot write '{path}': Parquet export needs pyarrow (pip install pyarrow); "
+                             f"write a .csv file instead.")
+        table.to_parquet(path, index=False)
+    else:
+        table.to_csv(path, index=False)
+    return path
+
+
+def _report(simulation_results, horizons, columns, format_row, file):
+    # Gather every value at once, then write the whole report in a single call
+    labels, values = stack_results(simulation_results)
+    horizons = list(np.atleast_1d(horizons))
+    summary = summary_values(values, horizons, ('Year',) + columns).tolist()
+    lines = []
+    for label, rows in zip(labels, summary):
+        for horizon, row in zip(horizons, rows):
+            if np.isnan(row[0]):
+                continue
+            # The year is only named when several horizons are reported
+            lines.append(f"Scenario: {label}" + (f" (Year {horizon})" if len(horizons) > 1 else ''))
+            lines.extend(f"  {column}: {text}" for column, text in zip(columns, format_row(row[1:])))
+            lines.append('')
+    if lines:
+        print('\n'.join(lines), file=file)
+
+
+def report_values(simulation_results, horizons=(20,), file=None):
+    """Print cumulative costs, CTLA value and net value of every scenario at each horizon, in $1,000s."""
+    _report(simulation_results, horizons, SUMMARY_VALUE_COLUMNS,
+            lambda row: [f"${round(value / 1000, 1)}k" for value in row], file)
+
+
+def report_counts(simulation_results, horizons=(20,), file=None):
+    """Print tree counts and basal areas of every scenario at each horizon."""
+    _report(simulation_results, horizons, SUMMARY_COUNT_COLUMNS + SUMMARY_AREA_COLUMNS,
+            lambda row: [int(value) for value in row[:3]] + [round(value, 2) for value in row[3:]], file)
@@ -0,0 +1,332 @@
+import numpy as np
+from .result_buffers import COLUMN_INDEX, BatchResult
+
+# Metrics drawn for a sweep: (column, y-axis label, subplot title)
+SWEEP_PLOT_METRICS = (
+    ('Total Tree Count', 'Count', 'Total Tree Count Over Time'),
+    ('Total Tree Basal Area', 'Basal Area (cubic meters)', 'Total Tree Basal Area Over Time'),
+    ('Total Costs', 'Cost (per $1k)', 'Annual Costs'),
+    ('Cumulative Costs', 'Cost (per $1k)', 'Cumulative Costs Over Time'),
+    ('CTLA Value of All Trees', 'CTLA Value (per $1k)', 'CTLA Value of All Trees Over Time'),
+    ('Net Value of All Trees', 'Net Value (per $1k)', 'Net Value of All Trees Over Time'),
+)
+
+# Metrics shown per $1,000
+THOUSANDS_METRICS = ('Total Costs', 'Cumulative Costs', 'CTLA Value of All Trees', 'Net Value of All Trees')
+
+# Colours of the line groups, in group order
+SWEEP_COLORS = ('red', 'blue', 'green', 'black', 'orange', 'purple', 'pink', 'brown')
+
+# Sweeps with more groups than SWEEP_COLORS take evenly spaced colours of this colormap instead
+SWEEP_COLORMAP = 'turbo'
+
+# Default resolution of the sweep figures, as the baseline figures; higher resolutions are opt-in
+SWEEP_DPI = 400
+
+# Above this many lines the line layer is rasterized, so vector outputs (PDF, SVG) stay small
+RASTERIZE_LINES = 200
+
+# Above this many lines each subplot is drawn as a density raster of the lines instead of line paths
+DENSITY_LINES = 1000
+
+# Resolution of the density raster; finer figures upsample it
+DENSITY_DPI = 200
+
+# Lines rasterized at a time, which bounds the memory of the density raster
+DENSITY_CHUNK_SIZE = 4096
+
+# Preview renders are capped at this resolution and number of lines
+PREVIEW_DPI = 100
+PREVIEW_MAX_LINES = 500
+
+# Fraction of the data range left around the lines, as matplotlib's default margins
+MARGIN = 0.05
+
+# Reductions of the combinations sharing a heatmap cell, as NumPy ufuncs applied with .at
+HEATMAP_REDUCTIONS = {'max': np.fmax, 'min': np.fmin}
+
+# Heatmaps with at most this many cells get their values written in the cells
+ANNOTATE_CELLS = 400
+
+
+def format_with_commas(x, pos):
+    return f"{int(x):,}"
+
+
+def decimate(n_lines, max_lines):
+    """Pick at most max_lines of n_lines, spread evenly over the grid order (all of them if None)."""
+    if max_lines is None or n_lines <= max_lines:
+        return np.arange(n_lines)
+    return np.unique(np.linspace(0, n_lines - 1, max_lines).round().astype(np.int64))
+
+
+def _limits(values):
+    # Axis limits around the finite values with the default margins
+    finite = values[np.isfinite(values)]
+    low, high = (finite.min(), finite.max()) if len(finite) else (0.0, 1.0)
+    pad = (high - low) * MARGIN if high > low else max(abs(low) * MARGIN, 0.5)
+    return low - pad, high + pad
+
+
+def line_density(years, series, groups, n_groups, xlim, ylim, shape):
+    """Count, per group and pixel, the lines passing through a (columns, rows) raster.
+
+    Every line is resampled at the pixel column edges, and the rows between its values
+    at the two edges of a column are marked, so steep segments stay unbroken. Rows are
+    marked with +1/-1 at the ends of each run and accumulated with a cumulative sum,
+    so the work grows with lines times columns and not with the pixels they cover.
+    Returns an int array of shape (n_groups, columns, rows).
+    """
+    columns, rows = shape
+    # Linear interpolation from the simulated years to the pixel column edges, as one matrix shared by every line
+    edges = np.linspace(xlim[0], xlim[1], columns + 1)
+    right = np.clip(np.searchsorted(years, edges), 1, len(years) - 1)
+    weight = np.clip((edges - years[right - 1]) / (years[right] - years[right - 1]), 0, 1)
+    interpolation = np.zeros((len(years), columns + 1), dtype=np.float32)
+    interpolation[right - 1, np.arange(columns + 1)] = 1 - weight
+    interpolation[right, np.arange(columns + 1)] += weight
+    # Scale to row units, and leave the edges outside the simulated years empty
+    interpolation *= rows / (ylim[1] - ylim[0])
+    outside = (edges < years[0]) | (edges > years[-1])
+
+    # Flat offset of every (group, column) run of rows; invalid runs go to one spare bin past the end
+    size = n_groups * columns * (rows + 1)
+    column_offsets = np.arange(columns) * (rows + 1)
+    counts = np.zeros(size + 1, dtype=np.int64)
+    for start in range(0, len(series), DENSITY_CHUNK_SIZE):
+        chunk = np.asarray(series[start:start + DENSITY_CHUNK_SIZE], dtype=np.float32) - np.float32(ylim[0])
+        y = chunk @ interpolation
+        y[:, outside] = np.nan
+        low = np.fmin(y[:, :-1], y[:, 1:])
+        high = np.fmax(y[:, :-1], y[:, 1:])
+        valid = np.isfinite(low) & (high >= 0) & (low < rows)
+        np.nan_to_num(low, copy=False)
+        np.nan_to_num(high, copy=False)
+        base = groups[start:start + DENSITY_CHUNK_SIZE, None] * (columns * (rows + 1)) + column_offsets
+        first = np.where(valid, base + np.clip(low, 0, rows - 1).astype(np.int64), size)
+        last = np.where(valid, base + np.clip(high, 0, rows - 1).astype(np.int64) + 1, size)
+        counts += np.bincount(first.ravel(), minlength=size + 1)
+        counts -= np.bincount(last.ravel(), minlength=size + 1)
+    counts = counts[:size].reshape(n_groups, columns, rows + 1)
+    return np.cumsum(counts, axis=2)[:, :, :rows]
+
+
+def _density_image(counts, colors, alpha):
+    # Blend the groups' colours by their line counts; opacity is that of `total` overlapping lines of `alpha`
+    total = counts.sum(axis=0)
+    rgb = np.tensordot(np.asarray(colors)[:, :3], counts, axes=(0, 0)) / np.maximum(total, 1)
+    opacity = 1 - (1 - alpha) ** total
+    # imshow takes (rows, columns, RGBA) with the first row at the bottom when origin='lower'
+    return np.concatenate([rgb, opacity[None]]).transpose(2, 1, 0)
+
+
+def group_colors(n_groups):
+    """RGBA colours of n_groups line groups: SWEEP_COLORS while they last, else SWEEP_COLORMAP."""
+    from matplotlib import colormaps
+    from matplotlib.colors import to_rgba_array
+
+    if n_groups <= len(SWEEP_COLORS):
+        return to_rgba_array(SWEEP_COLORS[:max(n_groups, 1)])
+    return colormaps[SWEEP_COLORMAP](np.linspace(0, 1, n_groups))
+
+
+def plot_sweep(results, path, groups=None, group_labels=None, legend_title=None, preview=False, dpi=SWEEP_DPI,
+               max_lines=None):
+    """Draw every combination of a sweep on a 3x2 grid of metrics and save it to path.
+
+    `results` is a BatchResult or a (combinations, years, COLUMNS) array. Lines are
+    coloured by `groups` (one group index per combination) and the legend names each
+    group from `group_labels`. Up to len(SWEEP_COLORS) groups keep the colours of the
+    scripts; more groups are spread over SWEEP_COLORMAP, so no two share a colour.
+
+    All lines of a subplot go into a single LineCollection, so drawing costs grow with
+    the number of points rather than the number of matplotlib artists; above
+    RASTERIZE_LINES lines the collection is rasterized inside vector outputs. Above
+    DENSITY_LINES lines, each subplot is instead a raster of how many lines pass through
+    every pixel (see line_density), computed with NumPy at up to DENSITY_DPI, so large
+    sweeps render in seconds whatever their size.
+
+    Figures are saved at SWEEP_DPI unless a higher dpi is asked for, which costs time and
+    memory in proportion to the pixel count. With preview, the resolution is capped at
+    PREVIEW_DPI and at most PREVIEW_MAX_LINES evenly spread combinations are drawn;
+    max_lines decimates full renders the same way.
+    The figure is built without pyplot, so nothing is shown and no display is needed.
+    Returns the indices of the combinations drawn.
+    """
+    from matplotlib.collections import LineCollection
+    from matplotlib.figure import Figure
+    from matplotlib.lines import Line2D
+    from matplotlib.ticker import FuncFormatter
+
+    values = results.values if isinstance(results, BatchResult) else np.asarray(results)
+    if preview:
+        dpi = min(dpi, PREVIEW_DPI)
+        max_lines = PREVIEW_MAX_LINES if max_lines is None else min(max_lines, PREVIEW_MAX_LINES)
+    shown = decimate(len(values), max_lines)
+    values = values[shown]
+    groups = np.zeros(len(values), dtype=np.int64) if groups is None else np.asarray(groups)[shown]
+    n_groups = max(int(groups.max()) + 1 if len(groups) else 1, len(group_labels) if group_labels is not None else 0)
+    palette = group_colors(n_groups)
+
+    # Thin, translucent lines keep dense sweeps readable; a handful of lines are drawn as in the scripts
+    dense = len(values) > len(SWEEP_COLORS)
+    linewidth = 0.5 if dense else 2
+    alpha = 0.4 if dense else 1
+    years = values[0, :, COLUMN_INDEX['Year']] if len(values) else np.arange(1.0, 2.0)
+    xlim = _limits(years)
+
+    fig = Figure(figsize=(18, 12), dpi=dpi)
+    axs = fig.subplots(3, 2).flatten()
+    series_by_metric = []
+    for idx, (metric, ylabel, title) in enumerate(SWEEP_PLOT_METRICS):
+        ax = axs[idx]
+        series = values[:, :, COLUMN_INDEX[metric]]
+        if metric in THOUSANDS_METRICS:
+            series = series / 1000  # Scale to per $1,000
+        series_by_metric.append(series)
+        ax.set_xlim(*xlim)
+        ax.set_ylim(*_limits(series))
+        ax.set_xlabel('Year')
+        ax.set_ylabel(ylabel)
+        ax.set_title(title)
+        ax.yaxis.set_major_formatter(FuncFormatter(format_with_commas))
+
+        # Add the legend beside the fourth subplot, as in the scripts
+        if idx == 3 and group_labels is not None:
+            handles = [Line2D([0], [0], color=palette[group], linewidth=2) for group in range(len(group_labels))]
+            ax.legend(handles, group_labels, loc='center left', bbox_to_anchor=(1.05, 0.5), title=legend_title,
+                      fontsize=12, title_fontsize=14, ncol=1)
+
+    # Lay out the axes before the lines are added, so the layout pass does not draw them
+    fig.tight_layout(rect=[0, 0, 0.85, 1])  # Reserve space on the right for the legend
+    for ax, series in zip(axs, series_by_metric):
+        if len(values) > DENSITY_LINES:
+            # Raster size of the axes at the density resolution
+            bbox = ax.get_window_extent()
+            scale = min(dpi, DENSITY_DPI) / dpi
+            shape = (max(int(bbox.width * scale), 1), max(int(bbox.height * scale), 1))
+            counts = line_density(years, series, groups, n_groups, ax.get_xlim(), ax.get_ylim(), shape)
+            ax.imshow(_density_image(counts, palette, alpha), extent=(*ax.get_xlim(), *ax.get_ylim()),
+                      origin='lower', aspect='auto', interpolation='nearest')
+        else:
+            # One (combinations, years, 2) array of vertices holds every line of the subplot
+            segments = np.stack([np.broadcast_to(years, series.shape), series], axis=-1)
+            lines = LineCollection(segments, colors=palette[groups], linewidths=linewidth, alpha=alpha,
+                                   rasterized=len(values) > RASTERIZE_LINES)
+            ax.add_collection(lines, autolim=False)
+    fig.savefig(path, dpi=dpi)
+    return shown
+
+
+def sweep_envelopes(values, groups, n_groups=None):
+    """Yearly minimum, median and maximum of every column within each group of combinations.
+
+    `values` is a (combinations, years, COLUMNS) array and `groups` the group index of
+    each combination, e.g. the rank of its removal rate. Returns an array shaped
+    (3, n_groups, years, COLUMNS) holding the minimum, median and maximum; groups
+    without combinations are NaN.
+    """
+    groups = np.asarray(groups)
+    n_groups = groups.max() + 1 if n_groups is None else n_groups
+    envelopes = np.full((3, n_groups) + values.shape[1:], np.nan)
+    # One sort brings each group's combinations together; every group is then a contiguous block
+    order = np.argsort(groups, kind='stable')
+    bounds = np.searchsorted(groups[order], np.arange(n_groups + 1))
+    for group in range(n_groups):
+        members = values[order[bounds[group]:bounds[group + 1]]]
+        if len(members):
+            envelopes[:, group] = np.percentile(members, [0, 50, 100], axis=0)
+    return envelopes
+
+
+def sweep_heatmap(values, grid, x_name, y_name, metric, year=20, reduce='max'):
+    """Tabulate a metric at one simulated year over two grid parameters.
+
+    Combinations that share a cell (differing only in the other grid parameters) are
+    reduced with HEATMAP_REDUCTIONS[reduce], e.g. the best removal year for each
+    removal rate and planting year. Cells without combinations are NaN.
+    Returns (table shaped (len(y_values), len(x_values)), x_values, y_values).
+    """
+    x_values, x_index = np.unique(grid[x_name], return_inverse=True)
+    y_values, y_index = np.unique(grid[y_name], return_inverse=True)
+    table = np.full((len(y_values), len(x_values)), np.nan)
+    HEATMAP_REDUCTIONS[reduce].at(table, (y_index, x_index), values[:, year - 1, COLUMN_INDEX[metric]])
+    return table, x_values, y_values
+
+
+def plot_sweep_envelopes(results, path, groups, group_labels=None, legend_title=None, dpi=SWEEP_DPI):
+    """Draw the minimum-to-maximum band and median line of each group on the 3x2 metric grid.
+
+    The envelopes come from sweep_envelopes, so the figure holds two artists per group
+    and subplot whatever the number of combinations.
+    """
+    from matplotlib.figure import Figure
+    from matplotlib.lines import Line2D
+    from matplotlib.ticker import FuncFormatter
+
+    values = results.values if isinstance(results, BatchResult) else np.asarray(results)
+    groups = np.asarray(groups)
+    envelopes = sweep_envelopes(values, groups)
+    n_groups = envelopes.shape[1]
+    group_labels = [f'Group {group}' for group in range(n_groups)] if group_labels is None else group_labels
+
+    palette = group_colors(n_groups)
+
+    fig = Figure(figsize=(18, 12), dpi=dpi)
+    axs = fig.subplots(3, 2).flatten()
+    for idx, (metric, ylabel, title) in enumerate(SWEEP_PLOT_METRICS):
+        ax = axs[idx]
+        low, median, high = envelopes[:, :, :, COLUMN_INDEX[metric]]
+        if metric in THOUSANDS_METRICS:
+            low, median, high = low / 1000, median / 1000, high / 1000  # Scale to per $1,000
+        for group in range(n_groups):
+            color = palette[group]
+            years = envelopes[1, group, :, COLUMN_INDEX['Year']]
+            ax.fill_between(years, low[group], high[group], color=color, alpha=0.2, linewidth=0)
+            ax.plot(years, median[group], color=color, linewidth=2)
+        ax.set_xlabel('Year')
+        ax.set_ylabel(ylabel)
+        ax.set_title(title)
+        ax.yaxis.set_major_formatter(FuncFormatter(format_with_commas))
+
+        # Add the legend beside the fourth subplot, as in the scripts
+        if idx == 3:
+            handles = [Line2D([0], [0], color=palette[group], linewidth=2) for group in range(n_groups)]
+            ax.legend(handles, group_labels, loc='center left', bbox_to_anchor=(1.05, 0.5),
+                      title=f'{legend_title} (median, min to max)' if legend_title else 'Median, min to max',
+                      fontsize=12, title_fontsize=14, ncol=1)
+
+    # Reserve space on the right for the legend
+    fig.tight_layout(rect=[0, 0, 0.85, 1])
+    fig.savefig(path, dpi=dpi)
+
+
+def plot_sweep_heatmap(table, x_values, y_values, path, x_label, y_label, metric, year=20, dpi=SWEEP_DPI):
+    """Draw a table from sweep_heatmap as a heatmap with a colour bar; empty cells are left blank."""
+    from matplotlib.figure import Figure
+    from matplotlib.ticker import FuncFormatter
+
+    scale = 1000 if metric in THOUSANDS_METRICS else 1
+    shown = np.ma.masked_invalid(table / scale)
+    fig = Figure(figsize=(12, 9), dpi=dpi)
+    ax = fig.subplots()
+    mesh = ax.pcolormesh(np.arange(len(x_values) + 1), np.arange(len(y_values) + 1), shown, cmap='viridis')
+    colorbar = fig.colorbar(mesh, ax=ax, format=FuncFormatter(format_with_commas))
+    colorbar.set_label(f'{metric} (per $1k)' if scale != 1 else metric)
+
+    # One tick per grid value, at the centre of its cells
+    ax.set_xticks(np.arange(len(x_values)) + 0.5, [str(value) for value in x_values])
+    ax.set_yticks(np.arange(len(y_values)) + 0.5, [str(value) for value in y_values])
+    ax.set_xlabel(x_label)
+    ax.set_ylabel(y_label)
+    ax.set_title(f'{metric} at Year {year}')
+
+    # Small tables get their values written in the cells
+    if table.size <= ANNOTATE_CELLS:
+        threshold = np.nanmean(shown) if shown.count() else 0
+        for (row, column), value in np.ndenumerate(shown.filled(np.nan)):
+            if np.isfinite(value):
+                ax.text(column + 0.5, row + 0.5, f'{value:,.0f}', ha='center', va='center', fontsize=7,
+                        color='black' if value > threshold else 'white')
+    fig.tight_layout()
+    fig.savefig(path, dpi=dpi)
@@ -0,0 +1,281 @@
+import re
+import numpy as np
+from math import pi
+from .batch_kernel import KernelModel
+from .cohort_engine import mortality_rates_array
+from .result_buffers import COLUMNS, COLUMN_INDEX, SimulationResult
+
+# Inventory CSV columns; headers match regardless of case, spaces and underscores
+INVENTORY_COLUMNS = ('Tree ID', 'Species', 'DBH', 'Land Use')
+
+# Management options the inventory mode can simulate, and the grid parameters each one uses
+INVENTORY_SCENARIOS = {
+    'Control and Remove': (),
+    'Control, Remove, then Replant': (),
+    'Remove then Replant': ('removal_rate',),
+    'Inject, Remove, and Replant': ('injection_years', 'removal_rate'),
+}
+
+# Age given to trees already in the inventory: past the end of the mortality table and the warranty period
+ESTABLISHED_AGE = 100
+
+# Species name given to trees planted during a simulation
+PLANTED_SPECIES = 'Planted'
+
+
+def is_ash_species(name):
+    """Whether a species name is an ash (Fraxinus); mountain ash (Sorbus) is not."""
+    name = str(name).lower()
+    words = re.findall(r'[a-z]+', name)
+    return 'fraxinus' in words or ('ash' in words and 'mountain' not in words)
+
+
+def _normalize(header):
+    return re.sub(r'[\s_]', '', str(header)).lower()
+
+
+class TreeInventory:
+    """Individual trees held as contiguous columns, one entry per tree in inventory order.
+
+    Species and land use are stored as integer codes into species_names and
+    land_use_names, so every per-tree column is a flat NumPy array.
+    """
+
+    def __init__(self, tree_ids, species, species_names, dbh, land_use, land_use_names):
+        self.tree_ids = np.asarray(tree_ids)
+        self.species = np.asarray(species, dtype=np.int32)
+        self.species_names = list(species_names)
+        self.dbh = np.ascontiguousarray(dbh, dtype=float)
+        self.land_use = np.asarray(land_use, dtype=np.int32)
+        self.land_use_names = list(land_use_names)
+
+        # Classify each species name once, then broadcast to the trees through the codes
+        ash_species = np.array([is_ash_species(name) for name in self.species_names], dtype=bool)
+        self.is_ash = ash_species[self.species] if len(ash_species) else np.zeros(len(self.dbh), dtype=bool)
+
+    def __len__(self):
+        return len(self.dbh)
+
+    @classmethod
+    def from_columns(cls, tree_ids, species, dbh, land_use):
+        """Build an inventory from per-tree species and land use names."""
+        species_names, species = np.unique(np.asarray(species, dtype=str), return_inverse=True)
+        land_use_names, land_use = np.unique(np.asarray(land_use, dtype=str), return_inverse=True)
+        return cls(tree_ids, species, species_names, dbh, land_use, land_use_names)
+
+    def counts_by_land_use(self):
+        """Number of ash and non-ash trees in each land use, as {land use: (ash, non-ash)}."""
+        groups = len(self.land_use_names)
+        ash = np.bincount(self.land_use, weights=self.is_ash, minlength=groups)
+        total = np.bincount(self.land_use, minlength=groups)
+        return {name: (int(ash[g]), int(total[g] - ash[g])) for g, name in enumerate(self.land_use_names)}
+
+
+def load_inventory(path, columns=INVENTORY_COLUMNS):
+    """Read a tree inventory CSV with tree ID, species, DBH (cm) and land use columns.
+
+    `columns` names the four columns in that order. Missing species or land uses are
+    read as 'Unknown'; a missing, non-numeric or non-positive DBH raises ValueError.
+    """
+    import pandas as pd
+
+    headers = {_normalize(header): header for header in pd.read_csv(path, nrows=0).columns}
+    missing = [column for column in columns if _normalize(column) not in headers]
+    if missing:
+        raise ValueError(f"Inventory '{path}' has no column named: {', '.join(missing)}")
+    tree_id, species, dbh, land_use = [headers[_normalize(column)] for column in columns]
+
+    frame = pd.read_csv(path, usecols=[tree_id, species, dbh, land_use], dtype={species: str, land_use: str})
+    diameters = pd.to_numeric(frame[dbh], errors='coerce').to_numpy(dtype=float)
+    invalid = ~(diameters > 0)
+    if invalid.any():
+        row = int(np.flatnonzero(invalid)[0])
+        raise ValueError(f"Inventory '{path}' has an invalid DBH '{frame[dbh].iloc[row]}' for tree "
+                         f"{frame[tree_id].iloc[row]}.")
+
+    species_codes, species_names = pd.factorize(frame[species].fillna('Unknown'))
+    land_use_codes, land_use_names = pd.factorize(frame[land_use].fillna('Unknown'))
+    return TreeInventory(frame[tree_id].to_numpy(), species_codes, species_names, diameters, land_use_codes,
+                         land_use_names)
+
+
+def _largest(dbh, candidates, count):
+    # Mask of the `count` candidate trees with the largest DBH
+    index = np.flatnonzero(candidates)
+    if count < len(index):
+        index = index[np.argpartition(-dbh[index], count)[:count]]
+    chosen = np.zeros(len(dbh), dtype=bool)
+    chosen[index] = True
+    return chosen
+
+
+class InventoryResult:
+    """Yearly results of an inventory simulation, for the whole inventory and for each land use.
+
+    values has shape (land uses, years, len(COLUMNS)); `trees` is the inventory at the
+    end of the simulation, with replacement trees under PLANTED_SPECIES.
+    """
+
+    def __init__(self, land_use_names, values, trees):
+        self.land_use_names = list(land_use_names)
+        self.values = values
+        self.trees = trees
+        total = values.sum(axis=0)
+        total[:, COLUMN_INDEX['Year']] = np.arange(1, values.shape[1] + 1)
+        self.total = SimulationResult(values=total)
+
+    def by_land_use(self, land_use):
+        """Return the SimulationResult of the trees in one land use."""
+        return SimulationResult(values=self.values[self.land_use_names.index(land_use)])
+
+
+def simulate_inventory(inventory, scenario, parameters, seed=None, land_use_parameters=None, **grid):
+    """Simulate every tree of an inventory individually under one management option.
+
+    Each tree keeps its own DBH, age and status, so growth, mortality, removal, pruning
+    and injection costs and CTLA basal areas are computed per tree rather than from an
+    average diameter, with every step vectorized over the whole inventory. Deaths are
+    drawn per tree from the same rates as the aggregate model; `seed` makes them
+    reproducible. Ash follow the management rules of the matching simulation option,
+    and removals take the largest ash first. Dead trees past the warranty period are
+    removed and replaced at cost, younger ones are replaced under warranty.
+
+    `land_use_parameters` optionally maps land use names to parameter mappings whose
+    post-planting mortality applies to the trees of that land use (e.g. vars() of the
+    Street and Park parameter modules). The grid parameters of the scenario (see
+    INVENTORY_SCENARIOS) are given as scalars. Returns an InventoryResult.
+    """
+    if scenario not in INVENTORY_SCENARIOS:
+        raise ValueError(f"Scenario '{scenario}' is not supported by the inventory mode.")
+    missing = [name for name in INVENTORY_SCENARIOS[scenario] if name not in grid]
+    if missing:
+        raise ValueError(f"Scenario '{scenario}' requires grid parameters: {', '.join(missing)}")
+
+    model = KernelModel(parameters)
+    ash_mortality_rate = parameters['ash_mortality_rate']
+    rng = np.random.default_rng(seed)
+    n_trees = len(inventory)
+    n_groups = len(inventory.land_use_names)
+    land_use = inventory.land_use
+
+    # Post-planting mortality table of every land use, indexed by [land use, age]
+    land_use_parameters = land_use_parameters or {}
+    tables = [model.mortality_table if name not in land_use_parameters else mortality_rates_array(
+        land_use_parameters[name]['mortality_rates_by_age'], land_use_parameters[name]['background_mortality_rate'],
+        model.years) for name in inventory.land_use_names]
+    table_length = max(len(table) for table in tables)
+    mortality_tables = np.array([np.append(table, np.full(table_length - len(table), table[-1])) for table in tables])
+
+    # Per-tree state columns
+    dbh = inventory.dbh.copy()
+    ash = inventory.is_ash.copy()
+    alive = np.ones(n_trees, dtype=bool)
+    planted = np.zeros(n_trees, dtype=bool)
+    age = np.full(n_trees, ESTABLISHED_AGE, dtype=np.int32)
+
+    def by_group(weights):
+        return np.bincount(land_use, weights=weights, minlength=n_groups)
+
+    cumulative_planting_cost = np.zeros(n_groups)
+    cumulative_pruning_cost = np.zeros(n_groups)
+    cumulative_injection_cost = np.zeros(n_groups)
+    cumulative_removal_cost = np.zeros(n_groups)
+    values = np.zeros((n_groups, model.years, len(COLUMNS)))
+    inflation_factor = 1
+
+    for year in range(1, model.years + 1):
+        # Grow and age every tree
+        dbh += np.where(ash, model.growth_rate, model.growth_rate_new)
+        age += 1
+        living_ash = alive & ash
+
+        # Ash phase for each management option
+        injecting = scenario == 'Inject, Remove, and Replant' and year <= grid['injection_years']
+        injection_cost = np.zeros(n_groups)
+        if injecting:
+            injection_cost = by_group(np.where(living_ash, dbh, 0.0)) / 2 * model.injections_expense * inflation_factor
+            ash_removed = living_ash & (rng.random(n_trees) < model.injected_ash_mortality_rate)
+        elif scenario in ('Control and Remove', 'Control, Remove, then Replant'):
+            ash_removed = living_ash & (rng.random(n_trees) < ash_mortality_rate)
+        else:
+            ash_removed = _largest(dbh, living_ash, grid['removal_rate'])
+        ash_replaced = ash_removed if scenario != 'Control and Remove' else np.zeros(n_trees, dtype=bool)
+
+        # Age-based mortality of the non-ash trees; deaths within the warranty period are replaced for free
+        non_ash = alive & ~ash
+        mortality_rates = mortality_tables[land_use, np.minimum(age, table_length - 1)]
+        non_ash_died = non_ash & (rng.random(n_trees) < mortality_rates)
+        charged = non_ash_died & (age >= 3)
+
+        # Removal and replanting costs of the trees taken out this year, at their own DBH
+        removed = np.flatnonzero(ash_removed | charged)
+        removal_cost = np.bincount(land_use[removed], weights=model.removal_cost_lookup(dbh[removed]),
+                                   minlength=n_groups) * inflation_factor
+        replanting_cost = by_group(ash_replaced | charged) * model.planting_expense * inflation_factor
+
+        # Replace dead trees in place with newly planted non-ash trees; unreplaced ash are gone
+        replaced = ash_replaced | non_ash_died
+        dbh[replaced] = model.starting_diameter_new
+        age[replaced] = 0
+        ash[replaced] = False
+        planted |= replaced
+        alive &= ~(ash_removed & ~ash_replaced)
+
+        # Pruning every living tree on a seven-year cycle
+        pruning_cost = by_group(np.where(alive, model.pruning_cost_lookup(dbh), 0.0)) / 7 * inflation_factor
+
+        cumulative_planting_cost += replanting_cost
+        cumulative_pruning_cost += pruning_cost
+        cumulative_injection_cost += injection_cost
+        cumulative_removal_cost += removal_cost
+        cumulative_costs = (cumulative_planting_cost + cumulative_pruning_cost + cumulative_injection_cost
+                            + cumulative_removal_cost)
+
+        # Counts and basal areas summed tree by tree
+        living_ash = alive & ash
+        non_ash = alive & ~ash
+        basal_area = pi * (dbh / 2) ** 2
+        ash_tree_count = by_group(living_ash)
+        non_ash_tree_count = by_group(non_ash)
+        ash_tree_basal_area = by_group(np.where(living_ash, basal_area, 0.0))
+        non_ash_tree_basal_area = by_group(np.where(non_ash, basal_area, 0.0))
+
+        # CTLA values
+        ctla_rate = (model.planting_expense * inflation_factor) / ((model.starting_diameter_new / 2) ** 2)
+        ctla_value_ash = ctla_rate * model.depreciation_ash * ash_tree_basal_area
+        ctla_value_non_ash = ctla_rate * model.depreciation_non_ash * non_ash_tree_basal_area
+        ctla_value_all_trees = ctla_value_ash + ctla_value_non_ash
+
+        # Store results for each land use
+        row = values[:, year - 1]
+        row[:, COLUMN_INDEX['Year']] = year
+        row[:, COLUMN_INDEX['Ash Tree Count']] = ash_tree_count
+        row[:, COLUMN_INDEX['Non-Ash Tree Count']] = non_ash_tree_count
+        row[:, COLUMN_INDEX['Total Tree Count']] = ash_tree_count + non_ash_tree_count
+        row[:, COLUMN_INDEX['Ash Tree Basal Area']] = ash_tree_basal_area
+        row[:, COLUMN_INDEX['Non-Ash Tree Basal Area']] = non_ash_tree_basal_area
+        row[:, COLUMN_INDEX['Total Tree Basal Area']] = ash_tree_basal_area + non_ash_tree_basal_area
+        row[:, COLUMN_INDEX['Cost of Tree Planting and Establishment']] = replanting_cost
+        row[:, COLUMN_INDEX['Cost of Pruning']] = pruning_cost
+        row[:, COLUMN_INDEX['Cost of Injection']] = injection_cost
+        row[:, COLUMN_INDEX['Cost of Removal']] = removal_cost
+        row[:, COLUMN_INDEX['Total Costs']] = replanting_cost + pruning_cost + injection_cost + removal_cost
+        row[:, COLUMN_INDEX['Cumulative Cost of Tree Planting and Establishment']] = cumulative_planting_cost
+        row[:, COLUMN_INDEX['Cumulative Cost of Pruning']] = cumulative_pruning_cost
+        row[:, COLUMN_INDEX['Cumulative Cost of Injection']] = cumulative_injection_cost
+        row[:, COLUMN_INDEX['Cumulative Cost of Removal']] = cumulative_removal_cost
+        row[:, COLUMN_INDEX['Cumulative Costs']] = cumulative_costs
+        row[:, COLUMN_INDEX['CTLA Value of Ash']] = ctla_value_ash
+        row[:, COLUMN_INDEX['CTLA Value of Non-Ash']] = ctla_value_non_ash
+        row[:, COLUMN_INDEX['CTLA Value of All Trees']] = ctla_value_all_trees
+        row[:, COLUMN_INDEX['Net Value of All Trees']] = ctla_value_all_trees - cumulative_costs
+
+        # Update the inflation factor for the next year
+        inflation_factor *= 1 + model.annual_inflation_rate
+
+    # Final inventory: replacement trees are listed under their own species
+    species_names = inventory.species_names + [PLANTED_SPECIES]
+    species = np.where(planted, len(species_names) - 1, inventory.species)
+    trees = TreeInventory(inventory.tree_ids[alive], species[alive], species_names, dbh[alive], land_use[alive],
+                          inventory.land_use_names)
+    return InventoryResult(inventory.land_use_names, values, trees)
@@ -0,0 +1,49 @@
+import pathlib
+import numpy as np
+import pytest
+from mississauga_eab.parameter_profiles import load_profile
+
+FIXTURES = pathlib.Path(__file__).parent / 'fixtures'
+
+# Management settings of each run in the baseline fixtures, in the order of their columns
+SETTINGS = ('set_removal_rate', 'set_removal_year', 'set_injection_years', 'set_planting_rate', 'set_planting_year')
+
+
+@pytest.fixture(autouse=True)
+def no_result_cache(monkeypatch):
+    # Keep the tests from reading or writing the user's result cache
+    monkeypatch.setenv('EAB_CACHE', '0')
+
+
+@pytest.fixture(scope='session')
+def overall():
+    """Parameters of the bundled overall profile, the inputs of the original simulation module."""
+    return load_profile('overall', use_cache=False).parameters()
+
+
+@pytest.fixture(scope='session')
+def consistent():
+    """Parameters of the bundled consistent profile, the inputs of the original optimization scripts."""
+    return load_profile('consistent', use_cache=False).parameters()
+
+
+@pytest.fixture(scope='session')
+def baseline_simulations():
+    """Rounded yearly results of the original simulation module, one (runs x years x columns) array per scenario.
+
+    'settings' holds the management settings of each run; the grid includes half-cent ties
+    such as 498472.21499999997, which Python's round() takes down to 498472.21.
+    """
+    with np.load(FIXTURES / 'baseline_simulations.npz') as data:
+        return {key: data[key] for key in data.files}
+
+
+@pytest.fixture(scope='session')
+def baseline_sweeps():
+    """Rounded yearly results of the simulate_* functions of the original optimization scripts.
+
+    Each scenario of the scripts has a (runs x years x columns) array and, under
+    '<scenario> grid', the grid parameters of every run in the order of BATCH_SCENARIOS.
+    """
+    with np.load(FIXTURES / 'baseline_sweeps.npz') as data:
+        return {key: data[key] for key in data.files}
@@ -0,0 +1,37 @@
+import numpy as np
+import pytest
+from mississauga_eab.batch_kernel import BATCH_SCENARIOS, simulate_batch, simulate_samples
+from mississauga_eab.parameter_profiles import load_profile
+from mississauga_eab.profile_comparison import _simulation_inputs
+from mississauga_eab.result_buffers import COLUMNS
+from mississauga_eab.simulation_module import run_simulations
+
+# Scenarios of the original Management Option Optimization scripts
+SCRIPT_SCENARIOS = ('Remove then Replant', 'Inject, Remove, and Replant', 'Replant, Inject, then Remove')
+
+
+@pytest.mark.parametrize('share_prefixes', [True, False])
+@pytest.mark.parametrize('scenario', SCRIPT_SCENARIOS)
+def test_simulate_batch_matches_baseline(consistent, baseline_sweeps, scenario, share_prefixes):
+    grid = dict(zip(BATCH_SCENARIOS[scenario], baseline_sweeps[f'{scenario} grid'].T))
+    results = simulate_batch(scenario, consistent, share_prefixes=share_prefixes, **grid)
+    for run, result in enumerate(results):
+        np.testing.assert_array_equal(result.to_frame()[list(COLUMNS)].to_numpy(float),
+                                      baseline_sweeps[scenario][run], err_msg=f"run {run}")
+
+
+def test_simulate_batch_rejects_missing_grid_parameters(consistent):
+    with pytest.raises(ValueError, match='requires grid parameters: planting_rate, planting_year'):
+        simulate_batch('Replant, Inject, then Remove', consistent, removal_year=5, removal_rate=100)
+
+
+def test_simulate_samples_matches_run_simulations():
+    profiles = [load_profile(name, use_cache=False).parameters() for name in ('overall', 'street', 'park')]
+    settings = dict(set_removal_rate=400, set_removal_year=5, set_injection_years=5, set_planting_rate=400,
+                    set_planting_year=1)
+    samples = simulate_samples(profiles, settings)
+    for row, parameters in enumerate(profiles):
+        expected = run_simulations.__wrapped__(**_simulation_inputs(parameters, settings))
+        for scenario, results in expected.items():
+            np.testing.assert_allclose(samples[scenario][row].values, results.values, rtol=1e-12,
+                                       err_msg=f"{scenario}, profile {row}")
@@ -0,0 +1,20 @@
+import csv
+from mississauga_eab.cli import build_parser, main
+from mississauga_eab.result_buffers import INTEGER_COLUMNS
+
+
+def test_run_defaults_match_simulation_script():
+    args = build_parser().parse_args(['run'])
+    assert (args.removal_rate, args.removal_year, args.injection_years, args.planting_rate, args.planting_year) == \
+        (400, 5, 5, 400, 1)
+
+
+def test_run_csv_writes_whole_numbers(tmp_path):
+    output = tmp_path / 'run.csv'
+    assert main(['run', '--scenario', 'Control and Remove', '--format', 'csv', '--output', str(output)]) == 0
+    with open(output, newline='') as f:
+        rows = list(csv.DictReader(f))
+    assert len(rows) == 20
+    for column in INTEGER_COLUMNS:
+        assert all(row[column].isdigit() for row in rows), column
+    assert rows[0]['Year'] == '1'
@@ -0,0 +1,78 @@
+import copy
+import json
+import pytest
+from mississauga_eab.cost_brackets import CostBrackets
+from mississauga_eab.parameter_profiles import PROFILES_DIR, compile_profile, load_profile
+
+try:
+    import tomllib
+except ImportError:  # Python < 3.11
+    import tomli as tomllib
+
+
+@pytest.fixture(scope='module')
+def profile_data():
+    with open(f'{PROFILES_DIR}/overall.toml', 'rb') as f:
+        return tomllib.load(f)
+
+
+def _comparable(profile):
+    # Cost brackets compare by their ranges
+    return {key: value.cost_ranges if isinstance(value, CostBrackets) else value
+            for key, value in profile.parameters().items()}
+
+
+def _edited(data, section, key, value):
+    data = copy.deepcopy(data)
+    table = data
+    for name in filter(None, section.split('.')):
+        table = table[name]
+    if value is None:
+        del table[key]
+    else:
+        table[key] = value
+    return data
+
+
+@pytest.mark.parametrize('section, key, value, message', [
+    ('inventory', 'starting_ash_tres', 1490, "unknown keys: inventory.starting_ash_tres"),
+    ('inventory', 'starting_ash_trees', None, "missing keys: inventory.starting_ash_trees"),
+    ('', 'years', True, "years must be a whole number of at least 0"),
+    ('inventory', 'starting_ash_trees', -1, "starting_ash_trees must be a whole number of at least 0"),
+    ('inventory', 'starting_diameter', 0, "starting_diameter must be above 0"),
+    ('inventory', 'growth_rate', float('nan'), "growth_rate must be a number"),
+    ('replanting', 'growth_rate_new', -0.1, "growth_rate_new must be at least 0"),
+    ('mortality', 'ash_mortality_rate', 1.2, "ash_mortality_rate must be a rate between 0 and 1"),
+    ('mortality', 'post_planting', [0.1, 'high'], "post_planting must be a list of rates between 0 and 1"),
+    ('mortality', 'post_planting', [0.1] * 21, "post_planting lists more years than the 20 simulated"),
+    ('ctla.ash', 'condition_rating', 2, "ctla.ash.condition_rating must be a rate between 0 and 1"),
+    ('expenses', 'removal_cost_ranges', [[0, 20]], "removal_cost_ranges must be a list of"),
+    ('expenses', 'removal_cost_ranges', [], "removal_cost_ranges: Cost ranges must define at least one DBH bracket"),
+    ('expenses', 'pruning_cost_ranges', [[0, 20, 60], [10, 40, 118]], "pruning_cost_ranges: Cost brackets overlap"),
+    ('expenses', 'pruning_cost_ranges', [[20, 20, 60]], "pruning_cost_ranges: Cost bracket .* has min DBH"),
+])
+def test_compile_profile_rejects_invalid_values(profile_data, section, key, value, message):
+    with pytest.raises(ValueError, match=message):
+        compile_profile(_edited(profile_data, section, key, value), 'edited.toml')
+
+
+def test_compile_profile_rejects_non_table(profile_data):
+    with pytest.raises(ValueError, match='must hold a table of sections'):
+        compile_profile([profile_data], 'edited.json')
+
+
+def test_load_profile_round_trips_json(profile_data, tmp_path):
+    # JSON has no inf, so the open-ended last brackets give their max DBH as null
+    data = copy.deepcopy(profile_data)
+    for key in ('removal_cost_ranges', 'pruning_cost_ranges'):
+        data['expenses'][key][-1][1] = None
+    path = tmp_path / 'overall.json'
+    path.write_text(json.dumps(data))
+    assert _comparable(load_profile(path, use_cache=False)) == _comparable(load_profile('overall', use_cache=False))
+
+
+def test_load_profile_rejects_other_file_types(tmp_path):
+    path = tmp_path / 'overall.yaml'
+    path.write_text('years: 20\n')
+    with pytest.raises(ValueError, match='must be a .toml or .json file'):
+        load_profile(path, use_cache=False)
@@ -0,0 +1,32 @@
+import numpy as np
+import pytest
+from mississauga_eab.batch_kernel import simulate_batch
+from mississauga_eab.optimization.policy_search import SEARCH_METRICS, branch_and_bound
+
+# Small grids, each larger than the incumbent sample so that the search has groups left to prune
+GRIDS = {
+    'Inject, Remove, and Replant': dict(injection_years=np.arange(1, 21), removal_rate=[100, 250, 500, 1000]),
+    'Replant, Inject, then Remove': dict(removal_year=[1, 3, 5, 10, 20], removal_rate=[100, 250, 500, 1000],
+                                         planting_rate=[10, 333, 1000], planting_year=[1, 5, 10]),
+}
+
+
+def _full_grid(axes):
+    return dict(zip(axes, [values.ravel() for values in np.meshgrid(*axes.values(), indexing='ij')]))
+
+
+@pytest.mark.parametrize('year', [20, 8])
+@pytest.mark.parametrize('scenario', list(GRIDS))
+def test_branch_and_bound_matches_exhaustive_search(consistent, scenario, year):
+    grid = _full_grid(GRIDS[scenario])
+    results = simulate_batch(scenario, consistent, **grid)
+    for metric, minimize in SEARCH_METRICS.items():
+        values = results.at_year(metric, year)
+        best = int(np.argmin(values) if minimize else np.argmax(values))
+        search = branch_and_bound(scenario, consistent, grid, metric=metric, year=year)
+        assert (search.index, search.value) == (best, values[best]), metric
+
+
+def test_branch_and_bound_rejects_unknown_metric(consistent):
+    with pytest.raises(ValueError, match='cannot be optimized'):
+        branch_and_bound('Remove then Replant', consistent, {'removal_rate': [100, 250]}, metric='Cost of Pruning')
@@ -0,0 +1,29 @@
+import itertools
+import pytest
+from mississauga_eab.optimization.schedule_optimizer import optimize_schedule, replay_schedule
+
+
+@pytest.fixture(scope='module')
+def cheap_planting(overall):
+    # Cheap planting and dear injections, so that the best schedules remove and plant
+    return dict(overall, tree_planting_and_establishment_expense=20.0, ash_tree_injections_expense=40.0)
+
+
+@pytest.mark.parametrize('years, removal_rates, planting_rates', [
+    (4, [0, 400], [0, 400]),
+    (3, [0, 100, 1000], [0, 200, 1000]),
+])
+def test_optimize_schedule_matches_exhaustive_search(cheap_planting, years, removal_rates, planting_rates):
+    best = max(replay_schedule(cheap_planting, removals, plantings).value('Net Value of All Trees', years)
+               for removals in itertools.product(removal_rates, repeat=years)
+               for plantings in itertools.product(planting_rates, repeat=years))
+    schedule = optimize_schedule(cheap_planting, removal_rates, planting_rates, years=years)
+    assert schedule.value == best
+    assert replay_schedule(cheap_planting, schedule.removal_rates,
+                           schedule.planting_rates).value('Net Value of All Trees', years) == best
+
+
+@pytest.mark.parametrize('years', [0, 21])
+def test_optimize_schedule_rejects_years_outside_simulation(overall, years):
+    with pytest.raises(ValueError, match='1 to the 20 simulated years'):
+        optimize_schedule(overall, [0, 100], [0, 100], years=years)
@@ -0,0 +1,28 @@
+import numpy as np
+import pytest
+from mississauga_eab.profile_comparison import _simulation_inputs
+from mississauga_eab.result_buffers import COLUMNS, SimulationResult
+from mississauga_eab.simulation_module import run_simulations
+from .conftest import SETTINGS
+
+
+@pytest.fixture(scope='module')
+def simulations(overall, baseline_simulations):
+    return [run_simulations.__wrapped__(**_simulation_inputs(overall, dict(zip(SETTINGS, settings.tolist()))))
+            for settings in baseline_simulations['settings']]
+
+
+def test_run_simulations_matches_baseline(simulations, baseline_simulations):
+    for scenario in simulations[0]:
+        for run, results in enumerate(simulations):
+            frame = results[scenario].to_frame()
+            np.testing.assert_array_equal(frame[list(COLUMNS)].to_numpy(float), baseline_simulations[scenario][run],
+                                          err_msg=f"{scenario}, run {run}")
+
+
+def test_to_frame_rounds_like_python_round():
+    result = SimulationResult(1)
+    result.record(1, {'Year': 1, 'Ash Tree Count': 3, 'Total Costs': 498472.21499999997})
+    frame = result.to_frame()
+    assert frame['Total Costs'][0] == 498472.21
+    assert frame['Ash Tree Count'].dtype == np.int64
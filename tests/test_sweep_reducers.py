@@ -0,0 +1,38 @@
+import numpy as np
+from mississauga_eab.optimization.sweep_reducers import ParetoFrontier, pareto_front
+from mississauga_eab.result_buffers import COLUMN_INDEX, COLUMNS
+
+
+def _brute_force_front(costs, values):
+    # Every point no other point dominates, keeping the first of identical points, ordered by cost
+    front = []
+    for i, (cost, value) in enumerate(zip(costs, values)):
+        if np.isnan(cost) or np.isnan(value):
+            continue
+        dominated = any((other_cost <= cost and other_value >= value and (other_cost < cost or other_value > value))
+                        or (other_cost == cost and other_value == value and j < i)
+                        for j, (other_cost, other_value) in enumerate(zip(costs, values)))
+        if not dominated:
+            front.append(i)
+    return sorted(front, key=lambda i: (costs[i], -values[i]))
+
+
+def test_pareto_front_matches_brute_force():
+    rng = np.random.default_rng(7)
+    for _ in range(50):
+        # Few distinct values, so that ties and identical points are common
+        costs = rng.integers(0, 12, size=40).astype(float)
+        values = rng.integers(0, 12, size=40).astype(float)
+        costs[rng.random(40) < 0.05] = np.nan
+        assert pareto_front(costs, values).tolist() == _brute_force_front(costs, values)
+
+
+def test_pareto_frontier_streams_to_the_same_front():
+    rng = np.random.default_rng(11)
+    values = rng.random((100, 20, len(COLUMNS)))
+    frontier = ParetoFrontier(year=20)
+    for start in range(0, 100, 30):
+        frontier.update(np.arange(start, min(start + 30, 100)), values[start:start + 30])
+    costs = values[:, 19, COLUMN_INDEX['Cumulative Costs']]
+    worth = values[:, 19, COLUMN_INDEX['CTLA Value of All Trees']]
+    assert [index for index, *_ in frontier.frontier()] == _brute_force_front(costs, worth)
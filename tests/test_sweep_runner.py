@@ -0,0 +1,71 @@
+import numpy as np
+import pytest
+from mississauga_eab.batch_kernel import simulate_batch
+from mississauga_eab.optimization.results_cube import ResultsCube
+from mississauga_eab.optimization.sweep_runner import iter_sweep, run_sweep
+
+SCENARIO = 'Replant, Inject, then Remove'
+
+
+@pytest.fixture(scope='module')
+def grid():
+    axes = dict(removal_year=[1, 2, 5, 10, 20], removal_rate=[100, 500], planting_rate=[10, 400], planting_year=[1, 3])
+    return dict(zip(axes, [values.ravel() for values in np.meshgrid(*axes.values(), indexing='ij')]))
+
+
+@pytest.fixture(scope='module')
+def expected(overall, grid):
+    return simulate_batch(SCENARIO, overall, **grid).values
+
+
+def test_checkpoint_resume_round_trip(overall, grid, expected, tmp_path):
+    checkpoint = tmp_path / 'sweep - Checkpoint.npy'
+    # Interrupt a sweep after two chunks, then resume it from the checkpoint
+    sweep = iter_sweep(SCENARIO, overall, grid, workers=1, chunk_size=8, checkpoint=str(checkpoint),
+                       use_cache=False)
+    interrupted = [next(sweep), next(sweep)]
+    sweep.close()
+    assert checkpoint.exists()
+
+    seen = np.zeros(len(expected), dtype=np.int64)
+    values = np.full_like(expected, np.nan)
+    for indices, chunk in iter_sweep(SCENARIO, overall, grid, workers=1, chunk_size=8, checkpoint=str(checkpoint),
+                                     resume=True, use_cache=False):
+        seen[indices] += 1
+        values[indices] = chunk
+    assert (seen == 1).all()
+    np.testing.assert_array_equal(values, expected)
+    for indices, chunk in interrupted:
+        np.testing.assert_array_equal(chunk, expected[indices])
+    assert not checkpoint.exists()
+
+
+def test_checkpoint_resume_rejects_edited_parameters(overall, grid, tmp_path):
+    checkpoint = str(tmp_path / 'sweep - Checkpoint.npy')
+    sweep = iter_sweep(SCENARIO, overall, grid, workers=1, chunk_size=8, checkpoint=checkpoint, use_cache=False)
+    next(sweep)
+    sweep.close()
+    edited = dict(overall, growth_rate=overall['growth_rate'] * 1.01)
+    with pytest.raises(ValueError, match='different sweep or different model'):
+        list(iter_sweep(SCENARIO, edited, grid, workers=1, chunk_size=8, checkpoint=checkpoint, resume=True,
+                        use_cache=False))
+
+
+def test_cube_resume_round_trip(overall, grid, expected, tmp_path):
+    path = str(tmp_path / 'cube')
+    cube = run_sweep(SCENARIO, overall, grid, workers=1, chunk_size=8, use_cache=False, cube=path)
+    np.testing.assert_array_equal(cube.values, expected)
+
+    # Lose some combinations as an interrupted sweep would, then resume
+    lost = np.arange(5, 30)
+    cube.values[lost] = np.nan
+    cube.filled[lost] = False
+    cube.mark_filled([])
+    assert ResultsCube.open(path).pending().tolist() == lost.tolist()
+    cube = run_sweep(SCENARIO, overall, grid, workers=1, chunk_size=8, use_cache=False, cube=path, resume=True)
+    np.testing.assert_array_equal(cube.values, expected)
+
+    reopened = ResultsCube.open(path)
+    assert len(reopened.pending()) == 0
+    assert reopened.scenario == SCENARIO
+    np.testing.assert_array_equal(reopened.values, expected)